@@ -0,0 +1,137 @@
+# cache.py
+"""
+****************************************************************************************************
+WHAT THIS DOES
+
+Cache the hands parsed by main.py, so the outputs of a log can be rendered again with another
+config (hero, site, network, currency, versions, output formats or partitions) without parsing the
+log again, see the --rerender option of main.py.
+
+Each log is an entry of the Cache folder, its parsed hands pickled and compressed with gzip. The
+entries are committed atomically like the output files and the least recently used entries are
+evicted when the cache is over its size budget. An entry saved by another version of the parsed
+hands is removed instead of being used.
+****************************************************************************************************
+"""
+# MODULES
+import gzip
+import logging
+import os
+from pathlib import Path
+import pickle
+from typing import Optional
+
+from constants import BUSTED, CACHE_SUFFIX, CACHE_VERSION, ENTRIES, SURVIVORS
+from output import replace_file, uncommitted_path
+
+# END MODULES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# FUNCTIONS
+def save_cache(
+    ohh_name: str, table_name: str, table: list[dict], tournament: Optional[dict], max_bytes: int
+) -> None:
+    """Save the parsed hands of a log to the cache, so the outputs can be rendered again after the
+    config changes without parsing the log, see rerender. The hands are pickled and compressed, and
+    the entry is replaced atomically like the .ohh files in commit_ohh. The oldest entries are
+    evicted when the cache is over its size budget.
+
+    Args:
+        ohh_name (str): Name of the .ohh file of the log, see output_name.
+        table_name (str): Name of the table taken from the name of the Poker Now csv file.
+        table (list[dict]): The hand histories returned by parse_hands, with the amounts in cents.
+        tournament (dict, optional): The players of the tournament at the table, see the tournaments
+            dictionary of main.py, None for a ring game.
+        max_bytes (int): The size budget of the cache, see evict_cache.
+
+    Returns:
+        None
+    """
+    players = None
+    if tournament is not None:
+        players = {key: tournament[key] for key in (ENTRIES, BUSTED, SURVIVORS)}
+    path = cache_directory / Path(ohh_name).with_suffix(CACHE_SUFFIX).name
+    temp_path = uncommitted_path(path)
+    entry = (CACHE_VERSION, table_name, ohh_name, table, players)
+    with open(temp_path, "wb") as f:
+        f.write(gzip.compress(pickle.dumps(entry, pickle.HIGHEST_PROTOCOL), compresslevel=1))
+        f.flush()
+        os.fsync(f.fileno())
+    replace_file(temp_path, path)
+    evicted = evict_cache(max_bytes, path)
+    if evicted:
+        logging.info(f"[{table_name}] {evicted} entries were evicted from the cache.")
+    if path.stat().st_size > max_bytes:
+        logging.warning(
+            f"[{table_name}] The parsed hands take {path.stat().st_size} bytes in the cache, more "
+            f"than the max_bytes setting of the [Cache] section of config.ini ({max_bytes}). The "
+            "entry is kept until the next log is cached."
+        )
+
+
+def load_cache(path: Path) -> Optional[tuple[str, str, list[dict], Optional[dict]]]:
+    """Load an entry of the cache. An entry that cannot be read or was saved by another version of
+    the parsed hands is removed.
+
+    Args:
+        path (Path): Path to the entry.
+
+    Returns:
+        tuple[str, str, list[dict], dict], optional: The table name, the name of the .ohh file, the
+        parsed hands and the players of the tournament (see the tournaments dictionary) of the log,
+        None if the entry cannot be used.
+    """
+    try:
+        with open(path, "rb") as f:
+            entry = pickle.loads(gzip.decompress(f.read()))
+    except (OSError, EOFError, pickle.UnpicklingError) as error:
+        logging.warning(f"[CACHE] {path.name} could not be read and was removed: {error!r}")
+        path.unlink(missing_ok=True)
+        return None
+    if entry[0] != CACHE_VERSION:
+        logging.info(f"[CACHE] {path.name} is from version {entry[0]} and was removed.")
+        path.unlink()
+        return None
+    # Reading an entry makes it the most recently used
+    os.utime(path)
+    return entry[1:]
+
+
+def evict_cache(max_bytes: int, keep: Optional[Path] = None) -> int:
+    """Remove the least recently used entries of the cache until it fits in its size budget. The
+    entry that was just saved is kept even when it is larger than the budget on its own, so the log
+    it was saved for can still be rendered again.
+
+    Args:
+        max_bytes (int): The max_bytes setting of the [Cache] section of config.ini.
+        keep (Path, optional): Path to the entry that was just saved.
+
+    Returns:
+        int: The number of entries removed.
+    """
+    entries = [(path, path.stat()) for path in cache_directory.glob("*" + CACHE_SUFFIX)]
+    cache_size = sum(stat.st_size for _, stat in entries)
+    evicted: int = 0
+    for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime):
+        if cache_size <= max_bytes:
+            break
+        if path == keep:
+            continue
+        path.unlink()
+        cache_size -= stat.st_size
+        evicted += 1
+    return evicted
+
+
+# END OF FUNCTIONS
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# CODE
+# The folder of the cache, relative to the working folder
+cache_directory = Path("Cache")
+# end of code
+# **************************************************************************************************
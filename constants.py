@@ -0,0 +1,210 @@
+# constants.py
+"""
+****************************************************************************************************
+WHAT THIS DOES
+
+The constants shared by main.py and the modules of the converter: the keys of the data structures,
+the field names of the OHH and OTS formats, the sections and settings of config.ini and the default
+configuration.
+****************************************************************************************************
+"""
+# CONSTANTS
+CONFIG_FILE = "config.ini"
+TEXT = "text"
+COUNT = "count"
+LATEST = "latest"
+LAST = "last"
+OHH = "ohh"
+HH_VERSION = "hh_version"
+SHOW_DOWN = "Show Down"
+PLAYER_STACKS = "Player stacks"
+DEALER_NAME = "dealer_name"
+STACK_CHANGES = "stack_changes"
+TABLE = "table"
+# Temporary files are named .pokernow-ohh-<name>.tmp, so only the files written by this tool are
+# removed after an interrupted batch
+TEMP_PREFIX = ".pokernow-ohh-"
+TEMP_SUFFIX = ".tmp"
+INVALID = "invalid"
+FILES = "files"
+HANDS = "hands"
+LINES = "lines"
+BYTES = "bytes"
+PARSING = "parsing"
+MESSAGES = "messages"
+# The number of messages shown under the live dashboard
+RECENT_MESSAGES = 5
+FAILED = "failed"
+SLOWEST = "slowest"
+QUARANTINED = "quarantined"
+DISCONTINUITIES = "discontinuities"
+# The rows of a log counted by separate_hands
+PARSED = "parsed"
+IGNORED = "ignored"
+SAVED = "saved"
+# The number of logs of the batch, their total size and when the batch started, see progress_stats
+LOGS = "logs"
+TOTAL_BYTES = "total_bytes"
+STARTED = "started"
+REQUESTS = "requests"
+NAME_MAP_MTIME = "name_map_mtime"
+RESUME_ORDER = "resume_order"
+LAST_GAME_NUMBER = "last_game_number"
+SIZES = "sizes"
+ENTRIES = "entries"
+BUSTED = "busted"
+SURVIVORS = "survivors"
+OTS = "ots"
+# Files in the Poker Now hand history folder that are read, a .zip file can hold several logs
+LOG_SUFFIXES = (".csv", ".csv.gz", ".csv.zst", ".zip")
+# The row that starts a hand, with and without the quotes around the entry column
+HAND_STARTS = (b'\n"-- starting hand #', b"\n-- starting hand #")
+BLOCK_SIZE = 65536
+# The version of the parsed hands in the cache, cached hands of another version are not used
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".cache"
+
+# OHH FIELD NAMES
+SPEC_VERSION = "spec_version"
+SITE_NAME = "site_name"
+NETWORK_NAME = "network_name"
+INTERNAL_VERSION = "internal_version"
+GAME_NUMBER = "game_number"
+DATETIME = "datetime"
+START_DATE_UTC = "start_date_utc"
+TABLE_NAME = "table_name"
+GAME_TYPE = "game_type"
+BET_LIMIT = "bet_limit"
+BET_TYPE = "bet_type"
+TABLE_SIZE = "table_size"
+CURRENCY = "currency"
+DEALER_SEAT = "dealer_seat"
+SMALL_BLIND_AMOUNT = "small_blind_amount"
+BIG_BLIND_AMOUNT = "big_blind_amount"
+ANTE_AMOUNT = "ante_amount"
+HERO_PLAYER_ID = "hero_player_id"
+FLAGS = "flags"
+PLAYERS = "players"
+ID = "id"
+SEAT = "seat"
+NAME = "name"
+DISPLAY = "display"
+STARTING_STACK = "starting_stack"
+ROUNDS = "rounds"
+STREET = "street"
+CARDS = "cards"
+ACTIONS = "actions"
+ACTION_NUMBER = "action_number"
+PLAYER_ID = "player_id"
+ACTION = "action"
+AMOUNT = "amount"
+IS_ALL_IN = "is_allin"
+POTS = "pots"
+NUMBER = "number"
+RAKE = "rake"
+PLAYER_WINS = "player_wins"
+WIN_AMOUNT = "win_amount"
+CONTRIBUTED_RAKE = "contributed_rake"
+TOURNAMENT = "tournament"
+TOURNAMENT_INFO = "tournament_info"
+TOURNAMENT_NUMBER = "tournament_number"
+BUYIN_AMOUNT = "buyin_amount"
+FEE_AMOUNT = "fee_amount"
+BOUNTY_FEE_AMOUNT = "bounty_fee_amount"
+INITIAL_STACK = "initial_stack"
+TYPE = "type"
+SPEED = "speed"
+ROUND_TIME = "round_time"
+# END OF OHH FIELD NAMES
+
+# OTS FIELD NAMES
+TOURNAMENT_NAME = "tournament_name"
+END_DATE_UTC = "end_date_utc"
+BOUNTY_VALUE_AMOUNT = "bounty_value_amount"
+PRIZE_POOL = "prize_pool"
+HERO_PLAYER_NAME = "hero_player_name"
+PLAYER_COUNT = "player_count"
+TOURNAMENT_FINISHES_AND_WINNINGS = "tournament_finishes_and_winnings"
+PLAYER_NAME = "player_name"
+FINISH_POSITION = "finish_position"
+STILL_PLAYING = "still_playing"
+PRIZE = "prize"
+TICKET_VALUE = "ticket_value"
+# END OF OTS FIELD NAMES
+
+# CONSTANTS FOR PROCESSING INI
+HERO_NAME = "hero_name"
+HEROES = "heroes"
+PREFIX = "output_prefix"
+# END SCRIPT LEVEL CONSTANTS
+
+# CONFIGURABLE CONSTANTS
+OHH_CONSTANTS = "OHH Constants"
+DIRECTORIES = "Directories"
+CONFIG_DIR = "config_dir"
+LOG_DIR = "log_dir"
+PIPELINE = "Pipeline"
+READER_THREADS = "reader_threads"
+PARSER_THREADS = "parser_threads"
+QUEUE_SIZE = "queue_size"
+VALIDATION = "Validation"
+MODE = "mode"
+SAMPLE_RATE = "sample_rate"
+FULL = "full"
+SAMPLED = "sampled"
+OFF = "off"
+PROGRESS = "Progress"
+REFRESH_PER_SECOND = "refresh_per_second"
+INTERVAL = "interval"
+SERVER = "Server"
+HOST = "host"
+PORT = "port"
+WORKERS = "workers"
+UNKNOWN_PLAYERS = "unknown_players"
+ALIAS = "alias"
+QUARANTINE = "quarantine"
+OUTPUT = "Output"
+PARTITION = "partition"
+MAX_BYTES = "max_bytes"
+MAX_HANDS = "max_hands"
+FORMATS = "formats"
+POKERSTARS = "pokerstars"
+NO_PARTITION = "none"
+BY_DATE = "date"
+BY_TABLE = "table"
+BY_HERO = "hero"
+TOURNAMENT_CONFIG = "Tournament"
+CACHE = "Cache"
+
+DEFAULT_CONFIG = {
+    OHH_CONSTANTS: {
+        SPEC_VERSION: "1.2.2",
+        INTERNAL_VERSION: "1.2.2",
+        NETWORK_NAME: "PokerStars",
+        SITE_NAME: "PokerStars",
+        CURRENCY: "USD",
+        PREFIX: "HHC",
+        HERO_NAME: "",
+        HEROES: "",
+    },
+    DIRECTORIES: {CONFIG_DIR: "/Config", LOG_DIR: "/Logs"},
+    PIPELINE: {READER_THREADS: "2", PARSER_THREADS: "2", QUEUE_SIZE: "4"},
+    VALIDATION: {MODE: SAMPLED, SAMPLE_RATE: "0.01"},
+    PROGRESS: {REFRESH_PER_SECOND: "2", INTERVAL: "10"},
+    SERVER: {HOST: "127.0.0.1", PORT: "8080", WORKERS: "4", UNKNOWN_PLAYERS: ALIAS},
+    OUTPUT: {PARTITION: NO_PARTITION, MAX_BYTES: "0", MAX_HANDS: "0", FORMATS: OHH},
+    CACHE: {MAX_BYTES: "1073741824"},
+    TOURNAMENT_CONFIG: {
+        SPEC_VERSION: "1.1.3",
+        NAME: "",
+        BUYIN_AMOUNT: "0",
+        FEE_AMOUNT: "0",
+        BOUNTY_FEE_AMOUNT: "0",
+        SPEED: "Normal",
+    },
+}
+"""
+these are constants that are meant to be configurable - they could be edited here,
+or specified in a configuration file that is external to this script and checked for at run time
+"""
+# END CONSTANTS
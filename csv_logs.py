@@ -0,0 +1,365 @@
+# csv_logs.py
+"""
+****************************************************************************************************
+WHAT THIS DOES
+
+Find and read the Poker Now logs of a batch for main.py. A log is a Poker Now csv file, on its own
+or compressed as .csv.gz or .csv.zst, or a member of a .zip file. The rows of a log are read newest
+first like they are written by Poker Now and returned oldest first.
+
+The rows logged in a time range are located by binary search over the byte offsets of the rows, so
+a long log is not read in full to convert the hands of --since, --until or --tail, see
+locate_range.
+****************************************************************************************************
+"""
+# MODULES
+import csv
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+import gzip
+import io
+import logging
+from pathlib import Path
+import re
+from typing import BinaryIO, Callable, List, Optional, TextIO, Union
+from zipfile import ZipFile
+
+from constants import BLOCK_SIZE, HAND_STARTS
+from dashboard import console
+
+try:
+    import zstandard
+except ImportError:  # zstandard is only needed to read .csv.zst files
+    zstandard = None
+
+# END MODULES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# LOOKUP TABLE
+# The precision in milliseconds of a time written with this number of digits, see
+# timestamp_precision
+time_precisions = {0: 86400000, 2: 3600000, 4: 60000, 6: 1000}
+# END LOOKUP TABLES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# FUNCTIONS
+def csv_reader(
+    binary_file: BinaryIO, subs: dict[str, str], byte_range: Optional[tuple[int, int]] = None
+) -> list[List[str]]:
+    """Read a CSV file and make substitutions according to the subs dictionary.
+
+    Args:
+        binary_file (BinaryIO): The CSV file opened by open_log.
+        subs (dict): Dictionary containg strings to substitute or replace in the data.
+        byte_range (tuple[int, int], optional): Offsets of the first byte and the byte after the
+            last row to be read, as returned by locate_range. If None, all rows are read.
+
+    Returns:
+        List[List[str]]: The rows of data in the CSV file in reverse order.
+    """
+    if byte_range is None:
+        # The log is decoded as it is read, so a compressed log is never held in memory as bytes
+        with io.TextIOWrapper(binary_file, encoding="UTF-8", newline="") as text_file:
+            return read_rows(text_file, subs)
+    binary_file.seek(byte_range[0])
+    text = binary_file.read(byte_range[1] - byte_range[0]).decode("UTF-8")
+    return read_rows(text, subs, False)
+
+
+def list_logs(poker_now_files: list[Path]) -> list[tuple[Path, Optional[str], int]]:
+    """List the Poker Now logs in the files of the Poker Now hand history folder. Each member of a
+    .zip file with a name that matches table_regex is a log, any other file is a log on its own.
+
+    Args:
+        poker_now_files (list[Path]): The files in the Poker Now hand history folder.
+
+    Returns:
+        list[tuple[Path, Optional[str], int]]: The file, the name of the member of a .zip file (None
+        for other files) and the number of bytes stored for each log.
+    """
+    logs: list[tuple[Path, Optional[str], int]] = []
+    for poker_now_file in poker_now_files:
+        if poker_now_file.suffix == ".zip":
+            with ZipFile(poker_now_file) as archive:
+                logs.extend(
+                    (poker_now_file, info.filename, info.compress_size)
+                    for info in archive.infolist()
+                    if re.match(table_regex, Path(info.filename).name) is not None
+                )
+        elif poker_now_file.suffix == ".zst" and zstandard is None:
+            logging.warning(f"[ALL] {poker_now_file.name} was skipped, zstandard is not installed.")
+            console.print(
+                f"[red]{poker_now_file.name} was skipped, install zstandard to read .zst files."
+                "[/red]"
+            )
+        else:
+            logs.append((poker_now_file, None, poker_now_file.stat().st_size))
+    return logs
+
+
+def log_name(poker_now_file: Path, member: Optional[str]) -> str:
+    """Get the name of the Poker Now csv file of a log without the compression suffix, the table
+    name is matched against it with table_regex.
+
+    Args:
+        poker_now_file (Path): Path to the file holding the log.
+        member (str, optional): Name of the log in a .zip file, None for other files.
+
+    Returns:
+        str: Name of the Poker Now csv file.
+    """
+    if member is not None:
+        return Path(member).name
+    return poker_now_file.name.removesuffix(".gz").removesuffix(".zst")
+
+
+def select_tables(
+    poker_now_logs: list[tuple[Path, Optional[str], int]], patterns: list[str]
+) -> list[tuple[Path, Optional[str], int]]:
+    """Keep the logs of the tables that match one of the patterns given with --table.
+
+    Args:
+        poker_now_logs (list): The logs of the batch, see list_logs.
+        patterns (list[str]): Table names or shell-style wildcard patterns.
+
+    Returns:
+        list[tuple[Path, Optional[str], int]]: The logs of the matching tables, in the same order.
+    """
+    return [
+        (poker_now_file, member, size)
+        for poker_now_file, member, size in poker_now_logs
+        if (table_name_match := re.match(table_regex, log_name(poker_now_file, member))) is not None
+        and any(fnmatch(table_name_match.group("table_name"), pattern) for pattern in patterns)
+    ]
+
+
+def open_log(poker_now_file: Path, member: Optional[str], seekable: bool = False) -> BinaryIO:
+    """Open a log for reading. Compressed logs are decompressed as they are read, without writing
+    the decompressed file to disk. When the rows are searched with locate_range a compressed log is
+    decompressed in memory instead, because a compressed stream cannot seek back without
+    decompressing the log again.
+
+    Args:
+        poker_now_file (Path): Path to the file holding the log.
+        member (str, optional): Name of the log in a .zip file, None for other files.
+        seekable (bool): True if the file is searched with locate_range.
+
+    Returns:
+        BinaryIO: The Poker Now csv file opened in binary mode.
+    """
+    if member is not None:
+        # The member keeps the .zip file open until the member is closed
+        with ZipFile(poker_now_file) as archive:
+            log_file = archive.open(member)
+    elif poker_now_file.suffix == ".gz":
+        log_file = gzip.open(poker_now_file, mode="rb")
+    elif poker_now_file.suffix == ".zst":
+        log_file = zstandard.ZstdDecompressor().stream_reader(
+            poker_now_file.open(mode="rb"), closefd=True
+        )
+    else:
+        return poker_now_file.open(mode="rb")
+    if not seekable:
+        return log_file
+    with log_file:
+        return io.BytesIO(log_file.read())
+
+
+def read_rows(
+    text: Union[str, TextIO], subs: dict[str, str], has_header: bool = True
+) -> list[List[str]]:
+    """Read the rows of a Poker Now log and make substitutions according to the subs dictionary.
+
+    Args:
+        text (str | TextIO): The text of the Poker Now csv file, or the file opened as text with
+            newline="".
+        subs (dict): Dictionary containg strings to substitute or replace in the data.
+        has_header (bool): True if the first row of the text is the header.
+
+    Returns:
+        List[List[str]]: The rows of data in reverse order.
+    """
+    rows: list[List[str]] = [[]]
+    subs_regex = re.compile("|".join(subs.keys()))
+    reader = csv.reader(io.StringIO(text, newline="") if isinstance(text, str) else text)
+    if has_header:
+        next(reader, None)
+    for row in reader:
+        row = [subs_regex.sub(
+            lambda match: subs[match.group(0)], i) for i in row]
+        row[0] = row[0].encode("ascii", "ignore").decode()
+        rows.append(row)
+    rows.reverse()
+    return rows
+
+
+def to_order(timestamp: str, end: bool = False) -> int:
+    """Convert a timestamp to the value of the order column of a Poker Now log. The order is the
+    time in milliseconds multiplied by 100, the last two digits count the rows logged in the same
+    millisecond.
+
+    Args:
+        timestamp (str): ISO 8601 date or date and time, UTC is assumed if there is no time zone.
+        end (bool): True for the end of a range, the timestamp covers the whole day, hour, minute,
+            second or fraction of a second it was written to, so 01:00 ends at 01:00:59.999.
+
+    Returns:
+        int: The order of the first row that can be logged at the timestamp, or with end the order
+        of the last row that can be logged before the next day, hour, minute, second or fraction.
+    """
+    moment = datetime.fromisoformat(timestamp)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    order = round(moment.timestamp() * 1000) * 100
+    if not end:
+        return order
+    return order + timestamp_precision(timestamp) * 100 - 1
+
+
+def timestamp_precision(timestamp: str) -> int:
+    """Get the precision an ISO 8601 timestamp was written to, from the digits of its time.
+
+    Args:
+        timestamp (str): ISO 8601 date or date and time.
+
+    Returns:
+        int: The precision in milliseconds, 1 for timestamps written to the millisecond or finer.
+    """
+    precision_match = re.match(timestamp_regex, timestamp)
+    if precision_match is None:
+        return 1
+    fraction = precision_match.group("fraction")
+    if fraction is not None:
+        return 10 ** max(3 - len(fraction), 0)
+    time_digits = re.sub(r"\D", "", precision_match.group("time") or "")
+    return time_precisions.get(len(time_digits), 1)
+
+
+def row_order(line: bytes) -> int:
+    """Get the order of a row of a Poker Now log, it is the last column.
+
+    Args:
+        line (bytes): The row as read from the file.
+
+    Returns:
+        int: The value of the order column.
+    """
+    return int(line.rstrip().rsplit(b",", 1)[1])
+
+
+def line_start(csv_file: BinaryIO, offset: int) -> int:
+    """Get the offset of the first row that starts at or after offset.
+
+    Args:
+        csv_file (BinaryIO): The Poker Now csv file opened in binary mode.
+        offset (int): Offset in the file.
+
+    Returns:
+        int: Offset of the row.
+    """
+    csv_file.seek(offset - 1)
+    csv_file.readline()
+    return csv_file.tell()
+
+
+def bisect_rows(csv_file: BinaryIO, low: int, high: int, condition: Callable[[int], bool]) -> int:
+    """Binary search over the byte offsets of the rows between low and high for the first row where
+    the condition on the order of the row is true. The rows are newest first, so the condition must
+    be false for the rows at the top and true for all rows after the first one where it is true.
+
+    Args:
+        csv_file (BinaryIO): The Poker Now csv file opened in binary mode.
+        low (int): Offset of the first row to search.
+        high (int): Offset of the end of the rows to search.
+        condition (Callable[[int], bool]): Condition on the order of a row.
+
+    Returns:
+        int: Offset of the first row where the condition is true, or high if there is none.
+    """
+    end = high
+    while low < high:
+        middle = (low + high) // 2
+        start = line_start(csv_file, middle)
+        csv_file.seek(start)
+        if start >= end or condition(row_order(csv_file.readline())):
+            high = middle
+        else:
+            low = middle + 1
+    return min(line_start(csv_file, low), end)
+
+
+def previous_hand_start(csv_file: BinaryIO, offset: int, low: int) -> int:
+    """Find the row that starts the hand logged after the row at offset by reading the file
+    backwards in blocks. Rows that are logged after the end of a hand, such as a player showing
+    their cards, belong to the hand until the next hand starts.
+
+    Args:
+        csv_file (BinaryIO): The Poker Now csv file opened in binary mode.
+        offset (int): Offset of a row.
+        low (int): Offset of the first row of the file.
+
+    Returns:
+        int: Offset of the row after the start of the next hand, or low if there is no next hand.
+    """
+    end = offset
+    while end > low:
+        start = max(low - 1, end - BLOCK_SIZE)
+        csv_file.seek(start)
+        # The blocks overlap, so the start of a hand split between two blocks is still found.
+        block = csv_file.read(min(offset, end + len(HAND_STARTS[0])) - start)
+        found = max(block.rfind(hand_start) for hand_start in HAND_STARTS)
+        if found != -1:
+            csv_file.seek(start + found + 1)
+            csv_file.readline()
+            return csv_file.tell()
+        end = start
+    return low
+
+
+def locate_range(
+    csv_file: BinaryIO, since: Optional[int], until: Optional[int]
+) -> tuple[int, int]:
+    """Locate the rows of a Poker Now csv file that were logged in a time range. Only the row
+    offsets visited by binary search are read. The range is extended to the end of the last hand
+    started in the range, the rows of a hand started before the range are dropped when the hands are
+    separated.
+
+    Args:
+        csv_file (BinaryIO): The Poker Now csv file opened by open_log.
+        since (int, optional): Order of the start of the range, None for the start of the log.
+        until (int, optional): Order of the end of the range, None for the end of the log.
+
+    Returns:
+        tuple[int, int]: Offsets of the first byte and the byte after the last row in the range.
+    """
+    csv_file.seek(0)
+    csv_file.readline()
+    low = csv_file.tell()
+    high = csv_file.seek(0, io.SEEK_END)
+    end = high
+    if since is not None:
+        end = bisect_rows(csv_file, low, high, lambda order: order < since)
+    start = low
+    if until is not None:
+        start = bisect_rows(csv_file, low, end, lambda order: order <= until)
+        start = previous_hand_start(csv_file, start, low)
+    return start, end
+
+
+# END OF FUNCTIONS
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# CODE
+# The table name in the name of a Poker Now csv file and the time of an ISO 8601 timestamp
+table_regex = re.compile(r"^.*poker_now_log_(?P<table_name>.*).csv$")
+timestamp_regex = re.compile(
+    r"\d{4}-?\d{2}-?\d{2}(?:[T ](?P<time>\d{2}(?::?\d{2}){0,2})(?:[.,](?P<fraction>\d+))?)?"
+)
+# end of code
+# **************************************************************************************************
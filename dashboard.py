@@ -0,0 +1,216 @@
+# dashboard.py
+"""
+****************************************************************************************************
+WHAT THIS DOES
+
+Show the progress of a batch converted by main.py: the files and hands done, lines/sec, hands/sec,
+the ETA and the slowest table, with the latest messages of the batch under them.
+
+The stages of the conversion only increment the counters of the progress dictionary, under
+progress_lock. The statistics are calculated from the counters when the progress is displayed, by a
+live dashboard refreshed from its own thread on a terminal, or as plain lines printed at an interval
+when the output is not a terminal.
+****************************************************************************************************
+"""
+# MODULES
+from collections import deque
+from configparser import SectionProxy
+import logging
+from threading import Event, Lock, Thread
+from time import perf_counter
+from rich.console import Console, Group
+from rich.live import Live
+from rich.panel import Panel
+from rich.table import Table
+
+from constants import (
+    BYTES,
+    DISCONTINUITIES,
+    FAILED,
+    FILES,
+    HANDS,
+    INTERVAL,
+    LINES,
+    LOGS,
+    MESSAGES,
+    PARSING,
+    QUARANTINED,
+    RECENT_MESSAGES,
+    REFRESH_PER_SECOND,
+    SLOWEST,
+    STARTED,
+    TOTAL_BYTES,
+)
+
+# END MODULES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# FUNCTIONS
+def progress_stats() -> dict[str, str]:
+    """Calculate the progress of the batch from the counters updated by the stages of the
+    conversion. This is only called when the progress is displayed, so the stages only pay for
+    incrementing counters.
+
+    Returns:
+        dict[str, str]: The formatted statistics, keyed by label.
+    """
+    elapsed = max(perf_counter() - progress[STARTED], 1e-9)
+    hands_done = progress[HANDS]
+    bytes_done = progress[BYTES]
+    # The logs being parsed count for the share of their hands that has been parsed
+    for file_bytes, file_hands, file_hands_done in list(progress[PARSING].values()):
+        hands_done += file_hands_done
+        if file_hands:
+            bytes_done += file_bytes * file_hands_done / file_hands
+    total_bytes = progress[TOTAL_BYTES]
+    fraction = min(bytes_done / total_bytes, 1.0) if total_bytes else 1.0
+    slowest_table, slowest_time = progress[SLOWEST]
+    return {
+        "Files": f"{progress[FILES]} of {progress[LOGS]}",
+        "Hands": f"{hands_done}",
+        "Lines/sec": f"{progress[LINES] / elapsed:,.0f}",
+        "Hands/sec": f"{hands_done / elapsed:,.0f}",
+        "ETA": f"{elapsed * (1 - fraction) / fraction:,.0f} sec" if fraction else "-",
+        "Slowest table": f"{slowest_table} ({slowest_time:.2f} sec)" if slowest_table else "-",
+        "Quarantined hands": f"{progress[QUARANTINED]}",
+    }
+
+
+def build_dashboard() -> Group:
+    """Build the table shown by the live dashboard, with the recent messages of the batch under it,
+    see print_message.
+
+    Returns:
+        Group: The progress of the batch and the recent messages.
+    """
+    dashboard = Table(title="Poker Now to OHH", show_header=False)
+    dashboard.add_column(style="cyan")
+    dashboard.add_column(style="magenta", justify="right")
+    for label, value in progress_stats().items():
+        dashboard.add_row(label, value)
+    if not progress[MESSAGES]:
+        return Group(dashboard)
+    return Group(dashboard, Panel("\n".join(list(progress[MESSAGES])), title="Recent"))
+
+
+def print_message(message: str) -> None:
+    """Print a message of the batch. While the live dashboard is shown the message is added to the
+    recent messages under the dashboard instead, so the threads of the batch do not draw over it.
+
+    Args:
+        message (str): The message, with rich markup.
+
+    Returns:
+        None
+    """
+    if live.is_started:
+        progress[MESSAGES].append(message)
+    else:
+        console.print(message)
+
+
+def prompt_user(prompt: str) -> str:
+    """Get input from the user. The live dashboard is stopped while waiting for the input, so it
+    does not draw over the prompt.
+
+    Args:
+        prompt (str): Text to show the user.
+
+    Returns:
+        str: The text typed in by the user.
+    """
+    if not live.is_started:
+        return console.input(prompt)
+    live.stop()
+    try:
+        return console.input(prompt)
+    finally:
+        live.start()
+
+
+def report_progress(stop: Event, interval: float) -> None:
+    """Print the progress of the batch as a plain line every interval seconds until stop is set.
+    Used instead of the live dashboard when the output is not a terminal.
+
+    Args:
+        stop (Event): Set when the batch has finished.
+        interval (float): Number of seconds between progress lines.
+
+    Returns:
+        None
+    """
+    while not stop.wait(interval):
+        line = ", ".join(f"{label}: {value}" for label, value in progress_stats().items())
+        logging.info(f"[ALL] {line}")
+        console.print(line, markup=False, highlight=False)
+
+
+def start_progress(progress_config: SectionProxy, logs: int, total_bytes: int) -> Event:
+    """Start showing the progress of a batch, with the live dashboard on a terminal, otherwise as
+    plain lines. Both are refreshed from their own thread at a limited rate.
+
+    Args:
+        progress_config (SectionProxy): The [Progress] section of config.ini.
+        logs (int): The number of logs in the batch.
+        total_bytes (int): The total size of the logs of the batch.
+
+    Returns:
+        Event: The event that stops the progress, see stop_progress.
+    """
+    progress[LOGS] = logs
+    progress[TOTAL_BYTES] = total_bytes
+    progress[STARTED] = perf_counter()
+    stop = Event()
+    if console.is_terminal:
+        live.refresh_per_second = float(progress_config[REFRESH_PER_SECOND])
+        live.start()
+    else:
+        Thread(
+            target=report_progress, args=(stop, float(progress_config[INTERVAL])), daemon=True
+        ).start()
+    return stop
+
+
+def stop_progress(stop: Event) -> None:
+    """Stop showing the progress of a batch, the live dashboard is drawn a last time.
+
+    Args:
+        stop (Event): The event returned by start_progress.
+
+    Returns:
+        None
+    """
+    stop.set()
+    if live.is_started:
+        live.stop()
+
+
+# END OF FUNCTIONS
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# CODE
+console = Console()
+progress_lock = Lock()
+progress = {
+    FILES: 0,
+    HANDS: 0,
+    LINES: 0,
+    BYTES: 0,
+    PARSING: {},
+    FAILED: [],
+    MESSAGES: deque(maxlen=RECENT_MESSAGES),
+    SLOWEST: ("", 0.0),
+    QUARANTINED: 0,
+    DISCONTINUITIES: 0,
+    LOGS: 0,
+    TOTAL_BYTES: 0,
+    STARTED: perf_counter(),
+}
+# The live dashboard, only started when the output is a terminal
+live = Live(console=console, get_renderable=build_dashboard)
+# end of code
+# **************************************************************************************************
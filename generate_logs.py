@@ -0,0 +1,992 @@
+# generate_logs.py
+"""
+****************************************************************************************************
+WHAT THIS DOES
+
+Generate synthetic Poker Now (https://www.pokernow.club/) hand history csv files for scale and load
+testing of the converter in main.py.
+
+Each table is simulated hand by hand and written in the same format as a log downloaded from Poker
+Now: the columns entry, at and order with the newest row first. The simulation covers
+
+    - Texas Hold'em, Omaha Hi and Omaha Hi/Lo 8 or Better
+    - antes, straddles, missing small blinds, missed big blinds and add-ons
+    - all-ins with side pots and uncalled bets
+    - boards that are run twice, showdowns and cards shown after the end of a hand
+    - blind structure changes in the middle of the session
+    - players leaving and rejoining the table with new aliases or from new devices
+
+The chips are accounted for, so the starting stack of a player in a hand is the stack they ended the
+previous hand with plus any add-ons. The output is the same for the same seed.
+
+Usage: python generate_logs.py --tables 4 --hands 250000 --seed 7 --name-map Config/name-map.json
+
+KEY ASSUMPTIONS
+
+The logs are of ring games, cash games without a tournament structure. The number of tables, hands
+per table and players seated at the start, the games the tables take turns at, the stakes in chips
+or in dollars and cents, the ante, the hands between changes of the blind structure, the alias of
+the hero and the start time of the sessions are set on the command line, see parse_arguments. The
+aliases and devices of the generated players can be added to a name-map json file, so the logs are
+converted without prompting. The hands are not evaluated, the winners of each pot are picked at
+random.
+****************************************************************************************************
+"""
+# MODULES
+from argparse import ArgumentParser, Namespace
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import io
+import json
+import os
+from pathlib import Path
+from random import Random
+import string
+from typing import Callable, Optional, TextIO
+
+# END MODULES
+# **************************************************************************************************
+
+# **************************************************************************************************
+# CONSTANTS
+HEADER = "entry,at,order\n"
+BLOCK_SIZE = 1 << 20
+SEATS = 10
+RANKS = ("2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A")
+SUITS = ("♥", "♠", "♦", "♣")
+FIRST_NAMES = (
+    "Alice", "Bruno", "Carla", "Deckhole", "Eddie", "Fiona", "Gus", "Hana", "Ivan", "Jean",
+    "Kofi", "Lena", "Marco", "Nadia", "Omar", "Pia", "Quinn", "Rico", "Sven", "Tess",
+    "Umar", "Vera", "Wes", "Xena", "Yuri", "Zoe",
+)
+# Bet type, game type in the starting line of a hand and number of cards dealt to each player
+GAMES = {
+    "holdem": ("No Limit", "Texas Hold'em", 2),
+    "omaha": ("Pot Limit", "Omaha Hi", 4),
+    "omahahilo": ("Pot Limit", "Omaha Hi/Lo 8 or Better", 4),
+}
+STREETS = (("Flop", 3), ("Turn", 1), ("River", 1))
+
+# Probabilities of events in the simulation
+P_STRADDLE = 0.05
+P_RUN_TWICE = 0.5
+P_SHOW_AFTER = 0.05
+P_QUIT = 0.01
+P_JOIN = 0.3
+P_MISSED_BLINDS = 0.7
+P_NEW_ALIAS = 0.3
+P_NEW_DEVICE = 0.2
+P_ADD_ON = 0.5
+P_LOW = 0.6
+# END CONSTANTS
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# DATA STRUCTURES
+@dataclass
+class Hand:
+    """The state of a hand while it is played, see play_hand.
+
+    Attributes:
+        table (dict): The state of the table the hand is played at.
+        order (list[int]): Seats in the order they act, starting left of the button.
+        deck (list[str]): The cards left in the deck.
+        cards (dict[int, list[str]]): The cards dealt to each seat.
+        contributed (dict[int, int]): Chips put in the pot by each seat in the hand.
+        committed (dict[int, int]): Chips bet by each seat in the current round, antes and missing
+            small blinds excluded.
+        folded (set[int]): Seats that have folded.
+    """
+
+    table: dict
+    order: list[int]
+    deck: list[str]
+    cards: dict[int, list[str]]
+    contributed: dict[int, int]
+    committed: dict[int, int]
+    folded: set[int] = field(default_factory=set)
+
+
+# END DATA STRUCTURES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# FUNCTIONS
+def random_id(rng: Random, length: int) -> str:
+    """Make a random ID like the device IDs and table names used by Poker Now.
+
+    Args:
+        rng (Random): The random number generator of the table.
+        length (int): Number of characters.
+
+    Returns:
+        str: The ID.
+    """
+    return "".join(rng.choice(string.ascii_letters + string.digits + "-_") for _ in range(length))
+
+
+def format_amount(amount: int, cents: bool) -> str:
+    """Format an amount of chips the way Poker Now logs it.
+
+    Args:
+        amount (int): Amount in the smallest unit of chips.
+        cents (bool): True if the stakes are in cents, the amount is then logged with two decimals.
+
+    Returns:
+        str: The formatted amount.
+    """
+    if cents:
+        return f"{amount // 100}.{amount % 100:02d}"
+    return str(amount)
+
+
+def format_cards(cards: list[str]) -> str:
+    """Format cards the way Poker Now logs them.
+
+    Args:
+        cards (list[str]): The cards.
+
+    Returns:
+        str: The cards separated by commas.
+    """
+    return ", ".join(cards)
+
+
+def make_log(csv_file: TextIO, rng: Random, start_ms: int) -> Callable[..., None]:
+    """Make the function used to write the rows of a log in the order they happen. Rows that are
+    logged at the same time share the millisecond of the at column and are counted by the last two
+    digits of the order column.
+
+    Args:
+        csv_file (TextIO): File the rows are written to, oldest row first.
+        rng (Random): The random number generator of the table.
+        start_ms (int): Time of the first row in milliseconds since the epoch.
+
+    Returns:
+        Callable[..., None]: Function that takes the entry of a row and writes it, the keyword
+        argument same_time logs the row in the same millisecond as the previous row.
+    """
+    clock = {"ms": start_ms, "count": 0, "second": -1, "prefix": ""}
+
+    def log(entry: str, same_time: bool = False, delay: int = 0) -> None:
+        if same_time:
+            clock["count"] += 1
+        else:
+            clock["ms"] += delay or rng.randint(400, 15000)
+            clock["count"] = 0
+        second, millisecond = divmod(clock["ms"], 1000)
+        if second != clock["second"]:
+            clock["second"] = second
+            clock["prefix"] = datetime.fromtimestamp(second, timezone.utc).strftime(
+                "%Y-%m-%dT%H:%M:%S"
+            )
+        entry = entry.replace('"', '""')
+        order = clock["ms"] * 100 + clock["count"]
+        csv_file.write(f'"{entry}",{clock["prefix"]}.{millisecond:03d}Z,{order}\n')
+
+    return log
+
+
+def new_player(rng: Random, person: dict, stack: int) -> dict:
+    """Seat a person at the table with an alias and device, either ones they used before or new
+    ones. The identity churn is what the name-map data model of the converter has to keep up with.
+
+    Args:
+        rng (Random): The random number generator of the table.
+        person (dict): The person from the pool of the table.
+        stack (int): Chips the player sits down with.
+
+    Returns:
+        dict: The player.
+    """
+    if not person["aliases"] or rng.random() < P_NEW_ALIAS:
+        person["aliases"].append(f"{person['name']} {random_id(rng, 3)}")
+    if not person["devices"] or rng.random() < P_NEW_DEVICE:
+        person["devices"].append(random_id(rng, 10))
+    return {
+        "person": person,
+        "alias": rng.choice(person["aliases"]),
+        "device": rng.choice(person["devices"]),
+        "stack": stack,
+        "missed": False,
+        "add_on": 0,
+    }
+
+
+def tag(player: dict) -> str:
+    """Get the text Poker Now uses to identify a player in a log.
+
+    Args:
+        player (dict): The player.
+
+    Returns:
+        str: The alias and device of the player in quotes.
+    """
+    return f'"{player["alias"]} @ {player["device"]}"'
+
+
+def distribute(
+    rng: Random,
+    contributed: dict[int, int],
+    live: list[int],
+    split: bool,
+) -> dict[int, int]:
+    """Split the pot between the players that have not folded. Side pots are made from the
+    contributions of the players who are all in, each pot is won by the best ranked player that is
+    eligible for it. The ranking is random, the hands are not evaluated.
+
+    Args:
+        rng (Random): The random number generator of the table.
+        contributed (dict[int, int]): Chips put in the pot by each seat, including seats that
+            folded.
+        live (list[int]): Seats that have not folded.
+        split (bool): True to split each pot between a high and a low hand.
+
+    Returns:
+        dict[int, int]: Chips won by each seat.
+    """
+    high = rng.sample(live, len(live))
+    low = rng.sample(live, len(live)) if split and rng.random() < P_LOW else None
+    won: dict[int, int] = {}
+    previous = 0
+    for level in sorted({contributed[seat] for seat in live}):
+        pot = sum(
+            min(amount, level) - min(amount, previous) for amount in contributed.values()
+        )
+        previous = level
+        eligible = [seat for seat in high if contributed[seat] >= level]
+        if not pot or not eligible:
+            continue
+        if low is None:
+            won[eligible[0]] = won.get(eligible[0], 0) + pot
+            continue
+        low_seat = next(seat for seat in low if contributed[seat] >= level)
+        won[eligible[0]] = won.get(eligible[0], 0) + pot - pot // 2
+        won[low_seat] = won.get(low_seat, 0) + pot // 2
+    return won
+
+
+def put_in(hand: Hand, seat: int, amount: int, live_bet: bool = True) -> int:
+    """Move chips from the stack of a player to the pot, up to the chips the player has left.
+
+    Args:
+        hand (Hand): The hand being played.
+        seat (int): Seat of the player.
+        amount (int): Chips to put in the pot.
+        live_bet (bool): False for antes and missing small blinds, which do not count toward the
+            bet of the round.
+
+    Returns:
+        int: The chips put in the pot.
+    """
+    player = hand.table["seats"][seat]
+    amount = min(amount, player["stack"])
+    player["stack"] -= amount
+    hand.contributed[seat] += amount
+    if live_bet:
+        hand.committed[seat] += amount
+    return amount
+
+
+def all_in(hand: Hand, seat: int) -> str:
+    """Get the end of the row of an action that puts the last chips of a player in the pot.
+
+    Args:
+        hand (Hand): The hand being played.
+        seat (int): Seat of the player.
+
+    Returns:
+        str: " and go all in" if the player has no chips left, otherwise an empty string.
+    """
+    return " and go all in" if hand.table["seats"][seat]["stack"] == 0 else ""
+
+
+def can_act(hand: Hand, seat: int) -> bool:
+    """Check if a player can still bet in the hand.
+
+    Args:
+        hand (Hand): The hand being played.
+        seat (int): Seat of the player.
+
+    Returns:
+        bool: True if the player has not folded and is not all in.
+    """
+    return seat not in hand.folded and hand.table["seats"][seat]["stack"] > 0
+
+
+def move_button(table: dict, in_hand: list[int]) -> tuple[list[int], bool]:
+    """Move the button to the next seat that was occupied in the previous hand. If that player has
+    left the table the button is dead.
+
+    Args:
+        table (dict): The state of the table.
+        in_hand (list[int]): Seats of the players dealt into the hand.
+
+    Returns:
+        tuple[list[int], bool]: The seats in the order they act, starting left of the button, and
+        True if the button is dead.
+    """
+    previous = table["previous_seats"] or in_hand
+    button = next((seat for seat in previous if seat > table["button"]), previous[0])
+    dead_button = button not in in_hand and len(in_hand) > 2
+    if not dead_button and button not in in_hand:
+        button = next((seat for seat in in_hand if seat > button), in_hand[0])
+    table["button"] = button
+    table["previous_seats"] = in_hand
+    order = [seat for seat in in_hand if seat > button] + [
+        seat for seat in in_hand if seat <= button
+    ]
+    if len(in_hand) == 2:
+        order = [button] + [seat for seat in order if seat != button]
+    return order, dead_button
+
+
+def start_hand(rng: Random, log: Callable[..., None], table: dict) -> Optional[Hand]:
+    """Start a hand with the players that have chips, log its starting rows and deal the cards.
+
+    Args:
+        rng (Random): The random number generator of the table.
+        log (Callable[..., None]): Function that writes a row to the log, see make_log.
+        table (dict): The state of the table.
+
+    Returns:
+        Optional[Hand]: The hand, None if fewer than two players have chips.
+    """
+    seats: dict[int, dict] = table["seats"]
+    bet_type, game_type, hole_cards = GAMES[table["game"]]
+    in_hand = sorted(seat for seat, player in seats.items() if player["stack"] > 0)
+    if len(in_hand) < 2:
+        return None
+    order, dead_button = move_button(table, in_hand)
+    table["hand_number"] += 1
+    dealer = "dead button" if dead_button else f"dealer: {tag(seats[table['button']])}"
+    log(f"-- starting hand #{table['hand_number']}  ({bet_type} {game_type}) ({dealer}) --")
+    log(
+        "Player stacks: "
+        + " | ".join(
+            f"#{seat} {tag(seats[seat])} ({format_amount(seats[seat]['stack'], table['cents'])})"
+            for seat in in_hand
+        ),
+        same_time=True,
+    )
+    deck = [rank + suit for rank in RANKS for suit in SUITS]
+    rng.shuffle(deck)
+    cards = {seat: [deck.pop() for _ in range(hole_cards)] for seat in in_hand}
+    if table["hero_seat"] in cards:
+        log(f"Your hand is {format_cards(cards[table['hero_seat']])}", same_time=True)
+    return Hand(
+        table=table,
+        order=order,
+        deck=deck,
+        cards=cards,
+        contributed={seat: 0 for seat in in_hand},
+        committed={seat: 0 for seat in in_hand},
+    )
+
+
+def post_missed_blinds(log: Callable[..., None], hand: Hand) -> None:
+    """Post the blinds missed by the players who come back to the table.
+
+    Args:
+        log (Callable[..., None]): Function that writes a row to the log, see make_log.
+        hand (Hand): The hand being played.
+
+    Returns:
+        None
+    """
+    table = hand.table
+    small_blind, big_blind = table["small_blind"], table["big_blind"]
+    for seat in hand.order[2:]:
+        player = table["seats"][seat]
+        if not player["missed"]:
+            continue
+        player["missed"] = False
+        if player["stack"] > small_blind + big_blind:
+            put_in(hand, seat, small_blind, live_bet=False)
+            log(
+                f"{tag(player)} posts a missing small blind of "
+                f"{format_amount(small_blind, table['cents'])}",
+                same_time=True,
+            )
+        put_in(hand, seat, big_blind)
+        log(
+            f"{tag(player)} posts a missed big blind of "
+            f"{format_amount(hand.committed[seat], table['cents'])}{all_in(hand, seat)}",
+            same_time=True,
+        )
+
+
+def post_blinds(rng: Random, log: Callable[..., None], hand: Hand) -> tuple[int, int]:
+    """Post the antes, the blinds, the missed blinds and sometimes a straddle.
+
+    Args:
+        rng (Random): The random number generator of the table.
+        log (Callable[..., None]): Function that writes a row to the log, see make_log.
+        hand (Hand): The hand being played.
+
+    Returns:
+        tuple[int, int]: Index in the order of the hand of the first player to act and the bet
+        they face.
+    """
+    table = hand.table
+    seats: dict[int, dict] = table["seats"]
+    cents = table["cents"]
+    if table["ante"]:
+        for seat in hand.order:
+            put_in(hand, seat, table["ante"], live_bet=False)
+            log(
+                f"{tag(seats[seat])} posts an ante of {format_amount(table['ante'], cents)}"
+                f"{all_in(hand, seat)}",
+                same_time=True,
+            )
+    for seat, blind in zip(hand.order[:2], ("small", "big")):
+        put_in(hand, seat, table[f"{blind}_blind"])
+        log(
+            f"{tag(seats[seat])} posts a {blind} blind of "
+            f"{format_amount(hand.committed[seat], cents)}{all_in(hand, seat)}",
+            same_time=True,
+        )
+    first_to_act = 2 % len(hand.order)
+    post_missed_blinds(log, hand)
+    if len(hand.order) > 3 and rng.random() < P_STRADDLE:
+        straddle_seat = hand.order[2]
+        if seats[straddle_seat]["stack"] > 2 * table["big_blind"]:
+            put_in(hand, straddle_seat, 2 * table["big_blind"] - hand.committed[straddle_seat])
+            log(
+                f"{tag(seats[straddle_seat])} posts a straddle of "
+                f"{format_amount(hand.committed[straddle_seat], cents)}",
+                same_time=True,
+            )
+            first_to_act = 3 % len(hand.order)
+    return first_to_act, max(hand.committed.values())
+
+
+def call(log: Callable[..., None], hand: Hand, seat: int, to_call: int) -> None:
+    """Call the bet of the round.
+
+    Args:
+        log (Callable[..., None]): Function that writes a row to the log, see make_log.
+        hand (Hand): The hand being played.
+        seat (int): Seat of the player.
+        to_call (int): Chips the player needs to put in the pot to match the bet.
+
+    Returns:
+        None
+    """
+    put_in(hand, seat, to_call)
+    log(
+        f"{tag(hand.table['seats'][seat])} calls "
+        f"{format_amount(hand.committed[seat], hand.table['cents'])}{all_in(hand, seat)}"
+    )
+
+
+def raise_target(rng: Random, hand: Hand, seat: int, bet: int, minimum_raise: int) -> int:
+    """Choose the bet a player raises to, limited by the pot in Pot Limit games and by the stack of
+    the player.
+
+    Args:
+        rng (Random): The random number generator of the table.
+        hand (Hand): The hand being played.
+        seat (int): Seat of the player.
+        bet (int): The bet of the round.
+        minimum_raise (int): The smallest raise allowed.
+
+    Returns:
+        int: The bet the player raises to, no more than the bet of the round if the player can only
+        call.
+    """
+    table = hand.table
+    size = max(minimum_raise, table["big_blind"] * rng.choice((1, 2, 3, 5, 10)))
+    target = bet + size
+    if GAMES[table["game"]][0] == "Pot Limit":
+        pot = sum(hand.contributed.values()) + bet - hand.committed[seat]
+        target = min(target, bet + pot)
+    return min(target, hand.committed[seat] + table["seats"][seat]["stack"])
+
+
+def return_uncalled(log: Callable[..., None], hand: Hand) -> None:
+    """Return the part of a bet that no other player could match.
+
+    Args:
+        log (Callable[..., None]): Function that writes a row to the log, see make_log.
+        hand (Hand): The hand being played.
+
+    Returns:
+        None
+    """
+    ranked = sorted(hand.committed.items(), key=lambda item: item[1], reverse=True)
+    uncalled = ranked[0][1] - (ranked[1][1] if len(ranked) > 1 else 0)
+    if uncalled > 0:
+        seat = ranked[0][0]
+        player = hand.table["seats"][seat]
+        player["stack"] += uncalled
+        hand.contributed[seat] -= uncalled
+        hand.committed[seat] -= uncalled
+        log(
+            f"Uncalled bet of {format_amount(uncalled, hand.table['cents'])} returned to "
+            f"{tag(player)}",
+            same_time=True,
+        )
+
+
+def betting_round(
+    rng: Random, log: Callable[..., None], hand: Hand, first: int, bet: int
+) -> None:
+    """Play a round of betting until every player has acted on the last bet or raise.
+
+    Args:
+        rng (Random): The random number generator of the table.
+        log (Callable[..., None]): Function that writes a row to the log, see make_log.
+        hand (Hand): The hand being played.
+        first (int): Index in the order of the hand of the first player to act.
+        bet (int): The bet the first player faces.
+
+    Returns:
+        None
+    """
+    order = hand.order
+    minimum_raise = hand.table["big_blind"]
+    raises = 0
+    queue = [seat for seat in order[first:] + order[:first] if can_act(hand, seat)]
+    while queue:
+        seat = queue.pop(0)
+        if not can_act(hand, seat) or len(order) - len(hand.folded) < 2:
+            continue
+        to_call = bet - hand.committed[seat]
+        roll = rng.random()
+        raise_allowed = raises < 3 and any(
+            can_act(hand, other) for other in order if other != seat
+        )
+        if to_call == 0 and (roll < 0.65 or not raise_allowed):
+            log(f"{tag(hand.table['seats'][seat])} checks")
+        elif to_call > 0 and roll < 0.3:
+            hand.folded.add(seat)
+            log(f"{tag(hand.table['seats'][seat])} folds")
+        elif to_call > 0 and (roll < 0.85 or not raise_allowed):
+            call(log, hand, seat, to_call)
+        else:
+            target = raise_target(rng, hand, seat, bet, minimum_raise)
+            if target <= bet:
+                call(log, hand, seat, to_call)
+                continue
+            put_in(hand, seat, target - hand.committed[seat])
+            log(
+                f"{tag(hand.table['seats'][seat])} {'bets' if bet == 0 else 'raises to'} "
+                f"{format_amount(target, hand.table['cents'])}{all_in(hand, seat)}"
+            )
+            minimum_raise = max(minimum_raise, target - bet)
+            bet = target
+            raises += 1
+            position = order.index(seat)
+            queue = [
+                other
+                for other in order[position + 1:] + order[:position]
+                if can_act(hand, other)
+            ]
+    return_uncalled(log, hand)
+
+
+def deal(log: Callable[..., None], hand: Hand, board: list[str], street: str, label: str) -> None:
+    """Deal the cards of a street to a board.
+
+    Args:
+        log (Callable[..., None]): Function that writes a row to the log, see make_log.
+        hand (Hand): The hand being played.
+        board (list[str]): The cards dealt to the board so far, the new cards are added to it.
+        street (str): The street, see STREETS.
+        label (str): Name of the street in the log.
+
+    Returns:
+        None
+    """
+    new_cards = [hand.deck.pop() for _ in range(dict(STREETS)[street])]
+    if street == "Flop":
+        log(f"{label}:  [{format_cards(new_cards)}]")
+    else:
+        log(f"{label}: {format_cards(board)} [{format_cards(new_cards)}]")
+    board.extend(new_cards)
+
+
+def play_streets(rng: Random, log: Callable[..., None], hand: Hand) -> Optional[list[str]]:
+    """Deal the flop, turn and river with a round of betting after each of them, while two or more
+    players are in the hand. Players who are all in may choose to run the board twice.
+
+    Args:
+        rng (Random): The random number generator of the table.
+        log (Callable[..., None]): Function that writes a row to the log, see make_log.
+        hand (Hand): The hand being played.
+
+    Returns:
+        Optional[list[str]]: The board of the second run, None if the board was run once.
+    """
+    seats: dict[int, dict] = hand.table["seats"]
+    board: list[str] = []
+    # Number of streets dealt before the players chose to run it twice
+    run_twice_from: Optional[int] = None
+    for index, (street, _) in enumerate(STREETS):
+        live = [seat for seat in hand.order if seat not in hand.folded]
+        if len(live) < 2:
+            break
+        acting = [seat for seat in live if seats[seat]["stack"] > 0]
+        if (
+            run_twice_from is None
+            and len(acting) < 2
+            and len(live) == 2
+            and rng.random() < P_RUN_TWICE
+        ):
+            run_twice_from = index
+            for seat in live:
+                log(f"{tag(seats[seat])} chooses to  run it twice.", same_time=True)
+            log("All players in hand choose to run it twice.", same_time=True)
+        deal(log, hand, board, street, street)
+        for seat in hand.committed:
+            hand.committed[seat] = 0
+        if len(acting) >= 2:
+            betting_round(rng, log, hand, 0, 0)
+    if run_twice_from is None:
+        return None
+    second_board = board[: sum(count for _, count in STREETS[:run_twice_from])]
+    for street, _ in STREETS[run_twice_from:]:
+        deal(log, hand, second_board, street, f"{street} (second run)")
+    return second_board
+
+
+def showdown(
+    rng: Random, log: Callable[..., None], hand: Hand, second_board: Optional[list[str]]
+) -> None:
+    """Show the cards of the players left in the hand, pay the pots and end the hand.
+
+    Args:
+        rng (Random): The random number generator of the table.
+        log (Callable[..., None]): Function that writes a row to the log, see make_log.
+        hand (Hand): The hand being played.
+        second_board (Optional[list[str]]): The board of the second run, None if the board was run
+            once.
+
+    Returns:
+        None
+    """
+    table = hand.table
+    seats: dict[int, dict] = table["seats"]
+    live = [seat for seat in hand.order if seat not in hand.folded]
+    split = table["game"] == "omahahilo"
+    won: dict[int, int] = {}
+    if len(live) > 1:
+        for seat in live:
+            log(f"{tag(seats[seat])} shows a {format_cards(hand.cards[seat])}.", same_time=True)
+        if second_board is None:
+            won = distribute(rng, hand.contributed, live, split)
+        else:
+            # Each run is played for half of the pot
+            for run in range(2):
+                half = {
+                    seat: amount // 2 + (amount % 2 if run == 0 else 0)
+                    for seat, amount in hand.contributed.items()
+                }
+                for seat, amount in distribute(rng, half, live, split).items():
+                    won[seat] = won.get(seat, 0) + amount
+    else:
+        won = {live[0]: sum(hand.contributed.values())}
+    for seat, amount in won.items():
+        seats[seat]["stack"] += amount
+        log(
+            f"{tag(seats[seat])} collected {format_amount(amount, table['cents'])} from pot",
+            same_time=True,
+        )
+    log(f"-- ending hand #{table['hand_number']} --", same_time=True)
+    if len(live) == 1 and rng.random() < P_SHOW_AFTER:
+        log(f"{tag(seats[live[0]])} shows a {format_cards(hand.cards[live[0]])}.", delay=800)
+
+
+def play_hand(rng: Random, log: Callable[..., None], table: dict) -> None:
+    """Simulate a hand and write it to the log.
+
+    Args:
+        rng (Random): The random number generator of the table.
+        log (Callable[..., None]): Function that writes a row to the log, see make_log.
+        table (dict): The state of the table.
+
+    Returns:
+        None
+    """
+    hand = start_hand(rng, log, table)
+    if hand is None:
+        return
+    first_to_act, current_bet = post_blinds(rng, log, hand)
+    betting_round(rng, log, hand, first_to_act, current_bet)
+    second_board = play_streets(rng, log, hand)
+    showdown(rng, log, hand, second_board)
+
+
+def change_blinds(log: Callable[..., None], table: dict) -> None:
+    """Change the blind structure, the blinds double and go back to the starting stakes at the next
+    change.
+
+    Args:
+        log (Callable[..., None]): Function that writes a row to the log, see make_log.
+        table (dict): The state of the table.
+
+    Returns:
+        None
+    """
+    factor = 2 if table["big_blind"] == table["base_big_blind"] else 1
+    changes = (
+        ("small blind", "small_blind", table["base_small_blind"] * factor),
+        ("big blind", "big_blind", table["base_big_blind"] * factor),
+    )
+    same_time = False
+    for label, key, amount in changes:
+        log(
+            f"The game's {label} was changed from {format_amount(table[key], table['cents'])} to "
+            f"{format_amount(amount, table['cents'])}.",
+            same_time=same_time,
+        )
+        table[key] = amount
+        same_time = True
+
+
+def between_hands(rng: Random, log: Callable[..., None], table: dict) -> None:
+    """Simulate what happens at the table between hands: add-ons, players leaving and joining, and
+    changes to the blind structure.
+
+    Args:
+        rng (Random): The random number generator of the table.
+        log (Callable[..., None]): Function that writes a row to the log, see make_log.
+        table (dict): The state of the table.
+
+    Returns:
+        None
+    """
+    seats: dict[int, dict] = table["seats"]
+    cents = table["cents"]
+    buy_in = 100 * table["base_big_blind"]
+    for seat, player in list(seats.items()):
+        if player["stack"] >= table["big_blind"] * 2:
+            continue
+        if seat == table["hero_seat"] or rng.random() < P_ADD_ON:
+            player["stack"] += buy_in
+            log(
+                f"The player {tag(player)} adding {format_amount(buy_in, cents)} chips to the "
+                "next hand."
+            )
+        else:
+            log(
+                f"The player {tag(player)} quits the game with a stack of "
+                f"{format_amount(player['stack'], cents)}."
+            )
+            table["pool"].append(player["person"])
+            del seats[seat]
+    if len(seats) > 2 and rng.random() < P_QUIT:
+        seat = rng.choice([seat for seat in seats if seat != table["hero_seat"]])
+        player = seats.pop(seat)
+        log(
+            f"The player {tag(player)} quits the game with a stack of "
+            f"{format_amount(player['stack'], cents)}."
+        )
+        table["pool"].append(player["person"])
+    empty = [seat for seat in range(1, SEATS + 1) if seat not in seats]
+    if empty and table["pool"] and (len(seats) < 3 or rng.random() < P_JOIN * P_QUIT * 10):
+        person = table["pool"].pop(rng.randrange(len(table["pool"])))
+        player = new_player(rng, person, buy_in)
+        player["missed"] = rng.random() < P_MISSED_BLINDS
+        seats[rng.choice(empty)] = player
+        stack = format_amount(buy_in, cents)
+        log(f"The player {tag(player)} requested a seat.")
+        log(f"The admin approved the player {tag(player)} participation with a stack of {stack}.")
+        log(f"The player {tag(player)} joined the game with a stack of {stack}.")
+    if table["level_hands"] and table["hand_number"] % table["level_hands"] == 0:
+        change_blinds(log, table)
+
+
+def write_reversed(source: Path, destination: Path) -> None:
+    """Write the rows of source to destination newest first, the way Poker Now orders a log. The
+    source is read backwards in blocks, so the memory used does not depend on the size of the log.
+
+    Args:
+        source (Path): The rows, oldest first, without a header.
+        destination (Path): The Poker Now csv file to write.
+
+    Returns:
+        None
+    """
+    with source.open(mode="rb") as old_first, destination.open(mode="wb") as new_first:
+        new_first.write(HEADER.encode("UTF-8"))
+        end = old_first.seek(0, io.SEEK_END)
+        remainder = b""
+        while end > 0:
+            start = max(0, end - BLOCK_SIZE)
+            old_first.seek(start)
+            block = old_first.read(end - start) + remainder
+            end = start
+            rows = block.split(b"\n")
+            # The first row of the block may be cut off, it is finished by the next block
+            remainder = rows.pop(0) if start > 0 else b""
+            new_first.writelines(row + b"\n" for row in reversed(rows) if row)
+        if remainder:
+            new_first.write(remainder + b"\n")
+
+
+def new_table(
+    arguments: Namespace, table_number: int, people: dict[str, dict], rng: Random
+) -> dict:
+    """Set up a table with the hero in seat 1 and the other players in random seats.
+
+    Args:
+        arguments (Namespace): The command line arguments.
+        table_number (int): Number of the table, the tables take turns at the games.
+        people (dict[str, dict]): Everyone that played at any table, keyed by name, updated with
+            the people at this table.
+        rng (Random): The random number generator of the table.
+
+    Returns:
+        dict: The state of the table.
+    """
+    small_blind, big_blind = (
+        round(float(amount) * (100 if arguments.cents else 1))
+        for amount in arguments.stakes.split("/")
+    )
+    hero = people.setdefault(
+        arguments.hero, {"name": arguments.hero, "aliases": [arguments.hero], "devices": []}
+    )
+    pool = []
+    for name in rng.sample(FIRST_NAMES, min(len(FIRST_NAMES), arguments.players + 4)):
+        pool.append(people.setdefault(name, {"name": name, "aliases": [], "devices": []}))
+    table = {
+        "game": arguments.games[table_number % len(arguments.games)],
+        "cents": arguments.cents,
+        "small_blind": small_blind,
+        "big_blind": big_blind,
+        "base_small_blind": small_blind,
+        "base_big_blind": big_blind,
+        "ante": round(float(arguments.ante) * (100 if arguments.cents else 1)),
+        "level_hands": arguments.level_hands,
+        "seats": {},
+        "pool": pool,
+        "hero_seat": 1,
+        "button": 0,
+        "previous_seats": [],
+        "hand_number": 0,
+    }
+    table["seats"][1] = new_player(rng, hero, 100 * big_blind)
+    table["seats"][1]["alias"] = arguments.hero
+    for seat in rng.sample(range(2, SEATS + 1), min(SEATS - 1, arguments.players - 1)):
+        table["seats"][seat] = new_player(
+            rng, table["pool"].pop(rng.randrange(len(table["pool"]))), 100 * big_blind
+        )
+    return table
+
+
+def generate_table(arguments: Namespace, table_number: int, people: dict[str, dict]) -> Path:
+    """Simulate a session at a table and write the Poker Now csv file for it.
+
+    Args:
+        arguments (Namespace): The command line arguments.
+        table_number (int): Number of the table, used to seed its random number generator.
+        people (dict[str, dict]): Everyone that played at any table, keyed by name, updated with
+            the people at this table.
+
+    Returns:
+        Path: Path to the Poker Now csv file.
+    """
+    rng = Random(f"{arguments.seed}-{table_number}")
+    table_name = "pgl" + random_id(rng, 22)
+    table = new_table(arguments, table_number, people, rng)
+    start = datetime.fromisoformat(arguments.start).replace(tzinfo=timezone.utc)
+    start_ms = round(start.timestamp() * 1000) + rng.randrange(3_600_000)
+    path = arguments.output / f"poker_now_log_{table_name}.csv"
+    temp_path = path.with_suffix(".rows")
+    with temp_path.open(mode="w", encoding="UTF-8", newline="") as csv_file:
+        log = make_log(csv_file, rng, start_ms)
+        for _ in range(arguments.hands):
+            play_hand(rng, log, table)
+            between_hands(rng, log, table)
+    write_reversed(temp_path, path)
+    os.remove(temp_path)
+    return path
+
+
+def save_identities(path: Path, people: dict[str, dict]) -> None:
+    """Merge the aliases and devices of the generated players into a name-map data model, so the
+    generated logs can be converted without input from the user.
+
+    Args:
+        path (Path): Path to the name-map json file.
+        people (dict[str, dict]): Everyone that played at any table, keyed by name.
+
+    Returns:
+        None
+    """
+    name_map: dict[str, dict[str, list[str]]] = {}
+    if path.exists():
+        with path.open(mode="r", encoding="utf-8") as map_file:
+            name_map = json.load(map_file)
+    for name, person in people.items():
+        entry = name_map.setdefault(name, {"nicknames": [], "devices": []})
+        for key, values in (("nicknames", person["aliases"]), ("devices", person["devices"])):
+            entry[key].extend(value for value in values if value not in entry[key])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open(mode="w", encoding="utf-8") as map_file:
+        json.dump(dict(sorted(name_map.items())), map_file, indent=4)
+
+
+def parse_arguments() -> Namespace:
+    """Parse the command line arguments.
+
+    Returns:
+        Namespace: The command line arguments.
+    """
+    parser = ArgumentParser(description="Generate synthetic Poker Now hand history csv files.")
+    parser.add_argument("--tables", type=int, default=1, help="number of logs to write")
+    parser.add_argument("--hands", type=int, default=1000, help="number of hands per log")
+    parser.add_argument("--players", type=int, default=6, help="players seated at the start")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random numbers")
+    parser.add_argument(
+        "--games",
+        nargs="+",
+        choices=sorted(GAMES),
+        default=sorted(GAMES),
+        help="games played, the tables take turns",
+    )
+    parser.add_argument("--stakes", default="10/20", help="small blind/big blind")
+    parser.add_argument("--ante", default="0", help="ante posted by every player")
+    parser.add_argument(
+        "--cents", action="store_true", help="the stakes are in dollars and cents, e.g. 0.10/0.20"
+    )
+    parser.add_argument(
+        "--level-hands",
+        type=int,
+        default=200,
+        help="hands between changes of the blind structure, 0 to never change it",
+    )
+    parser.add_argument("--hero", default="K Godel", help="alias of the player that owns the logs")
+    parser.add_argument(
+        "--start", default="2023-01-01T00:00:00", help="UTC time the sessions start"
+    )
+    parser.add_argument(
+        "--output", type=Path, default=Path("PokerNowHandHistory"), help="folder for the logs"
+    )
+    parser.add_argument(
+        "--name-map", type=Path, help="name-map json file to add the generated players to"
+    )
+    return parser.parse_args()
+
+
+# END OF FUNCTIONS
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# CODE
+if __name__ == "__main__":
+    args = parse_arguments()
+    args.output.mkdir(parents=True, exist_ok=True)
+    generated_people: dict[str, dict] = {}
+    for number in range(args.tables):
+        log_path = generate_table(args, number, generated_people)
+        print(f"Wrote {args.hands} hands to {log_path}")
+    if args.name_map is not None:
+        save_identities(args.name_map, generated_people)
+# end of code
+# *************************************************************************************************
@@ -0,0 +1,627 @@
+# hand_parser.py
+"""
+****************************************************************************************************
+WHAT THIS DOES
+
+Convert the text of a hand separated from a Poker Now log by main.py to a hand history in the Open
+Hand History (OHH) format. Each line of the hand is parsed by the first of the line_parsers whose
+regular expression matches it. The amounts are kept in integer cents until the hand is serialized,
+and the hand does not depend on the hero until it is rendered.
+****************************************************************************************************
+"""
+# MODULES
+from dataclasses import dataclass, field
+import logging
+import re
+from typing import Callable, Optional
+
+from constants import (
+    ACTION,
+    ACTION_NUMBER,
+    ACTIONS,
+    AMOUNT,
+    ANTE_AMOUNT,
+    BET_LIMIT,
+    BET_TYPE,
+    BIG_BLIND_AMOUNT,
+    CARDS,
+    CONTRIBUTED_RAKE,
+    CURRENCY,
+    DATETIME,
+    DEALER_NAME,
+    DEALER_SEAT,
+    DISPLAY,
+    FLAGS,
+    GAME_NUMBER,
+    GAME_TYPE,
+    HERO_PLAYER_ID,
+    ID,
+    INTERNAL_VERSION,
+    IS_ALL_IN,
+    NAME,
+    NETWORK_NAME,
+    NUMBER,
+    PLAYER_ID,
+    PLAYER_STACKS,
+    PLAYER_WINS,
+    PLAYERS,
+    POTS,
+    RAKE,
+    ROUNDS,
+    SEAT,
+    SHOW_DOWN,
+    SITE_NAME,
+    SMALL_BLIND_AMOUNT,
+    SPEC_VERSION,
+    START_DATE_UTC,
+    STARTING_STACK,
+    STREET,
+    TABLE,
+    TABLE_NAME,
+    TABLE_SIZE,
+    TEXT,
+    TOURNAMENT,
+    TOURNAMENT_INFO,
+    WIN_AMOUNT,
+)
+
+# END MODULES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# DATA STRUCTURES
+@dataclass
+class HandState:
+    """The state of parse_hand while the lines of a hand are parsed, see line_parsers.
+
+    Attributes:
+        ohh (dict): The hand history being converted, in JSON following the OHH format. The players
+            and the finished rounds are appended to it as they are parsed.
+        player_ids (dict[str, int]): The id of each player in the hand, by alias.
+        current_round (str): The street of the round being parsed.
+        round_obj (dict): The round being parsed, it is appended to the rounds of the hand when the
+            next round starts.
+        round_commit (dict[str, int]): The cents each player put in the pot in the round, by alias.
+        action_number (int): The number of the next action of the round.
+        stack_changes (dict[str, int]): The cents won minus the cents put in the pot by each
+            player, by alias, used to check the stacks.
+    """
+
+    ohh: dict
+    player_ids: dict[str, int] = field(default_factory=dict)
+    current_round: str = ""
+    round_obj: dict = field(default_factory=lambda: {ID: 0, STREET: "", CARDS: [], ACTIONS: []})
+    round_commit: dict[str, int] = field(default_factory=dict)
+    action_number: int = 0
+    stack_changes: dict[str, int] = field(default_factory=dict)
+
+
+# END DATA STRUCTURES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# LOOKUP TABLE
+structures = {"Pot Limit": "PL", "No Limit": "NL"}
+
+games = {
+    "Texas Hold'em": "Holdem",
+    "Omaha Hi/Lo 8 or Better": "OmahaHiLo",
+    "Omaha Hi": "Omaha",
+}
+
+first_rounds = {
+    "Holdem": "Preflop",
+    "Omaha": "Preflop",
+    "OmahaHiLo": "Preflop",
+}
+
+make_new_round = {
+    "Player stacks": "Preflop",
+    "Flop": "Flop",
+    "Flop (second run)": "Flop",
+    "Turn": "Turn",
+    "Turn (second run)": "Turn",
+    "River": "River",
+    "River (second run)": "River",
+    "Show Down": "Showdown",
+}
+
+post_types = {
+    "posts an ante": "Post Ante",
+    "posts a big blind": "Post BB",
+    "posts a small blind": "Post SB",
+    "posts a straddle": "Straddle",
+    "posts a missing small blind": "Post Dead",
+    "posts a missed big blind": "Post Extra Blind",
+}
+
+verb_to_action = {
+    "bets": "Bet",
+    "calls": "Call",
+    "raises": "Raise",
+    "folds": "Fold",
+    "checks": "Check",
+}
+# END LOOKUP TABLES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# FUNCTIONS
+def parse_hand(
+    game_number: str,
+    hand: dict,
+    constants: dict[str, str],
+    resolve_name: Callable[[str, str], str],
+) -> tuple[dict, dict[str, int], int]:
+    """Process the text of a hand looking for player actions and convert the hand to the OHH format.
+    The hand does not depend on the hero until it is rendered by render_hand. The amounts are kept
+    in cents until the hand is serialized, see encode_ohh.
+
+    Args:
+        game_number (str): The unique identifier of the hand.
+        hand (dict): The hand from the hands dictionary returned by separate_hands.
+        constants (dict[str, str]): The spec_version, site_name, network_name, internal_version and
+            currency of the hand, from the [OHH Constants] section of config.ini.
+        resolve_name (Callable[[str, str], str]): Get the name of a player from their alias and
+            device ID.
+
+    Returns:
+        tuple[dict, dict[str, int], int]: The hand history in JSON following the OHH format, the
+        cents won minus the cents put in the pot by each player, by alias, and the number of lines
+        that were not processed.
+    """
+    unprocessed_count: int = 0
+    # initialize the OHH JSON populating as many fields as possible and initializing arrays.
+    ohh = {
+        SPEC_VERSION: constants[SPEC_VERSION],
+        SITE_NAME: constants[SITE_NAME],
+        NETWORK_NAME: constants[NETWORK_NAME],
+        INTERNAL_VERSION: constants[INTERNAL_VERSION],
+    }
+    if TOURNAMENT_INFO in hand:
+        ohh[TOURNAMENT] = True
+        ohh[TOURNAMENT_INFO] = hand[TOURNAMENT_INFO]
+    ohh |= {
+        GAME_NUMBER: game_number,
+        START_DATE_UTC: hand[DATETIME],
+        TABLE_NAME: hand[TABLE],
+        # Translate values from lookup tables, a game or betting structure that is not in the
+        # lookup tables quarantines the hand
+        GAME_TYPE: games[hand[GAME_TYPE]],
+        BET_LIMIT: {BET_TYPE: structures[hand[BET_TYPE]]},
+        TABLE_SIZE: 10,
+        CURRENCY: constants[CURRENCY],
+        DEALER_SEAT: 1,
+        SMALL_BLIND_AMOUNT: hand[SMALL_BLIND_AMOUNT],
+        BIG_BLIND_AMOUNT: hand[BIG_BLIND_AMOUNT],
+        ANTE_AMOUNT: hand[ANTE_AMOUNT],
+        HERO_PLAYER_ID: None,
+        FLAGS: [],
+        PLAYERS: [],
+        ROUNDS: [],
+        POTS: [],
+    }
+    state = HandState(ohh, current_round=first_rounds[ohh[GAME_TYPE]])
+    # Split the hand text and loop through it line by line looking for regular expressions
+    # to parse.
+    for line in hand[TEXT].strip().splitlines(False):
+        if not parse_line(state, line, resolve_name):
+            unprocessed_count += 1
+            logging.debug(f"[{hand[TABLE]}][{game_number}] '{line}' was not processed.")
+    # If the player is the dealer, set the value of the dealers seat number in the ohh dictionary
+    for player in ohh[PLAYERS]:
+        if player[DISPLAY] == hand[DEALER_NAME]:
+            ohh[DEALER_SEAT] = player[SEAT]
+    for pot in ohh[POTS]:
+        # The chips put in the pot are the chips won minus the stack changes of the players
+        total_pot = pot[AMOUNT] - sum(state.stack_changes.values())
+        if pot[AMOUNT] != total_pot:
+            logging.debug(
+                f"[{hand[TABLE]}][{game_number}] Calculated pot ({total_pot / 100})"
+                f"does not equal collected pot ({pot[AMOUNT] / 100})"
+            )
+    ohh[ROUNDS].append(state.round_obj)
+    return ohh, state.stack_changes, unprocessed_count
+
+
+def parse_line(
+    state: HandState, line: str, resolve_name: Callable[[str, str], str]
+) -> bool:
+    """Parse a line of the text of a hand. The seated players are looked for in every line, then
+    the first of the line_parsers that matches the line parses it.
+
+    Args:
+        state (HandState): The state of the hand being parsed.
+        line (str): The line of the hand.
+        resolve_name (Callable[[str, str], str]): Get the name of a player, see parse_hand.
+
+    Returns:
+        bool: Whether the line was processed.
+    """
+    parse_seats(state, line, resolve_name)
+    for matcher, parser in line_parsers:
+        match = matcher(line)
+        if match is not None:
+            parser(state, match)
+            return True
+    return False
+
+
+def parse_seats(
+    state: HandState, line: str, resolve_name: Callable[[str, str], str]
+) -> None:
+    """Add the seated players of a line and their starting chip amount to the players of the hand.
+
+    Args:
+        state (HandState): The state of the hand being parsed.
+        line (str): The line of the hand.
+        resolve_name (Callable[[str, str], str]): Get the name of a player, see parse_hand.
+
+    Returns:
+        None
+    """
+    player_id: int = 0
+    for player in re.finditer(seats_regex, line):
+        player_display: str = player.group("player")
+        state.ohh[PLAYERS].append(
+            {
+                ID: player_id,
+                SEAT: int(player.group("seat")),
+                NAME: resolve_name(player_display, player.group("device_id")),
+                DISPLAY: player_display,
+                STARTING_STACK: to_cents(player.group("amount")),
+            }
+        )
+        # The OHH standard has a unique identifier for every player within the hand.
+        # This id is used to identify the player in all other locations of the hand
+        # history. Therefore, it is convenient to creat a dictionary to easily pull
+        # out the id of each player when needed.
+        state.player_ids[player_display] = player_id
+        state.stack_changes[player_display] = 0
+        player_id += 1
+
+
+def add_action(state: HandState, player: Optional[str], action: dict) -> None:
+    """Add an action to the round being parsed.
+
+    Args:
+        state (HandState): The state of the hand being parsed.
+        player (str, optional): The alias of the player of the action, None for the cards dealt to
+            the hero, the player is set when the hand is rendered, see render_hand.
+        action (dict): The fields of the action that follow the player id.
+
+    Returns:
+        None
+    """
+    state.round_obj[ACTIONS].append(
+        {
+            ACTION_NUMBER: state.action_number,
+            PLAYER_ID: None if player is None else state.player_ids[player],
+        }
+        | action
+    )
+    state.action_number += 1
+
+
+def start_round(state: HandState, street: str, cards: Optional[list[str]]) -> None:
+    """Add the round being parsed to the rounds of the hand and start a new one.
+
+    Args:
+        state (HandState): The state of the hand being parsed.
+        street (str): The street of the new round.
+        cards (list[str], optional): The cards of the new round, None for the show down.
+
+    Returns:
+        None
+    """
+    state.ohh[ROUNDS].append(state.round_obj)
+    state.round_obj = {ID: len(state.ohh[ROUNDS]), STREET: street}
+    if cards is not None:
+        state.round_obj[CARDS] = cards
+    state.round_obj[ACTIONS] = []
+    state.action_number = 0
+    state.round_commit = dict.fromkeys(state.player_ids, 0)
+
+
+def parse_post(state: HandState, post: re.Match) -> None:
+    """Parse a posted blind or ante, this also indicates that the dealing is happening and we
+    should move to the phase of assembling rounds of actions.
+
+    Args:
+        state (HandState): The state of the hand being parsed.
+        post (re.Match): The match of post_regex.
+
+    Returns:
+        None
+    """
+    player = post.group("player")
+    action = post_types[post.group("type")]
+    amount = to_cents(post.group("amount"))
+    state.round_obj[ID] = len(state.ohh[ROUNDS])
+    state.round_obj[STREET] = state.current_round
+    # Poker now records the amounts associated with actions such as bets, raises,
+    # calls, and posting blinds as the the sum total of the current and all previous
+    # actions of the player during the round. However, the OHH standard requires the
+    # amount put in from the current action rather than the sum total of the round.
+    # This difference in accounting methods requires the amount commited by each
+    # player in the round to be rcorded in a dictionary
+    # {player1: amount, player2: amount, ...}.
+    # The amount the player has commited to the round can then be subtracted from
+    # the current amount to get the amount commited in the action, that OHH
+    # requires. There is one exception to this rule, in the case of a dead blind
+    # being posted by a player who missed the blinds. Posting a missed SB is
+    # considered a "dead" and is not considered to be a amount commited, but a
+    # missed BB is a "live"blind and should be added to the amount commited to the
+    # round.
+    if action not in ("Post Dead", "Post Ante"):
+        amount -= state.round_commit[player]
+        state.round_commit[player] += amount
+    add_action(
+        state,
+        player,
+        {ACTION: action, AMOUNT: amount, IS_ALL_IN: post.group("all_in") is not None},
+    )
+    state.stack_changes[player] -= amount
+
+
+def parse_round(state: HandState, round_marker: re.Match) -> None:
+    """Parse a round marker, note that cards dealt are melded together with opening round and do
+    not necessarily mark a new round.
+
+    Args:
+        state (HandState): The state of the hand being parsed.
+        round_marker (re.Match): The match of round_regex.
+
+    Returns:
+        None
+    """
+    label = round_marker.group("street")
+    if label == PLAYER_STACKS:
+        state.action_number = 0
+        state.round_obj[ID] = len(state.ohh[ROUNDS])
+        state.current_round = first_rounds[state.ohh[GAME_TYPE]]
+        state.round_obj[STREET] = state.current_round
+        state.round_commit = dict.fromkeys(state.player_ids, 0)
+    elif label in make_new_round:
+        # Make new round we need to add current round object to the OHH JSON and make a clean one
+        state.current_round = make_new_round[label]
+        cards_match = re.search(cards_regex, round_marker.string)
+        start_round(
+            state,
+            state.current_round,
+            [] if cards_match is None else cards_match.group("cards").split(", "),
+        )
+
+
+def parse_show(state: HandState, show_hand: re.Match) -> None:
+    """Parse the cards shown by a player, the first cards shown start the show down.
+
+    Args:
+        state (HandState): The state of the hand being parsed.
+        show_hand (re.Match): The match of show_regex.
+
+    Returns:
+        None
+    """
+    if state.current_round != SHOW_DOWN:
+        state.current_round = SHOW_DOWN
+        start_round(state, make_new_round[SHOW_DOWN], None)
+    add_action(
+        state,
+        show_hand.group("player"),
+        {ACTION: "Shows Cards", CARDS: show_hand.group("cards").split(", "), IS_ALL_IN: False},
+    )
+    state.round_commit = dict.fromkeys(state.player_ids, 0)
+
+
+def parse_add_on(state: HandState, add_on: re.Match) -> None:
+    """Parse the chips added by a player.
+
+    Args:
+        state (HandState): The state of the hand being parsed.
+        add_on (re.Match): The match of addon_regex.
+
+    Returns:
+        None
+    """
+    player = add_on.group("player")
+    if state.current_round is not None and player in state.player_ids:
+        add_action(
+            state,
+            player,
+            {AMOUNT: to_cents(add_on.group("amount")), ACTION: "Added Chips"},
+        )
+
+
+def parse_hero_hand(state: HandState, hero_hand: re.Match) -> None:
+    """Parse the cards dealt to the hero.
+
+    Args:
+        state (HandState): The state of the hand being parsed.
+        hero_hand (re.Match): The match of hero_hand_regex.
+
+    Returns:
+        None
+    """
+    add_action(
+        state,
+        None,
+        {ACTION: "Dealt Cards", CARDS: hero_hand.group("cards").split(", "), IS_ALL_IN: False},
+    )
+
+
+def parse_non_bet_action(state: HandState, non_bet_action: re.Match) -> None:
+    """Parse an action that does not put chips in the pot.
+
+    Args:
+        state (HandState): The state of the hand being parsed.
+        non_bet_action (re.Match): The match of non_bet_action_regex.
+
+    Returns:
+        None
+    """
+    add_action(
+        state,
+        non_bet_action.group("player"),
+        {
+            ACTION: verb_to_action[non_bet_action.group("player_action")],
+            AMOUNT: 0,
+            IS_ALL_IN: False,
+        },
+    )
+
+
+def parse_bet_action(state: HandState, bet_action: re.Match) -> None:
+    """Parse a bet, raise or call.
+
+    Args:
+        state (HandState): The state of the hand being parsed.
+        bet_action (re.Match): The match of bet_action_regex.
+
+    Returns:
+        None
+    """
+    player = bet_action.group("player")
+    does = bet_action.group("player_action")
+    amount = to_cents(bet_action.group("amount"))
+    if does in ("raises", "calls"):
+        amount -= state.round_commit[player]
+    state.round_commit[player] += amount
+    state.stack_changes[player] -= amount
+    add_action(
+        state,
+        player,
+        {
+            ACTION: verb_to_action[does],
+            AMOUNT: amount,
+            IS_ALL_IN: bet_action.group("all_in") is not None,
+        },
+    )
+
+
+def parse_uncalled_bet(state: HandState, uncalled_bet: re.Match) -> None:
+    """Parse an uncalled bet returned to a player.
+
+    Args:
+        state (HandState): The state of the hand being parsed.
+        uncalled_bet (re.Match): The match of uncalled_regex.
+
+    Returns:
+        None
+    """
+    state.stack_changes[uncalled_bet.group("player")] += to_cents(uncalled_bet.group("amount"))
+
+
+def parse_winner(state: HandState, winner: re.Match) -> None:
+    """Parse the chips collected by a player, they are added to the pot of the hand.
+
+    Args:
+        state (HandState): The state of the hand being parsed.
+        winner (re.Match): The match of winner_regex.
+
+    Returns:
+        None
+    """
+    player = winner.group("player")
+    amount = to_cents(winner.group("amount"))
+    player_id = state.player_ids[player]
+    state.stack_changes[player] += amount
+    if not state.ohh[POTS]:
+        state.ohh[POTS].append({NUMBER: 0, AMOUNT: 0, RAKE: 0, PLAYER_WINS: []})
+    pot = state.ohh[POTS][0]
+    for player_win in pot[PLAYER_WINS]:
+        if player_win[PLAYER_ID] == player_id:
+            break
+    else:
+        player_win = {PLAYER_ID: player_id, WIN_AMOUNT: 0, CONTRIBUTED_RAKE: 0}
+        pot[PLAYER_WINS].append(player_win)
+    pot[AMOUNT] += amount
+    player_win[WIN_AMOUNT] += amount
+
+
+def parse_run_twice(state: HandState, _: re.Match) -> None:
+    """Flag a hand with the option to run it twice. There are several lines in the csv file that
+    will contain the string "run it twice" but the only line that will have made it this far will
+    indicate that all players approved.
+
+    Args:
+        state (HandState): The state of the hand being parsed.
+        _ (re.Match): The match of run_twice_regex.
+
+    Returns:
+        None
+    """
+    state.ohh[FLAGS].append("Run_It_Twice")
+
+
+def to_cents(amount: str) -> int:
+    """Parse an amount from the log or config.ini as an integer number of cents, so the amounts of a
+    hand add up exactly.
+
+    Args:
+        amount (str): The amount, a whole number or a number with up to 2 decimals.
+
+    Returns:
+        int: The amount in cents.
+    """
+    whole, _, decimals = amount.strip().partition(".")
+    return int(whole or "0") * 100 + int((decimals + "00")[:2])
+
+
+# END OF FUNCTIONS
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# CODE
+# Compile regular expressions for matching to identifiable strings in the hand history
+seats_regex = re.compile(
+    r" #(?P<seat>\d+) \"(?P<player>.+?) @ (?P<device_id>[-\w]+)\" \((?P<amount>\d+\.\d{2}|\d+)\)"
+)
+post_regex = re.compile(
+    r"\"(?P<player>.+?) @ (?P<device_id>[-\w]+)\" (?P<type>posts .+) "
+    r"of (?P<amount>\d+\.\d{2}|\d+)\s*(?P<all_in>[a-z ]+)*"
+)
+round_regex = re.compile(r"(?P<street>^\w.+):.+")
+cards_regex = re.compile(r"\[(?P<cards>.+)\]")
+addon_regex = re.compile(
+    r"(?P<player>.+?) @ (?P<device_id>[-\w]+)\" adding (?P<amount>\d+\.\d{2}|\d+)"
+)
+hero_hand_regex = re.compile(r"Your hand is (?P<cards>.+)")
+non_bet_action_regex = re.compile(
+    r"\"(?P<player>.+?) @ (?P<device_id>[-\w]+)\" (?P<player_action>\w+(?![ a-z]+(?:\d+\.\d{2}|\d+)))"
+)
+bet_action_regex = re.compile(
+    r"\"(?P<player>.+?) @ (?P<device_id>[-\w]+)\" (?!collected)(?!shows)(?P<player_action>\w+) "
+    r"[a-z]*\s*(?P<amount>\d+\.\d{2}|\d+)\s*(?P<all_in>[a-z ]+)*"
+)
+uncalled_regex = re.compile(
+    r"Uncalled bet of (?P<amount>\d+\.\d{2}|\d+) .+ \"(?P<player>.+?) @ (?P<device_id>[-\w]+)\""
+)
+show_regex = re.compile(
+    r"\"(?P<player>.+?) @ (?P<device_id>[-\w]+)\" "
+    r"(?P<player_action>\w+) a (?P<cards>[\dAKQJTshcd, ]+)\."
+)
+winner_regex = re.compile(
+    r"\"(?P<player>.+?) @ (?P<device_id>[-\w]+)\" (?P<player_action>collected) "
+    r"(?P<amount>\d+\.\d{2}|\d+).+"
+)
+run_twice_regex = re.compile(r"run it twice")
+# The parser of each kind of line of a hand, the first that matches a line parses it, see parse_line
+line_parsers = (
+    (post_regex.match, parse_post),
+    (round_regex.match, parse_round),
+    (show_regex.search, parse_show),
+    (addon_regex.match, parse_add_on),
+    (hero_hand_regex.match, parse_hero_hand),
+    (non_bet_action_regex.match, parse_non_bet_action),
+    (bet_action_regex.match, parse_bet_action),
+    (uncalled_regex.match, parse_uncalled_bet),
+    (winner_regex.match, parse_winner),
+    (run_twice_regex.search, parse_run_twice),
+)
+# end of code
+# **************************************************************************************************
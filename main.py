@@ -15,7 +15,8 @@ Finally, we output the new JSON.
 
 KEY ASSUMPTIONS
 
-Working with Ring games only, not tournaments
+Working with Ring games and Poker Now tournaments, a log is converted as a tournament when players
+are put in the tournament or moved between its tables
 
 Change Log
 
@@ -66,19 +67,240 @@ v 1.2.4
 v 1.2.5
     - Fixed issue #50
     - Fixed issue #52
+v 1.3.0
+    - Output files are committed atomically (temp file, fsync, rename, folder fsync) and a Poker Now
+      csv file is only moved to the archive folder after its hand histories have been committed. An
+      interrupted batch resumes from the first file that was not committed.
+    - Files are processed in a pipeline, reader threads read and separate the next files, parser
+      threads convert the hands and a writer thread commits the output. The logs of a table are
+      parsed in order by one parser thread and the files are committed in the order of the batch.
+      A log that fails is reported at the end of the batch and left in the work queue without
+      stopping the other files. The number of reader and parser threads and the number of files
+      waiting between stages are set in the [Pipeline] section of config.ini. A batch of one log or
+      a batch converted on one CPU does not gain from the threads, it is converted file by file.
+    - Converted hands can be validated against the OHH schema while the files are converted. The
+      [Validation] section of config.ini sets the mode to full, sampled or off, invalid hands are
+      logged by game number.
+    - A live dashboard shows the progress of the batch (files and hands done, lines/sec, hands/sec,
+      ETA and the slowest table) with the latest messages of the batch under it. When the output is
+      not a terminal the progress is printed as plain lines at the interval set in the [Progress]
+      section of config.ini.
+    - Added the command line options --since, --until and --table to convert only the hands in a
+      time range or at some tables. The end of the range is rounded up to the precision it is given
+      at, --until 01:00 includes the hands started up to 01:00:59.999. The time range is found with
+      a binary search over the rows of the file, so only the hands inside the range are read. Files
+      converted with a time range are not archived.
+    - Hand histories can be rendered for more than one hero from a single parse of the log. The
+      heroes setting in config.ini lists the other heroes, the output for each of them is written to
+      a folder with the name of the hero inside the Heroes folder.
+    - A hand that cannot be converted no longer stops the conversion of the file. The lines of the
+      hand and the error are written to a file for the hand in the folder of the table in the
+      Quarantine folder and the number of quarantined hands is reported at the end of the run.
+    - Added generate_logs.py to write synthetic Poker Now logs of any size from a seed, with the
+      players added to the name-map so the logs convert without input, for scale and load testing.
+    - Added the --serve option to run the converter as a local HTTP service. A Poker Now csv file
+      posted to /convert is streamed back as NDJSON or pretty OHH while the hands are converted, and
+      the config and name-map data model stay loaded between requests. The [Server] section of
+      config.ini sets the address, the number of files converted at the same time and what to do
+      with players that are not in the name-map data model (name them by their alias or quarantine
+      the hand). The service only reads name-map.json, it is loaded again when the file changes and
+      new players or devices are logged instead of being added.
+    - Added the --tail option for logs of sessions that are still being played. The state of each
+      table is saved in the Tail folder, so the next run reads only the rows logged since then and
+      appends the newly finished hands to the .ohh file. The log is not archived in tail mode.
+    - Logs compressed as .csv.gz or .csv.zst (needs the zstandard package) and .zip files holding
+      several logs are streamed without being extracted to disk. Each member of a .zip file that
+      is named like a Poker Now log is converted as a table, and the compressed file is archived
+      once all of its logs are committed, including the logs skipped by --table.
+    - The output can be partitioned by the date the hands started, by table or by whether the hero
+      played the hand, each partition is a folder in the output folder of the hero. The hands of a
+      log in a partition roll over to a new part file at the size or number of hands set in the
+      [Output] section of config.ini.
+    - The stacks are checked from hand to hand while the hands are converted. A starting stack that
+      is not the stack the player had after their last hand at the table, allowing for stacks
+      changed between hands, is logged with the game number.
+    - Tournament logs are converted in the same pass as ring games. The hands of a tournament have
+      the tournament_info of the OHH format with the blind levels, the initial stack and the type
+      of the tournament, and the eliminations and re-entries at each table are written as a
+      summary in the OpenTournamentSummary folder. The buy-in, fees, name and speed are set in the
+      [Tournament] section of config.ini.
+    - Hand histories can also be written as PokerStars text (.txt files) for tools that do not read
+      the OHH format. The formats setting of the [Output] section of config.ini lists the formats
+      to write, every format is rendered from the same parse of the log. The service returns
+      PokerStars text with format=pokerstars.
+    - Amounts are parsed as integer cents and only converted to decimals while the hand histories
+      are written as JSON, so pots and stacks add up exactly without rounding.
+    - The parsed hands of each log are saved to a compressed cache in the Cache folder. The
+      --rerender option writes the outputs again from the cache with the current config (hero,
+      site, network, currency and versions) without parsing the logs. The least recently used
+      entries are evicted when the cache is larger than the max_bytes setting of the [Cache]
+      section of config.ini, except the entry just saved, and entries saved by another version of
+      the parsed hands are not used. The outputs of a log that the current config does not write
+      again, such as the files of another partition layout, are removed by --rerender.
+    - Added reencode_ohh.py to re-encode existing .ohh files as NDJSON, compact NDJSON or gzip, or
+      to upgrade their spec_version and internal_version, without converting the logs again. The
+      files are streamed one hand history at a time by a pool of processes.
+    - The aliases and devices of a log that are not in the name-map data model are collected while
+      the hands are separated and resolved before the hands are parsed. The user is prompted for
+      all of them at once and name-map.json is written once for the log, so the parsing of the
+      hands is not stopped by prompts.
+    - main.py only converts when it is run as a script, so its functions can be imported. Added
+      tests in the tests folder, run them with python -m pytest.
+    - The subsystems of the converter are modules of their own: csv_logs.py reads the logs,
+      hand_parser.py converts the hands, name_map.py keeps the name-map data model,
+      validation.py validates the hands, output.py, pokerstars.py and cache.py write the outputs,
+      dashboard.py shows the progress and service.py runs the local HTTP service.
 ****************************************************************************************************
 """
 # MODULES
-from configparser import ConfigParser
-import csv
+from argparse import ArgumentParser, Namespace
+from configparser import ConfigParser, SectionProxy
+from collections import Counter
+from dataclasses import dataclass, field
 from datetime import datetime
 import json
 import logging
+import os
 from pathlib import Path
+from queue import Queue
 import re
+from statistics import median
+import sys
+from threading import BoundedSemaphore, Thread
 from time import perf_counter, process_time
-from typing import List
-from rich.console import Console
+import traceback
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+from cache import cache_directory, load_cache, save_cache
+from constants import (
+    ACTION,
+    ACTIONS,
+    ANTE_AMOUNT,
+    BET_TYPE,
+    BIG_BLIND_AMOUNT,
+    BOUNTY_FEE_AMOUNT,
+    BOUNTY_VALUE_AMOUNT,
+    BUSTED,
+    BUYIN_AMOUNT,
+    BYTES,
+    CACHE,
+    CACHE_SUFFIX,
+    COUNT,
+    CURRENCY,
+    DATETIME,
+    DEALER_NAME,
+    DEFAULT_CONFIG,
+    DISCONTINUITIES,
+    DISPLAY,
+    END_DATE_UTC,
+    ENTRIES,
+    FAILED,
+    FEE_AMOUNT,
+    FILES,
+    FINISH_POSITION,
+    FLAGS,
+    FORMATS,
+    GAME_NUMBER,
+    GAME_TYPE,
+    HANDS,
+    HERO_NAME,
+    HERO_PLAYER_ID,
+    HERO_PLAYER_NAME,
+    HEROES,
+    ID,
+    IGNORED,
+    INITIAL_STACK,
+    INTERNAL_VERSION,
+    INVALID,
+    LAST_GAME_NUMBER,
+    LINES,
+    LOG_SUFFIXES,
+    MAX_BYTES,
+    MAX_HANDS,
+    MODE,
+    NAME,
+    NETWORK_NAME,
+    OFF,
+    OHH,
+    OTS,
+    OUTPUT,
+    PARSED,
+    PARSER_THREADS,
+    PARSING,
+    PARTITION,
+    PIPELINE,
+    PLAYER_COUNT,
+    PLAYER_ID,
+    PLAYER_NAME,
+    PLAYERS,
+    POKERSTARS,
+    PRIZE,
+    PRIZE_POOL,
+    PROGRESS,
+    QUARANTINED,
+    QUEUE_SIZE,
+    READER_THREADS,
+    RESUME_ORDER,
+    ROUND_TIME,
+    ROUNDS,
+    SAMPLE_RATE,
+    SAVED,
+    SERVER,
+    SITE_NAME,
+    SIZES,
+    SLOWEST,
+    SMALL_BLIND_AMOUNT,
+    SPEC_VERSION,
+    SPEED,
+    STACK_CHANGES,
+    START_DATE_UTC,
+    STARTING_STACK,
+    STILL_PLAYING,
+    SURVIVORS,
+    TABLE,
+    TEXT,
+    TICKET_VALUE,
+    TOURNAMENT_CONFIG,
+    TOURNAMENT_FINISHES_AND_WINNINGS,
+    TOURNAMENT_INFO,
+    TOURNAMENT_NAME,
+    TOURNAMENT_NUMBER,
+    TYPE,
+    UNKNOWN_PLAYERS,
+    VALIDATION,
+)
+from csv_logs import (
+    csv_reader,
+    list_logs,
+    locate_range,
+    log_name,
+    open_log,
+    read_rows,
+    select_tables,
+    table_regex,
+    to_order,
+)
+from dashboard import console, print_message, progress, progress_lock, start_progress, stop_progress
+from hand_parser import parse_hand, post_regex, seats_regex, to_cents
+from name_map import name_map_state, refresh_name_map, resolve_name, resolve_players
+from output import (
+    OutputLayout,
+    append_ohh,
+    commit_ohh,
+    commit_partitions,
+    encode_hands,
+    encode_ohh,
+    find_outputs,
+    output_suffixes,
+    partition_hands,
+    remove_outputs,
+    remove_uncommitted,
+    replace_file,
+    uncommitted_path,
+)
+from pokerstars import encode_pokerstars
+from service import serve
+from validation import HandValidation, validate_hand
 
 # END MODULES
 # **************************************************************************************************
@@ -86,167 +308,129 @@ from rich.console import Console
 # **************************************************************************************************
 timer_perf_start = perf_counter()
 timer_proc_start = process_time()
-# CONSTANTS
-CONFIG_FILE = "config.ini"
-TEXT = "text"
-COUNT = "count"
-LATEST = "latest"
-LAST = "last"
-OHH = "ohh"
-HH_VERSION = "hh_version"
-SHOW_DOWN = "Show Down"
-PLAYER_STACKS = "Player stacks"
-DEALER_NAME = "dealer_name"
-TABLE = "table"
-
-# OHH FIELD NAMES
-SPEC_VERSION = "spec_version"
-SITE_NAME = "site_name"
-NETWORK_NAME = "network_name"
-INTERNAL_VERSION = "internal_version"
-GAME_NUMBER = "game_number"
-DATETIME = "datetime"
-START_DATE_UTC = "start_date_utc"
-TABLE_NAME = "table_name"
-GAME_TYPE = "game_type"
-BET_LIMIT = "bet_limit"
-BET_TYPE = "bet_type"
-TABLE_SIZE = "table_size"
-CURRENCY = "currency"
-DEALER_SEAT = "dealer_seat"
-SMALL_BLIND_AMOUNT = "small_blind_amount"
-BIG_BLIND_AMOUNT = "big_blind_amount"
-ANTE_AMOUNT = "ante_amount"
-HERO_PLAYER_ID = "hero_player_id"
-FLAGS = "flags"
-PLAYERS = "players"
-ID = "id"
-SEAT = "seat"
-NAME = "name"
-DISPLAY = "display"
-STARTING_STACK = "starting_stack"
-ROUNDS = "rounds"
-STREET = "street"
-CARDS = "cards"
-ACTIONS = "actions"
-ACTION_NUMBER = "action_number"
-PLAYER_ID = "player_id"
-ACTION = "action"
-AMOUNT = "amount"
-IS_ALL_IN = "is_allin"
-POTS = "pots"
-NUMBER = "number"
-RAKE = "rake"
-PLAYER_WINS = "player_wins"
-WIN_AMOUNT = "win_amount"
-CONTRIBUTED_RAKE = "contributed_rake"
-# END OF OHH FIELD NAMES
-
-# CONSTANTS FOR PROCESSING INI
-HERO_NAME = "hero_name"
-PREFIX = "output_prefix"
-# END SCRIPT LEVEL CONSTANTS
-
-# CONFIGURABLE CONSTANTS
-OHH_CONSTANTS = "OHH Constants"
-DIRECTORIES = "Directories"
-CONFIG_DIR = "config_dir"
-LOG_DIR = "log_dir"
-
-DEFAULT_CONFIG = {
-    OHH_CONSTANTS: {
-        SPEC_VERSION: "1.2.2",
-        INTERNAL_VERSION: "1.2.2",
-        NETWORK_NAME: "PokerStars",
-        SITE_NAME: "PokerStars",
-        CURRENCY: "USD",
-        PREFIX: "HHC",
-        HERO_NAME: "",
-    },
-    DIRECTORIES: {CONFIG_DIR: "/Config", LOG_DIR: "/Logs"},
-}
-"""
-these are constants that are meant to be configurable - they could be edited here,
-or specified in a configuration file that is external to this script and checked for at run time
-"""
-# END CONSTANTS
-# **************************************************************************************************
-
-# **************************************************************************************************
 
 # DATA STRUCTURES
-hands = {}
-"""
-the hands dictionary
-    - structure
-        - KEY: string - hand number
-        - DATETIME: string - timestamp for the hand
-        - BET_TYPE: string - The betting structure (Pot Limit, No Limit)
-        - GAME_TYPE: string - The game type (Texas Hold'em, Omaha High, Omaha Hi/Lo 8 or Better)
-        - DEALER_NAME: string - The name of the dealer
-        - TABLE: string - table where the hand happened
-        - BIG_BLIND_AMOUNT: float - Amount of the big blind
-        - SMALL_BLIND_AMOUNT: float - Amount of the small blind
-        - ANTE_AMOUNT: float - Amount of the ante
-        - TEXT: string - full text of hand, with newlines
-"""
-tables = {}
-"""
-the tables dictionary
-    - structure
-        - KEY: string - table name as found in log
-        - COUNT: integer - number of hands processed for table
-        - LATEST: datetime - the latest time stamp for a hand processed for this table
-        - LAST: string - hand number for the latest hand processed for this table
-            - LAST and LATEST are used to mark the "end" activity of players standing up
-              they represent the last seen hand at the table from the processed logs
-        - OHH: list - list of hand histories, each in JSON following the OHH format
-"""
-# END DATA STRUCTURES
+# The hands of a log are separated into a hands dictionary by separate_hands
+# the hands dictionary
+#     - structure
+#         - KEY: string - hand number
+#         - DATETIME: string - timestamp for the hand
+#         - BET_TYPE: string - The betting structure (Pot Limit, No Limit)
+#         - GAME_TYPE: string - The game type (Texas Hold'em, Omaha High, Omaha Hi/Lo 8 or Better)
+#         - DEALER_NAME: string - The name of the dealer
+#         - TABLE: string - table where the hand happened
+#         - BIG_BLIND_AMOUNT: int - Amount of the big blind in cents
+#         - SMALL_BLIND_AMOUNT: int - Amount of the small blind in cents
+#         - ANTE_AMOUNT: int - Amount of the ante in cents
+#         - TEXT: string - full text of hand, with newlines
+#         - STACK_CHANGES: list - aliases of players whose stack was changed outside of a hand
+#           (joining, rebuys, add-ons, admin updates) since the previous hand started
+#         - TOURNAMENT_INFO: dict - only for the hands of a tournament, the tournament_info object
+#           of the OHH format shared by every hand of the log
+@dataclass
+class TableState:
+    """The state kept for a table between its logs while they are converted.
+
+    Attributes:
+        name (str): The table name as found in the name of the Poker Now csv file.
+        count (int): The number of hands processed for the table.
+        latest (str): The time stamp of the latest hand processed for the table.
+        last (str): The game number of the latest hand processed for the table.
+            - last and latest are used to mark the "end" activity of players standing up, they
+              represent the last seen hand at the table from the processed logs
+        ledger (dict[str, int]): The stacks of the players in cents after the last hand they played
+            at the table, by name, see check_stacks.
+        tournament (dict, optional): Only for a tournament table, see track_tournament
+            - ENTRIES: dict - number of times each player bought in, by name
+            - BUSTED: dict - index of the hand and starting stack of the players that busted, by
+              name
+            - SURVIVORS: list - name and stack of the players with chips after the last hand
+            - OTS: dict - the summary of the tournament in the OTS format, see
+              summarize_tournament
+    """
 
-# LOOKUP TABLE
-structures = {"Pot Limit": "PL", "No Limit": "NL"}
+    name: str
+    count: int = 0
+    latest: str = ""
+    last: str = ""
+    ledger: dict[str, int] = field(default_factory=dict)
+    tournament: Optional[dict] = None
+
+
+# The state of each table, by table name
+tables: dict[str, TableState] = {}
+
+
+@dataclass
+class Separation:
+    """The state of separate_hands while the rows of a log are read.
+
+    Attributes:
+        hands (dict[str, dict]): The hands dictionary, keyed by game number.
+        players (dict[tuple[str, str], None]): The alias and device ID of each player seated in the
+            hands, in the order they were seated.
+        blinds (dict): The blinds in cents and the dealer of the next hand, keyed like the hands.
+        stack_changes (set[str]): The aliases of the players whose stack was changed outside of a
+            hand since the previous hand started.
+        level_times (list[int]): The seconds of the order of each change of the big blind, used for
+            the length of the levels of a tournament.
+        tournament (dict, optional): The tournament_info of a tournament log.
+        counts (Counter): The number of rows parsed, ignored and saved and the number of hands.
+    """
 
-games = {
-    "Texas Hold'em": "Holdem",
-    "Omaha Hi/Lo 8 or Better": "OmahaHiLo",
-    "Omaha Hi": "Omaha",
-}
+    hands: dict[str, dict] = field(default_factory=dict)
+    players: dict[tuple[str, str], None] = field(default_factory=dict)
+    blinds: dict = field(
+        default_factory=lambda: {
+            BIG_BLIND_AMOUNT: 2000,
+            SMALL_BLIND_AMOUNT: 1000,
+            ANTE_AMOUNT: 0,
+            DEALER_NAME: "",
+        }
+    )
+    stack_changes: set[str] = field(default_factory=set)
+    level_times: list[int] = field(default_factory=list)
+    tournament: Optional[dict] = None
+    counts: Counter = field(default_factory=Counter)
 
-first_rounds = {
-    "Holdem": "Preflop",
-    "Omaha": "Preflop",
-    "OmahaHiLo": "Preflop",
-}
 
-make_new_round = {
-    "Player stacks": "Preflop",
-    "Flop": "Flop",
-    "Flop (second run)": "Flop",
-    "Turn": "Turn",
-    "Turn (second run)": "Turn",
-    "River": "River",
-    "River (second run)": "River",
-    "Show Down": "Showdown",
-}
+# END DATA STRUCTURES
 
-post_types = {
-    "posts an ante": "Post Ante",
-    "posts a big blind": "Post BB",
-    "posts a small blind": "Post SB",
-    "posts a straddle": "Straddle",
-    "posts a missing small blind": "Post Dead",
-    "posts a missed big blind": "Post Extra Blind",
+# LOOKUP TABLE
+# The blinds changed by the rows of the log and posted in the first hand, see separate_hands
+changed_blinds = {
+    "big blind": BIG_BLIND_AMOUNT,
+    "small blind": SMALL_BLIND_AMOUNT,
+    "ante": ANTE_AMOUNT,
 }
-
-verb_to_action = {
-    "bets": "Bet",
-    "calls": "Call",
-    "raises": "Raise",
-    "folds": "Fold",
-    "checks": "Check",
+posted_blinds = {
+    "posts a small blind": SMALL_BLIND_AMOUNT,
+    "posts a big blind": BIG_BLIND_AMOUNT,
+    "posts an ante": ANTE_AMOUNT,
 }
 
+# Lines containing these strings will be ignored
+ignored_rows = (
+    "The admin",
+    "joined",
+    "requested",
+    "canceled the seat",
+    "authenticated",
+    "quits",
+    "stand up",
+    "sit back",
+    "Remaining players",
+    "chooses",
+    "choose to not",
+    "Dead Small Blind",
+    "room ownership",
+    "IMPORTANT:",
+    "WARNING:",
+    "will be playing on table",
+    "Game entering in a break",
+    "Asking to busted players",
+)
+
 subs_suits = {
     "10♥": "Th",
     "10♠": "Ts",
@@ -257,10 +441,10 @@ subs_suits = {
     "♦": "d",
     "♣": "c",
 }
+
 # END LOOKUP TABLES
 # **************************************************************************************************
 
-
 # **************************************************************************************************
 # FUNCTIONS
 def create_config(path: Path) -> None:
@@ -296,6 +480,8 @@ def get_config(path: Path) -> ConfigParser:
         create_config(path)
 
     config = ConfigParser()
+    # Settings that are missing from an older config file fall back to the default configuration.
+    config.read_dict(DEFAULT_CONFIG)
     config.read(path)
     return config
 
@@ -319,121 +505,1220 @@ def update_setting(path: Path, section: str, setting: str, value: str) -> None:
         config.write(config_file)
 
 
-def csv_reader(file_obj: Path, subs: dict[str, str]) -> list[List[str]]:
-    """Read a CSV file and make substitutions according to the subs dictionary.
+def load_tail_state(table_name: str) -> dict:
+    """Load where the previous tail of the log of a table left off. The state holds the order of
+    the row the next tail starts from (the start of the first hand that was not finished), the game
+    number of the last hand converted, the blinds and dealer at that point and the size of the .ohh
+    file of each hero.
+
+    Args:
+        table_name (str): Name of the table taken from the name of the Poker Now csv file.
+
+    Returns:
+        dict: The tail state, with only the sizes if the log has not been tailed before.
+    """
+    try:
+        with open(tail_directory / f"{table_name}.json", mode="r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {SIZES: {}}
+
+
+def save_tail_state(table_name: str, state: dict) -> None:
+    """Save the tail state of a table after the new hands were appended to the .ohh files. The state
+    is replaced atomically like the .ohh files in commit_ohh.
+
+    Args:
+        table_name (str): Name of the table taken from the name of the Poker Now csv file.
+        state (dict): The tail state, see load_tail_state.
+
+    Returns:
+        None
+    """
+    path = tail_directory / f"{table_name}.json"
+    temp_path = uncommitted_path(path)
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    replace_file(temp_path, path)
+
+
+def refresh_constants(table: list[dict]) -> None:
+    """Set the fields of cached hands that come from the [OHH Constants] section of config.ini to
+    the current settings.
+
+    Args:
+        table (list[dict]): The hand histories loaded from the cache.
+
+    Returns:
+        None
+    """
+    for ohh in table:
+        ohh[SPEC_VERSION] = spec_version
+        ohh[SITE_NAME] = site_name
+        ohh[NETWORK_NAME] = network_name
+        ohh[INTERNAL_VERSION] = internal_version
+        ohh[CURRENCY] = currency
+        if TOURNAMENT_INFO in ohh:
+            ohh[TOURNAMENT_INFO][CURRENCY] = currency
+
+
+def rerender() -> int:
+    """Render the outputs of every log in the cache again with the current config. The hands are
+    not parsed again, so the Poker Now csv files do not have to be restored from the archive. The
+    outputs of a log that the current config does not write again, such as the files of another
+    partition layout, output format or hero, are removed once the log has been rendered.
+
+    Returns:
+        int: The number of logs rendered.
+    """
+    rendered: int = 0
+    entries = sorted(cache_directory.glob("*" + CACHE_SUFFIX))
+    output_directories = [ohh_directory, heroes_directory]
+    previous = find_outputs(output_directories, {path.stem for path in entries})
+    for path in entries:
+        entry = load_cache(path)
+        if entry is None:
+            continue
+        table_name, ohh_name, table, tournament = entry
+        perf_start = perf_counter()
+        refresh_constants(table)
+        if tournament is not None:
+            tables.setdefault(table_name, TableState(table_name)).tournament = tournament
+            tournament[OTS] = summarize_tournament(
+                tournament, table[-1][TOURNAMENT_INFO], table[-1][START_DATE_UTC]
+            )
+        progress[HANDS] += len(table)
+        written = write_outputs(table_name, ohh_name, table, None)
+        stale = previous.get(Path(ohh_name).stem, set()) - set(written)
+        remove_outputs(stale, output_directories)
+        if stale:
+            logging.info(f"[{table_name}] {len(stale)} outputs of a previous render were removed.")
+        rendered += 1
+        progress[FILES] = rendered
+        logging.info(
+            f"[{table_name}][{perf_counter() - perf_start}] Performance counter for rendering "
+            "from the cache."
+        )
+    return rendered
+
+
+def separate_hands(
+    table_name: str, lines: list[List[str]], state: Optional[dict] = None
+) -> tuple[dict[str, dict], list[tuple[str, str]]]:
+    """Break up the log hand by hand. Basic hand info is taken from the line that starts the hand
+    and everything else goes into the TEXT of the hand to be processed later. The players seated in
+    the hands are collected on the way, so they can be resolved once for the log, see
+    resolve_players.
+
+    Args:
+        table_name (str): Name of the table taken from the name of the Poker Now csv file.
+        lines (list[List[str]]): The rows of the Poker Now csv file in the order they happened.
+        state (dict, optional): The tail state of the table, see load_tail_state. The blinds and the
+            dealer carry on from where the previous tail of the log left off, and the state is
+            updated to where the next tail starts.
+
+    A log is a tournament when players are put in the tournament or moved to the table, see
+    separate_tournament_row.
+
+    Returns:
+        tuple[dict[str, dict], list[tuple[str, str]]]: The hands dictionary, keyed by game number,
+        and the alias and device ID of each player seated in the hands, in the order they were
+        seated.
+    """
+    perf_start = perf_counter()
+    proc_start = process_time()
+    separation = Separation(tournament=None if state is None else state.get(TOURNAMENT_INFO))
+    blinds_known: bool = state is not None and RESUME_ORDER in state
+    if blinds_known:
+        separation.blinds = {key: state[key] for key in separation.blinds}
+    game_number: str = "0"
+    hand_number: str = "0"
+    end_hand_number: str = "0"
+    hand_order: int = 0
+    logging.info(f"[{table_name}] ***STARTING HAND SEPERATION***")
+    logging.info(f"[{table_name}] has {len(lines)} lines to parse.")
+    # Parse and get each hand separated, and get basic hand info into the hands dictionary basic
+    # hand info is hand number, hand time, bet type, game type, dealer name, table name, big
+    # blind, small blind, and ante. Everything else goes into TEXT.
+    for line in lines[:-1]:
+        entry: str = line[0]
+        if separate_between_hands(separation, table_name, line):
+            continue
+        # The hand "begins" when the "--- starting hand #X ---" log line is read, however the
+        # hand does not "end" until the following "--- starting hand #X+1 ---" log line is
+        # observed (or the end of the file is reached). This is because some actions such as a
+        # player voluntarily showing their cards at the end of the hand are reported between the
+        # "--- end hand #X ---" and the "--- stating hand #X+1 ---" lines
+        hand_start_match = re.match(start_regex, entry)
+        hand_end_match = re.match(end_regex, entry)
+        if hand_start_match is not None:
+            hand_number = hand_start_match.group("hand_number")
+            hand_order = int(line[2])
+            game_number = start_hand(separation, table_name, line, hand_start_match, game_number)
+        elif hand_end_match is not None:
+            end_hand_number = hand_end_match.group("hand_number")
+        # Lines before the first hand, such as the end of a hand started before a time range,
+        # do not belong to a hand.
+        elif any(ignored in entry for ignored in ignored_rows) or game_number not in (
+            separation.hands
+        ):
+            separation.counts[IGNORED] += 1
+        else:
+            # The blind structure is determined from the amounts posted in the first hand.
+            save_row(
+                separation,
+                separation.hands[game_number],
+                entry,
+                separation.counts[HANDS] == 1 and not blinds_known,
+            )
+    resume_tail(
+        separation,
+        state,
+        lines,
+        None if hand_number == end_hand_number else game_number,
+        hand_order,
+    )
+    finish_tournament(separation, state)
+    logging.info(f"[{table_name}] ***FINISHED HAND SEPERATION***")
+    logging.info(f"[{table_name}] {separation.counts[PARSED]} lines were parsed.")
+    logging.info(f"[{table_name}] {separation.counts[IGNORED]} lines were ignored.")
+    logging.info(f"[{table_name}] {separation.counts[SAVED]} lines were saved.")
+    logging.info(f"[{table_name}] {separation.counts[HANDS]} hands were seperated.")
+    if separation.counts[HANDS]:
+        logging.info(
+            f"[{table_name}] "
+            f"{round(separation.counts[SAVED] / separation.counts[HANDS], 2)} average number of "
+            "lines per hand."
+        )
+    logging.info(
+        f"[{table_name}][{perf_counter() - perf_start}] Performance counter for hand"
+        "seperation."
+    )
+    logging.info(
+        f"[{table_name}][{process_time() - proc_start}] Process time for hand seperation."
+    )
+    return separation.hands, list(separation.players)
+
+
+def separate_between_hands(separation: Separation, table_name: str, line: List[str]) -> bool:
+    """Read a row of the log that changes the table between hands: a stack changed outside of a
+    hand, a change of the blinds or a row of a tournament.
+
+    Args:
+        separation (Separation): The state of separate_hands.
+        table_name (str): Name of the table taken from the name of the Poker Now csv file.
+        line (List[str]): The row of the Poker Now csv file.
+
+    Returns:
+        bool: True when the row was a change of the blinds or a row of a tournament, it is not part
+        of a hand.
+    """
+    entry: str = line[0]
+    # Stacks changed between hands are not checked by check_stacks in the next hand
+    if "layer \"" in entry:
+        stack_change_match = re.search(stack_change_regex, entry)
+        if stack_change_match is not None:
+            separation.stack_changes.add(stack_change_match.group("player"))
+    # The text match to look for what the blinds are set at
+    blinds_match = re.match(blind_regex, entry)
+    if blinds_match is not None:
+        blind_type = blinds_match.group("blind_type")
+        if blind_type in changed_blinds:
+            separation.blinds[changed_blinds[blind_type]] = to_cents(blinds_match.group("amount"))
+        if blind_type == "big blind":
+            separation.level_times.append(int(line[2]) // 100000)
+        separation.counts[PARSED] += 1
+        return True
+    # The text match to look for players put in a tournament, moved between its tables or
+    # buying back in
+    tournament_match = re.match(tournament_regex, entry)
+    if tournament_match is not None:
+        separation.tournament = separate_tournament_row(
+            separation.tournament, table_name, tournament_match
+        )
+        separation.counts[PARSED] += 1
+        return True
+    return False
+
+
+def separate_tournament_row(
+    tournament: Optional[dict], table_name: str, tournament_match: re.Match
+) -> dict:
+    """Update the tournament_info of a log with a row of a tournament. The first row of a
+    tournament makes the log a tournament, the tournament_info of the OHH format is taken from the
+    rows and the [Tournament] section of config.ini.
+
+    Args:
+        tournament (dict, optional): The tournament_info of the log, None before the first row of a
+            tournament.
+        table_name (str): Name of the table taken from the name of the Poker Now csv file.
+        tournament_match (re.Match): The row matched with tournament_regex.
+
+    Returns:
+        dict: The tournament_info of the log.
+    """
+    if tournament is None:
+        tournament = {
+            TOURNAMENT_NUMBER: table_name,
+            NAME: tournament_settings[NAME] or table_name,
+            START_DATE_UTC: "",
+            CURRENCY: currency,
+            BUYIN_AMOUNT: to_cents(tournament_settings[BUYIN_AMOUNT]),
+            FEE_AMOUNT: to_cents(tournament_settings[FEE_AMOUNT]),
+            BOUNTY_FEE_AMOUNT: to_cents(tournament_settings[BOUNTY_FEE_AMOUNT]),
+            INITIAL_STACK: 0,
+            TYPE: "STT",
+            FLAGS: [],
+            SPEED: {TYPE: tournament_settings[SPEED], ROUND_TIME: 0},
+        }
+    event = tournament_match.group("event")
+    if event == "is in the tournament" or (
+        event == "will start to play" and not tournament[INITIAL_STACK]
+    ):
+        tournament[INITIAL_STACK] = to_cents(tournament_match.group("amount"))
+    elif event == "was moved" and tournament[TYPE] != "MTT":
+        tournament[TYPE] = "MTT"
+    elif event == "rebought" and "Re-Entry" not in tournament[FLAGS]:
+        tournament[FLAGS].append("Re-Entry")
+    return tournament
+
+
+def start_hand(
+    separation: Separation,
+    table_name: str,
+    line: List[str],
+    hand_start_match: re.Match,
+    game_number: str,
+) -> str:
+    """Add a hand to the hands dictionary from the row that starts it.
+
+    Args:
+        separation (Separation): The state of separate_hands.
+        table_name (str): Name of the table taken from the name of the Poker Now csv file.
+        line (List[str]): The row that starts the hand.
+        hand_start_match (re.Match): The row matched with start_regex.
+        game_number (str): The game number of the previous hand.
+
+    Returns:
+        str: The game number of the hand, the game number of the previous hand if the row has none.
+    """
+    game_number_match = re.match(game_number_regex, line[2])
+    if game_number_match is not None:
+        game_number = game_number_match.group("game_number")
+    # If the button is dead, keep the dealer the same as the previous hand. Technically this is
+    # incorrect because a dead button is located at an empty seat, but effectively it is the same
+    # because the player who had the button previously will have position.
+    if "dead button" not in line[0]:
+        separation.blinds[DEALER_NAME] = hand_start_match.group("player")
+    # the text match to look for the time the hand started
+    hand_time_match = re.match(hand_time_regex, line[1])
+    if hand_time_match is not None:
+        # Add the information extracted from the start of the hand to the hands dictionary
+        separation.hands[game_number] = {
+            DATETIME: hand_time_match.group("start_date_utc") + "Z",
+            BET_TYPE: hand_start_match.group("bet_type"),
+            GAME_TYPE: hand_start_match.group("game_type"),
+            DEALER_NAME: separation.blinds[DEALER_NAME],
+            TABLE: table_name,
+            BIG_BLIND_AMOUNT: separation.blinds[BIG_BLIND_AMOUNT],
+            SMALL_BLIND_AMOUNT: separation.blinds[SMALL_BLIND_AMOUNT],
+            ANTE_AMOUNT: separation.blinds[ANTE_AMOUNT],
+            TEXT: "",
+            STACK_CHANGES: sorted(separation.stack_changes),
+        }
+        separation.stack_changes = set()
+        separation.counts[PARSED] += 1
+        separation.counts[HANDS] += 1
+    return game_number
+
+
+def save_row(separation: Separation, hand: dict, entry: str, first_hand: bool) -> None:
+    """Add a row to the TEXT of its hand, it is processed later by parse_hand.
+
+    Args:
+        separation (Separation): The state of separate_hands.
+        hand (dict): The hand from the hands dictionary.
+        entry (str): The entry column of the row.
+        first_hand (bool): True when the blind structure is taken from the amounts posted in the
+            hand.
+
+    Returns:
+        None
+    """
+    if first_hand:
+        post = re.match(post_regex, entry)
+        if post is not None and post.group("type") in posted_blinds:
+            blind = posted_blinds[post.group("type")]
+            separation.blinds[blind] = to_cents(post.group("amount"))
+            hand[blind] = separation.blinds[blind]
+    # The players are resolved once for the log before the hands are parsed
+    if entry.startswith("Player stacks"):
+        for player in re.finditer(seats_regex, entry):
+            separation.players[(player.group("player"), player.group("device_id"))] = None
+    # Any line that has made it this far without being processed will be added to text in the
+    # hands dictionary and be proccesed later
+    hand[TEXT] = hand[TEXT] + "\n" + entry
+    separation.counts[SAVED] += 1
+
+
+def resume_tail(
+    separation: Separation,
+    state: Optional[dict],
+    lines: list[List[str]],
+    unfinished: Optional[str],
+    hand_order: int,
+) -> None:
+    """Drop the last hand of the log when it has not finished and save where the next tail of the
+    log starts in the tail state.
+
+    Args:
+        separation (Separation): The state of separate_hands.
+        state (dict, optional): The tail state of the table, None when not tailing.
+        lines (list[List[str]]): The rows of the Poker Now csv file in the order they happened.
+        unfinished (str, optional): The game number of the last hand started when its ending row
+            was not read.
+        hand_order (int): The order of the row that started the last hand.
+
+    Returns:
+        None
+    """
+    if unfinished is not None and unfinished in separation.hands:
+        # The next tail of the log starts again from the first row of the unfinished hand
+        resume = separation.hands.pop(unfinished)
+        resume_order = hand_order
+    elif len(lines) > 1:
+        resume = separation.blinds
+        resume_order = int(lines[-2][2]) + 1
+    else:
+        return
+    if state is not None:
+        state[RESUME_ORDER] = resume_order
+        for key in separation.blinds:
+            state[key] = resume[key]
+        if separation.hands:
+            state[LAST_GAME_NUMBER] = next(reversed(separation.hands))
+
+
+def finish_tournament(separation: Separation, state: Optional[dict]) -> None:
+    """Give the tournament_info to every hand of a tournament log, with the start of the tournament
+    and the length of its levels, the median time between changes of the big blind.
+
+    Args:
+        separation (Separation): The state of separate_hands.
+        state (dict, optional): The tail state of the table, the tournament_info carries on to the
+            next tail of the log.
+
+    Returns:
+        None
+    """
+    tournament = separation.tournament
+    if tournament is None:
+        return
+    if not tournament[START_DATE_UTC] and separation.hands:
+        tournament[START_DATE_UTC] = next(iter(separation.hands.values()))[DATETIME]
+    level_times = separation.level_times
+    if len(level_times) > 1:
+        tournament[SPEED][ROUND_TIME] = int(
+            median(later - earlier for earlier, later in zip(level_times, level_times[1:]))
+        )
+    for hand in separation.hands.values():
+        hand[TOURNAMENT_INFO] = tournament
+    if state is not None:
+        state[TOURNAMENT_INFO] = tournament
+
+
+def check_stacks(table: TableState, ohh: dict, hand: dict, stack_changes: dict[str, int]) -> None:
+    """Check that the starting stack of each player is the stack they had after the last hand they
+    played at the table, then update the ledger with the stacks after this hand. A discontinuity
+    points at a missing hand, an alias mapped to the wrong player or a bug in the parser. Players
+    whose stack was changed between hands (joining, rebuys, add-ons, admin updates) are not checked.
+
+    Args:
+        table (TableState): The state of the table, its ledger has the stacks of the players in
+            cents, by name.
+        ohh (dict): The hand history returned by parse_hand.
+        hand (dict): The hand from the hands dictionary returned by separate_hands.
+        stack_changes (dict[str, int]): The cents won minus the cents put in the pot, by alias.
+
+    Returns:
+        None
+    """
+    for player in ohh[PLAYERS]:
+        expected = table.ledger.get(player[NAME])
+        if (
+            expected is not None
+            and player[DISPLAY] not in hand[STACK_CHANGES]
+            and expected != player[STARTING_STACK]
+        ):
+            with progress_lock:
+                progress[DISCONTINUITIES] += 1
+            logging.warning(
+                f"[{table.name}][{ohh[GAME_NUMBER]}] Stack discontinuity for {player[NAME]}, the "
+                f"stack after the last hand was {expected / 100} but the starting stack is "
+                f"{player[STARTING_STACK] / 100}."
+            )
+        table.ledger[player[NAME]] = player[STARTING_STACK] + stack_changes[player[DISPLAY]]
+
+
+def track_tournament(table: TableState, players: list[dict]) -> None:
+    """Track the entries and eliminations of a tournament table after a hand. A player busts when
+    their stack after the hand is 0, and a busted player that is dealt in again has re-entered.
+    The later a player busts the better they finish, so the bust is recorded with the number of
+    hands converted at the table.
+
+    Args:
+        table (TableState): The state of the table, with its tournament and the stacks of the
+            players after the hand in its ledger.
+        players (list[dict]): The players of the hand in the OHH format.
+
+    Returns:
+        None
+    """
+    tournament = table.tournament
+    for player in players:
+        name = player[NAME]
+        if name not in tournament[ENTRIES]:
+            tournament[ENTRIES][name] = 1
+        elif name in tournament[BUSTED]:
+            del tournament[BUSTED][name]
+            tournament[ENTRIES][name] += 1
+        if table.ledger[name] <= 0:
+            tournament[BUSTED][name] = (table.count, player[STARTING_STACK])
+    tournament[SURVIVORS] = [
+        (player[NAME], table.ledger[player[NAME]])
+        for player in players
+        if player[NAME] not in tournament[BUSTED]
+    ]
+
+
+def summarize_tournament(tournament: dict, tournament_info: dict, end_date: str) -> dict:
+    """Summarize a tournament table in the Open Tournament Summary (OTS) format. The players with
+    chips after the last hand finish ahead of the busted players by the size of their stack, the
+    busted players finish in the reverse of the order they busted and a player with the bigger
+    starting stack finishes ahead of the players that busted in the same hand. Poker Now does not
+    log the payouts, so the prizes are 0 and the prize pool is the buy-in times the entries.
+
+    Args:
+        tournament (dict): The table in the tournaments dictionary.
+        tournament_info (dict): The tournament_info object of the hands of the table.
+        end_date (str): The time the last hand of the table started.
+
+    Returns:
+        dict: The summary of the tournament in the OTS format.
+    """
+    survivors = sorted(tournament[SURVIVORS], key=lambda survivor: survivor[1], reverse=True)
+    busted = sorted(
+        tournament[BUSTED].items(), key=lambda bust: (bust[1][0], bust[1][1]), reverse=True
+    )
+    finishes = [
+        {
+            PLAYER_NAME: name,
+            FINISH_POSITION: position,
+            STILL_PLAYING: position <= len(survivors) and len(survivors) > 1,
+            PRIZE: 0.0,
+            TICKET_VALUE: 0.0,
+        }
+        for position, name in enumerate(
+            [name for name, _ in survivors] + [name for name, _ in busted], start=1
+        )
+    ]
+    flags = list(tournament_info[FLAGS])
+    if sum(tournament[ENTRIES].values()) > len(tournament[ENTRIES]) and "Re-Entry" not in flags:
+        flags.append("Re-Entry")
+    return {
+        SPEC_VERSION: tournament_settings[SPEC_VERSION],
+        SITE_NAME: site_name,
+        NETWORK_NAME: network_name,
+        INTERNAL_VERSION: internal_version,
+        TOURNAMENT_NUMBER: tournament_info[TOURNAMENT_NUMBER],
+        TOURNAMENT_NAME: tournament_info[NAME],
+        START_DATE_UTC: tournament_info[START_DATE_UTC],
+        END_DATE_UTC: end_date,
+        CURRENCY: tournament_info[CURRENCY],
+        BUYIN_AMOUNT: tournament_info[BUYIN_AMOUNT] / 100,
+        FEE_AMOUNT: tournament_info[FEE_AMOUNT] / 100,
+        BOUNTY_FEE_AMOUNT: tournament_info[BOUNTY_FEE_AMOUNT] / 100,
+        BOUNTY_VALUE_AMOUNT: 0.0,
+        INITIAL_STACK: tournament_info[INITIAL_STACK] / 100,
+        TYPE: tournament_info[TYPE],
+        FLAGS: flags,
+        SPEED: tournament_info[SPEED],
+        PRIZE_POOL: tournament_info[BUYIN_AMOUNT] * sum(tournament[ENTRIES].values()) / 100,
+        HERO_PLAYER_NAME: hero_name,
+        PLAYER_COUNT: len(tournament[ENTRIES]),
+        TOURNAMENT_FINISHES_AND_WINNINGS: finishes,
+    }
+
+
+def quarantine_hand(table_name: str, game_number: str, hand: dict, error: Exception) -> None:
+    """Write the lines of a hand that could not be converted and the error to the quarantine file
+    of the hand, in the folder of the table in the Quarantine folder. The file is named by the game
+    number, so converting a log again replaces the entries of its hands instead of adding them
+    twice.
+
+    Args:
+        table_name (str): Name of the table taken from the name of the Poker Now csv file.
+        game_number (str): The unique identifier of the hand.
+        hand (dict): The hand from the hands dictionary returned by separate_hands.
+        error (Exception): The error raised while converting the hand.
+
+    Returns:
+        None
+    """
+    with progress_lock:
+        progress[QUARANTINED] += 1
+    logging.error(f"[{table_name}][{game_number}] Hand was quarantined: {error!r}")
+    table_directory = quarantine_directory / table_name
+    table_directory.mkdir(exist_ok=True)
+    with open(table_directory / f"{game_number}.txt", "w", encoding="utf-8") as f:
+        f.write(f"***** {GAME_NUMBER}: {game_number} {DATETIME}: {hand[DATETIME]} *****\n")
+        f.write("".join(traceback.format_exception(error)))
+        f.write(hand[TEXT].strip())
+        f.write("\n\n")
+
+
+def parse_hands(table: TableState, hands: dict[str, dict], file_bytes: int = 0) -> list[dict]:
+    """Process the text of each hand looking for player actions and convert the hand to the OHH
+    format. The hands do not depend on the hero until they are rendered by render_hand.
+
+    Args:
+        table (TableState): The state of the table of the log, updated with the hands.
+        hands (dict[str, dict]): The hands dictionary returned by separate_hands.
+        file_bytes (int): Number of bytes stored for the log, used to report progress.
+
+    Returns:
+        list[dict]: The hand histories, each in JSON following the OHH format.
+    """
+    perf_start = perf_counter()
+    proc_start = process_time()
+    ohh_hands = []
+    logging.info(f"[{table.name}] ***STARTING HAND PROCESSING***")
+    unprocessed_count: int = 0
+    # Now that we have all hands from all the files, use the hand number of the imported hands
+    # to process them in sequential order. This is the place for processing the text of each
+    # hand and look for player actions
+    # The bytes, the hands and the hands parsed so far of each log being parsed, see progress_stats
+    file_progress = [file_bytes, len(hands), 0]
+    progress[PARSING][table.name] = file_progress
+    for game_number, hand in hands.items():
+        file_progress[2] += 1
+        table.count += 1
+        table.latest = hand[DATETIME]
+        table.last = game_number
+        # A hand that cannot be converted is quarantined so the rest of the file is still converted
+        try:
+            ohh, stack_changes, unprocessed = parse_hand(
+                game_number, hand, hand_constants, resolve_name
+            )
+        except Exception as error:  # pylint: disable=broad-except
+            quarantine_hand(table.name, game_number, hand, error)
+            continue
+        check_stacks(table, ohh, hand, stack_changes)
+        unprocessed_count += unprocessed
+        ohh_hands.append(ohh)
+        if TOURNAMENT_INFO in hand:
+            if table.tournament is None:
+                table.tournament = {ENTRIES: {}, BUSTED: {}, SURVIVORS: []}
+            track_tournament(table, ohh[PLAYERS])
+    if ohh_hands and TOURNAMENT_INFO in ohh_hands[-1]:
+        table.tournament[OTS] = summarize_tournament(
+            table.tournament, ohh_hands[-1][TOURNAMENT_INFO], ohh_hands[-1][START_DATE_UTC]
+        )
+    logging.info(f"[{table.name}] ***FINISHED HAND PARSING***")
+    logging.info(
+        f"[{table.name}] {unprocessed_count} lines were not parsed.")
+    parse_time = perf_counter() - perf_start
+    with progress_lock:
+        del progress[PARSING][table.name]
+        progress[HANDS] += len(hands)
+        progress[BYTES] += file_bytes
+        if parse_time > progress[SLOWEST][1]:
+            progress[SLOWEST] = (table.name, parse_time)
+    logging.info(f"[{table.name}][{parse_time}] Performance counter for hand parsing.")
+    logging.info(
+        f"[{table.name}][{process_time() - proc_start}] Process time for hand parsing."
+    )
+    return ohh_hands
+
+
+def render_hand(hand: dict, hero: str) -> dict:
+    """Render a parsed hand for a hero. Only the fields that depend on the hero are copied, the rest
+    of the hand is shared by the renders for every hero.
 
     Args:
-        file_obj (Path): Path to the CSV file to be read.
-        subs (dict): Dictionary containg strings to substitute or replace in the data.
+        hand (dict): A hand returned by parse_hands.
+        hero (str): Name of the hero in the name-map data model.
 
     Returns:
-        List[List[str]]: The rows of data in the CSV file in reverse order.
+        dict: The hand history in JSON following the OHH format.
     """
-    rows: list[List[str]] = [[]]
-    subs_regex = re.compile("|".join(subs.keys()))
-    with file_obj.open(mode="r", encoding="UTF-8") as csv_file:
-        reader = csv.reader(csv_file)
-        next(reader)
-        for row in reader:
-            row = [subs_regex.sub(
-                lambda match: subs[match.group(0)], i) for i in row]
-            row[0] = row[0].encode("ascii", "ignore").decode()
-            rows.append(row)
-    rows.reverse()
-    return rows
-
-
-def load_name_map(file: Path):
-    """Open aliase->name map file (aliase-name_map.json) and parse it.  If the file is not found
-        then create a json file.
+    ohh = dict(hand)
+    hero_id = None
+    owner_id = None
+    for player in hand[PLAYERS]:
+        if player[NAME] == hero:
+            hero_id = player[ID]
+        # The cards in the "Your hand is" lines belong to the player that downloaded the log, the
+        # hero_name in config.ini.
+        if player[NAME] == hero_name:
+            owner_id = player[ID]
+    ohh[HERO_PLAYER_ID] = hero_id
+    if hero_id is None:
+        ohh[FLAGS] = hand[FLAGS] + ["Observed"]
+    rounds = hand[ROUNDS]
+    if rounds and any(action[ACTION] == "Dealt Cards" for action in rounds[0][ACTIONS]):
+        first_round = dict(rounds[0])
+        first_round[ACTIONS] = [
+            {**action, PLAYER_ID: owner_id} if action[ACTION] == "Dealt Cards" else action
+            for action in rounds[0][ACTIONS]
+        ]
+        ohh[ROUNDS] = [first_round] + rounds[1:]
+    return ohh
+
+
+def read_log(item: tuple[int, tuple[Path, Optional[str], int]]) -> tuple:
+    """Read a Poker Now csv file of the batch and separate its hands. A file that could not be read
+    is returned with the error so the writer stage can report it.
 
     Args:
-        file (Path): Path to the input file to be parsed
+        item (tuple[int, tuple[Path, Optional[str], int]]): The sequence number of the file in the
+            batch and the log, see list_logs.
 
     Returns:
-        _type_: _description_
+        tuple: The sequence number, the log, the table name, the hands dictionary returned by
+        separate_hands, the tail state and the error. The table name is None for a file that is
+        not a log, the hands are None for a file that could not be read.
     """
+    sequence, poker_now_log = item
+    poker_now_file, member, _ = poker_now_log
+    # The text match to look for table name.
+    table_name_match = re.match(table_regex, log_name(poker_now_file, member))
+    if table_name_match is None:
+        return sequence, poker_now_log, None, None, None, None
+    table_name = table_name_match.group("table_name")
     try:
-        with open(file, mode="r", encoding="utf-8") as map_file:
-            return json.load(map_file)
-    except FileNotFoundError:
-        with open(file, mode="a+", encoding="utf-8") as map_file:
-            init_name_map: dict[str, dict[str, list[str]]] = {}
-            save_name_map(file, init_name_map)
-            return json.load(map_file)
+        # Open and parse the hand history with csv reader
+        with open_log(poker_now_file, member, seek_logs) as binary_file:
+            byte_range, tail_state = read_range(binary_file, table_name)
+            lines = csv_reader(binary_file, subs_suits, byte_range)
+        with progress_lock:
+            progress[LINES] += len(lines)
+        hands, players = separate_hands(table_name, lines, tail_state)
+        resolve_players(table_name, players)
+    except Exception as error:  # pylint: disable=broad-except
+        logging.exception(f"[{table_name}] The log could not be read: {error}")
+        return sequence, poker_now_log, table_name, None, None, error
+    return sequence, poker_now_log, table_name, hands, tail_state, None
+
+
+def parse_log(item: tuple) -> tuple:
+    """Convert the separated hands of a log of the batch. A log that could not be parsed is
+    returned with the error, a file that is not a log or could not be read is returned as is.
+
+    Args:
+        item (tuple): The log returned by read_log.
+
+    Returns:
+        tuple: The log with the hand histories returned by parse_hands in place of the hands.
+    """
+    sequence, poker_now_log, table_name, hands, tail_state, _ = item
+    if hands is None:
+        return item
+    try:
+        table = parse_hands(
+            tables.setdefault(table_name, TableState(table_name)), hands, poker_now_log[2]
+        )
+    except Exception as error:  # pylint: disable=broad-except
+        logging.exception(f"[{table_name}] The log could not be parsed: {error}")
+        return sequence, poker_now_log, table_name, None, tail_state, error
+    return sequence, poker_now_log, table_name, table, tail_state, None
 
 
-def save_name_map(file: Path, name_map: dict[str, dict[str, list[str]]]):
-    """_summary_
+def read_stage(file_queue: Queue, hand_queue: Queue, files_in_flight: BoundedSemaphore) -> None:
+    """Reader stage of the pipeline. Take Poker Now csv files from the file queue, read them with
+    read_log and pass them on to the parser stage with their sequence number. A None is put on the
+    hand queue when the file queue is empty so the parser stage knows the reader has finished.
 
     Args:
-        file (Path): Path to the input file to be parsed
-        name_map (dict[str, dict[str, list[str]]]): _description_
+        file_queue (Queue): Poker Now csv files waiting to be read, with their sequence numbers.
+        hand_queue (Queue): Separated hands waiting to be parsed.
+        files_in_flight (BoundedSemaphore): Room for files in the pipeline, see convert_batch.
+
+    Returns:
+        None
     """
     try:
-        with open(file, mode="w", encoding="utf-8") as map_file:
-            json.dump(dict(sorted(name_map.items())), map_file, indent=4)
-    except FileNotFoundError:
-        with open(file, mode="a+", encoding="utf-8") as map_file:
-            json.dump(name_map, map_file, indent=4)
+        while True:
+            # A file is only taken from the queue when there is room for it in the pipeline, the
+            # room is given back by the writer stage
+            files_in_flight.acquire()
+            item = file_queue.get()
+            if item is None:
+                files_in_flight.release()
+                break
+            hand_queue.put(read_log(item))
+    finally:
+        hand_queue.put(None)
 
 
-def switch_key_and_values(name_map: dict[str, dict[str, list[str]]], key_txt: str):
-    """Players can choose a different alias every time they sit at the table; therefore, it is
-    necissary to map the players real name to the aliases they have chosen. The information
-    needed to create the aliase->name map is recorded in the file aliase-name_map.json where
-    each player name has an array of aliases. The data will be parsed into a dictionary of lists
-    where the keys are the names and the values are lists of aliases. The aliase->name map is
-    created by flattening the alias lists and switching the keys (names) and values (aliases)
+def parse_stage(parser_queue: Queue, table_queue: Queue) -> None:
+    """Parser stage of the pipeline. Take separated hands from the queue of this parser worker,
+    convert them with parse_log and pass the table on to the writer stage. The logs of a table are
+    always given to the same worker in the order of the batch, so the state kept between the logs
+    of a table (the stacks, the hand count and the tournament) is updated in order. The worker
+    stops at a None.
 
     Args:
-        name_map (dict[str, dict[str, list[str]]]): _description_
-        key_txt (str): _description_
+        parser_queue (Queue): Separated hands waiting to be parsed by this worker.
+        table_queue (Queue): Converted tables waiting to be written.
 
     Returns:
-        dict[str, str]: _description_
+        None
     """
-    names: dict[str, str] = {}
-    for key, values in name_map.items():
-        for value in values[key_txt]:
-            names[value] = key
-    return names
+    while True:
+        item = parser_queue.get()
+        if item is None:
+            break
+        table_queue.put(parse_log(item))
 
 
-# END OF FUNCTIONS
-# **************************************************************************************************
+def in_sequence(item_queue: Queue, ends: int) -> Iterator[tuple]:
+    """Get the items of a pipeline queue in the order of the batch. The stages before the queue run
+    in several threads and finish files out of order, so items that arrive early are held until the
+    items before them have arrived. The number of items held is limited by the room for files in
+    the pipeline, see convert_batch.
+
+    Args:
+        item_queue (Queue): Items tagged with their sequence number as the first element.
+        ends (int): Number of None items that end the queue, one for each thread putting items.
+
+    Yields:
+        tuple: The next item in the order of the batch.
+    """
+    waiting: dict[int, tuple] = {}
+    next_sequence: int = 0
+    while ends:
+        item = item_queue.get()
+        if item is None:
+            ends -= 1
+            continue
+        waiting[item[0]] = item
+        while next_sequence in waiting:
+            yield waiting.pop(next_sequence)
+            next_sequence += 1
+
+
+def hero_output_directories(heroes: str) -> dict[str, Path]:
+    """Get the output folder of each hero and create the folders. The output for the hero_name is in
+    the OpenHandHistory folder and the output for each of the other heroes is in a folder with their
+    name in the Heroes folder, so it is kept apart from the partition folders of OpenHandHistory.
+
+    Args:
+        heroes (str): The heroes setting of the [OHH Constants] section of config.ini, names
+            separated by commas.
+
+    Returns:
+        dict[str, Path]: The output folder of each hero, keyed by name.
+    """
+    directories = {hero_name: ohh_directory}
+    for hero in heroes.split(","):
+        if hero.strip() and hero.strip() != hero_name:
+            directories[hero.strip()] = heroes_directory / hero.strip()
+            directories[hero.strip()].mkdir(parents=True, exist_ok=True)
+    return directories
+
+
+def write_outputs(
+    table_name: str, ohh_name: str, table: list[dict], tail_state: Optional[dict]
+) -> list[Path]:
+    """Render the hand histories of a log for each hero, commit them in every output format and
+    commit the summary of a tournament.
+
+    Args:
+        table_name (str): Name of the table taken from the name of the Poker Now csv file.
+        ohh_name (str): Name of the .ohh file of the log, see output_name.
+        table (list[dict]): The hand histories returned by parse_hands.
+        tail_state (dict, optional): The tail state of the table when the log is tailed, the new
+            hands are then appended to the output files.
+
+    Returns:
+        list[Path]: The hand history files written for the heroes.
+    """
+    written: list[Path] = []
+    for hero, hero_directory in hero_directories.items():
+        rendered = [render_hand(hand, hero) for hand in table]
+        # The renders for the other heroes only differ in the hero fields
+        if hero == hero_name:
+            for ohh in rendered:
+                validate_hand(hand_validation, table_name, ohh)
+        # Every output format is rendered from the same parse of the log
+        for output_format in output_formats:
+            name = Path(ohh_name).with_suffix(output_suffixes[output_format]).name
+            encoded = encode_hands(rendered, output_format)
+            if tail_state is not None:
+                # A tailed log is appended to a single file, it is not partitioned
+                size_key = hero
+                if output_format != OHH:
+                    size_key += output_suffixes[output_format]
+                tail_state[SIZES][size_key] = append_ohh(
+                    hero_directory / name, encoded, tail_state[SIZES].get(size_key, 0)
+                )
+                written.append(hero_directory / name)
+            elif rendered:
+                partitions = partition_hands(rendered, encoded, table_name, output_layout.partition)
+                written.extend(commit_partitions(hero_directory, name, partitions, output_layout))
+    # The summary of a tournament is only written when the whole log has been converted
+    if (
+        table_name in tables
+        and tables[table_name].tournament is not None
+        and tail_state is None
+        and since_order is None
+        and until_order is None
+    ):
+        commit_ohh(
+            ots_directory / Path(ohh_name).with_suffix(".ots").name,
+            [json.dumps({OTS: tables[table_name].tournament[OTS]}, indent=4) + "\n"],
+        )
+    return written
+
+
+def commit_log(
+    poker_now_log: tuple[Path, Optional[str], int],
+    table_name: str,
+    table: list[dict],
+    tail_state: Optional[dict],
+) -> None:
+    """Commit the outputs of a log and archive the Poker Now csv file once every log in it has been
+    committed.
+
+    Args:
+        poker_now_log (tuple[Path, Optional[str], int]): The log, see list_logs.
+        table_name (str): Name of the table taken from the name of the Poker Now csv file.
+        table (list[dict]): The hand histories returned by parse_hands.
+        tail_state (dict, optional): The tail state of the table, None when not tailing.
+
+    Returns:
+        None
+    """
+    poker_now_file, member, _ = poker_now_log
+    ohh_name = output_name(log_name(poker_now_file, member))
+    # The Poker Now csv file is only archived after the hand histories have been committed, if the
+    # batch is interrupted before this point the file is still in the work queue.
+    write_outputs(table_name, ohh_name, table, tail_state)
+    # A log that is tailed is still growing, it is archived by a run without --tail once the
+    # session is over.
+    if tail_state is not None:
+        save_tail_state(table_name, tail_state)
+    # A file converted with a time range is kept in the work queue for the other hands.
+    elif since_order is None and until_order is None:
+        # A .zip file is archived once the last of its logs has been committed
+        logs_left[poker_now_file] -= 1
+        if not logs_left[poker_now_file]:
+            poker_now_file.replace(csv_archive_dir.joinpath(poker_now_file.name))
+    # The cache is only an optimization for rerender, a log that was committed and archived is not
+    # converted again because its parsed hands could not be saved
+    if tail_state is None and since_order is None and until_order is None and cache_bytes:
+        try:
+            save_cache(ohh_name, table_name, table, tables[table_name].tournament, cache_bytes)
+        except Exception as error:  # pylint: disable=broad-except
+            logging.exception(f"[{table_name}] The parsed hands were not cached: {error}")
+
+
+def write_stage(
+    items: Iterable[tuple], file_count: int, files_in_flight: Optional[BoundedSemaphore]
+) -> None:
+    """Writer stage of the pipeline. Take converted tables in the order of the batch and commit
+    them with commit_log. A log that could not be read, parsed or committed is logged and left in
+    the work queue, the other logs of the batch are still written.
 
+    Args:
+        items (Iterable[tuple]): The logs returned by parse_log, in the order of the batch.
+        file_count (int): Number of files in the batch, used to report progress.
+        files_in_flight (BoundedSemaphore, optional): Room for files in the pipeline, see
+            convert_batch. None when the files are converted without the pipeline.
+
+    Returns:
+        None
+    """
+    files_done: int = 0
+    for item in items:
+        _, poker_now_log, table_name, table, tail_state, error = item
+        perf_start = perf_counter()
+        try:
+            if error is None and table is not None:
+                commit_log(poker_now_log, table_name, table, tail_state)
+        except Exception as write_error:  # pylint: disable=broad-except
+            logging.exception(f"[{table_name}] The log could not be written: {write_error}")
+            error = write_error
+        finally:
+            if files_in_flight is not None:
+                files_in_flight.release()
+        # Every log of the batch is done once it reaches the writer, including the logs that
+        # failed and the files that are not logs, so the progress reaches the end of the batch
+        files_done += 1
+        with progress_lock:
+            progress[FILES] = files_done
+            if table is None:
+                progress[BYTES] += poker_now_log[2]
+        if error is not None:
+            progress[FAILED].append(log_name(poker_now_log[0], poker_now_log[1]))
+            continue
+        # A file with a name that does not match table_regex is not a log and is left alone
+        if table is None:
+            continue
+        logging.info(
+            f"[{table_name}][{perf_counter() - perf_start}] Performance counter for writing."
+        )
+        percent_complete = round((files_done / file_count) * 100, 2)
+        print_message(
+            f"Completed processing [magenta]{files_done}[/magenta] "
+            f"of [magenta]{file_count}[/magenta] files, "
+            f"[cyan]{percent_complete}%[/cyan] "
+            f"complete. Time to write table [green]{table_name}[/green] "
+            f"[blue]{round(perf_counter() - perf_start, 6)} sec[/blue]"
+        )
+
+
+def convert_batch(pipeline: SectionProxy) -> None:
+    """Convert each file of the batch. The files go through a pipeline of stages connected by
+    queues: reader threads read the csv files and separate the hands, parser threads convert the
+    hands and a writer thread commits the hand histories. Every file is tagged with its place in the
+    batch, the logs of a table are parsed by the same parser thread in that order and the writer
+    commits the files in that order, so the state kept between the logs of a table and the resuming
+    of an interrupted batch do not depend on which thread finished first. The number of files in
+    the pipeline at once is limited, which keeps the memory used by files that are waiting for the
+    next stage in check.
+
+    Parsing holds the GIL, the threads only gain time when a file is read on one CPU while another
+    is parsed on a second one. A batch of one log or a batch converted on one CPU is converted
+    file by file in the main thread, in the same order, without the pipeline.
+
+    Args:
+        pipeline (SectionProxy): The [Pipeline] section of config.ini.
+
+    Returns:
+        None
+    """
+    if len(batch_logs) == 1 or (os.cpu_count() or 1) == 1:
+        write_stage(
+            (parse_log(read_log(item)) for item in enumerate(batch_logs)), len(batch_logs), None
+        )
+        return
+    reader_threads = max(1, int(pipeline[READER_THREADS]))
+    parser_threads = max(1, int(pipeline[PARSER_THREADS]))
+    files_in_flight = BoundedSemaphore(
+        reader_threads + parser_threads + max(1, int(pipeline[QUEUE_SIZE]))
+    )
+    file_queue: Queue = Queue()
+    hand_queue: Queue = Queue()
+    parser_queues: list[Queue] = [Queue() for _ in range(parser_threads)]
+    table_queue: Queue = Queue()
+    # The parser thread of each table, the tables are handed out in turn as they are first seen
+    table_parsers: dict[str, int] = {}
+    for item in enumerate(batch_logs):
+        file_queue.put(item)
+    for _ in range(reader_threads):
+        file_queue.put(None)
+        Thread(
+            target=read_stage, args=(file_queue, hand_queue, files_in_flight), daemon=True
+        ).start()
+    parsers = [
+        Thread(target=parse_stage, args=(parser_queue, table_queue), daemon=True)
+        for parser_queue in parser_queues
+    ]
+    for parser in parsers:
+        parser.start()
+    writer = Thread(
+        target=write_stage,
+        args=(in_sequence(table_queue, 1), len(batch_logs), files_in_flight),
+    )
+    writer.start()
+    try:
+        for item in in_sequence(hand_queue, reader_threads):
+            # A log that could not be read or a file that is not a log goes straight to the writer
+            if item[3] is None:
+                table_queue.put(item)
+                continue
+            parser_queues[
+                table_parsers.setdefault(item[2], len(table_parsers) % parser_threads)
+            ].put(item)
+    finally:
+        for parser_queue in parser_queues:
+            parser_queue.put(None)
+        for parser in parsers:
+            parser.join()
+        table_queue.put(None)
+        writer.join()
+
+
+def read_range(
+    csv_file: BinaryIO, table_name: str
+) -> tuple[Optional[tuple[int, int]], Optional[dict]]:
+    """Get the rows of a Poker Now csv file to convert, the rows logged since the previous tail
+    with --tail or the rows in the time range of --since and --until.
+
+    Args:
+        csv_file (BinaryIO): The Poker Now csv file opened by open_log.
+        table_name (str): Name of the table the log was recorded at.
+
+    Returns:
+        tuple[Optional[tuple[int, int]], Optional[dict]]: Offsets of the first byte and the byte
+        after the last row to read, None for the whole log, and the tail state of the table, None
+        when not tailing.
+    """
+    byte_range = None
+    tail_state = None
+    if args.tail:
+        # Only the rows logged since the previous tail are read
+        tail_state = load_tail_state(table_name)
+        if RESUME_ORDER in tail_state:
+            byte_range = locate_range(csv_file, tail_state[RESUME_ORDER], None)
+    elif since_order is not None or until_order is not None:
+        byte_range = locate_range(csv_file, since_order, until_order)
+    return byte_range, tail_state
+
+
+def output_name(csv_name: str) -> str:
+    """Get the name of the .ohh file for a Poker Now csv file. When a time range is converted, the
+    range is added to the name so the output for the whole log is not replaced.
 
+    Args:
+        csv_name (str): Name of the Poker Now csv file, see log_name.
+
+    Returns:
+        str: Name of the .ohh file.
+    """
+    if args.since is None and args.until is None:
+        return Path(csv_name).with_suffix(".ohh").name
+    since = re.sub(r"\W", "", args.since or "start")
+    until = re.sub(r"\W", "", args.until or "end")
+    return f"{Path(csv_name).stem}_{since}-{until}.ohh"
+
+
+def parse_arguments() -> Namespace:
+    """Parse the command line arguments.
+
+    Returns:
+        Namespace: The command line arguments.
+    """
+    parser = ArgumentParser(
+        description="Convert Poker Now hand history csv files to the Open Hand History format."
+    )
+    parser.add_argument(
+        "--since",
+        help="convert only hands started at or after this UTC time "
+        "(ISO 8601, e.g. 2022-03-16T01:00)",
+    )
+    parser.add_argument(
+        "--until",
+        help="convert only hands started at or before the end of this UTC time (ISO 8601), "
+        "2022-03-16T01:00 includes the hands started in that minute",
+    )
+    parser.add_argument(
+        "--table",
+        action="append",
+        help="convert only tables with a name matching this pattern, can be repeated",
+    )
+    parser.add_argument(
+        "--tail",
+        action="store_true",
+        help="convert only the hands finished since the previous tail of a growing log and append "
+        "them to the .ohh file",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="run as a local HTTP service that converts uploaded Poker Now csv files",
+    )
+    parser.add_argument(
+        "--port", type=int, help="port of the HTTP service, overrides the port in config.ini"
+    )
+    parser.add_argument(
+        "--rerender",
+        action="store_true",
+        help="render the outputs again from the cache of parsed hands with the current config",
+    )
+    arguments = parser.parse_args()
+    if arguments.tail and (arguments.since is not None or arguments.until is not None):
+        parser.error("--tail cannot be used with --since or --until")
+    if arguments.rerender and any(
+        (arguments.tail, arguments.serve, arguments.since, arguments.until, arguments.table)
+    ):
+        parser.error("--rerender cannot be used with the other options")
+    return arguments
+
+
+def convert_upload(text: str, query: dict[str, str]) -> Iterator[str]:
+    """Convert a Poker Now csv file posted to the service, see service.py. The hands are separated
+    before this returns, so a file that cannot be read raises before the response starts.
+
+    Args:
+        text (str): The text of the Poker Now csv file.
+        query (dict[str, str]): The query parameters of the request, see ConversionHandler.
+
+    Returns:
+        Iterator[str]: The hand histories in the format of the request, converted one at a time.
+    """
+    table_name = query.get("table")
+    if table_name is None:
+        table_name_match = re.match(table_regex, query.get("file", ""))
+        table_name = "upload" if table_name_match is None else table_name_match.group(
+            "table_name"
+        )
+    refresh_name_map()
+    hands, _ = separate_hands(table_name, read_rows(text, subs_suits))
+    return render_upload(table_name, hands, query.get("hero", hero_name), query["format"])
+
+
+def render_upload(
+    table_name: str, hands: dict[str, dict], hero: str, output_format: str
+) -> Iterator[str]:
+    """Convert the hands of a file posted to the service, each hand is yielded as soon as it is
+    converted so the service can send it.
+
+    Args:
+        table_name (str): Name of the table of the Poker Now csv file.
+        hands (dict[str, dict]): The hands dictionary returned by separate_hands.
+        hero (str): Name of the hero in the name-map data model.
+        output_format (str): ndjson, pretty or pokerstars.
+
+    Returns:
+        Iterator[str]: The hand histories in the output format.
+    """
+    # The level of a tournament hand goes up each time the blinds change, see tournament_levels
+    level = 0
+    blinds = None
+    for game_number, hand in hands.items():
+        with progress_lock:
+            progress[HANDS] += 1
+        try:
+            ohh, _, _ = parse_hand(game_number, hand, hand_constants, resolve_name)
+        except Exception as error:  # pylint: disable=broad-except
+            quarantine_hand(table_name, game_number, hand, error)
+            continue
+        ohh = render_hand(ohh, hero)
+        validate_hand(hand_validation, table_name, ohh)
+        if output_format == POKERSTARS:
+            hand_blinds = (ohh[SMALL_BLIND_AMOUNT], ohh[BIG_BLIND_AMOUNT], ohh[ANTE_AMOUNT])
+            if hand_blinds != blinds:
+                level += 1
+                blinds = hand_blinds
+            yield encode_pokerstars(ohh, level)
+        else:
+            yield encode_ohh(ohh, output_format == "pretty")
+
+
+# END OF FUNCTIONS
 # **************************************************************************************************
-# CODE
-name_map_path = Path("Config/name-map.json")
-console = Console()
-config_path = Path("Config/config.ini")
-config = get_config(config_path)
-ohh_constants = config["OHH Constants"]
-spec_version = ohh_constants[SPEC_VERSION]
-internal_version = ohh_constants[INTERNAL_VERSION]
-network_name = ohh_constants[NETWORK_NAME]
-site_name = ohh_constants[SITE_NAME]
-currency = ohh_constants[CURRENCY]
-hero_name = ohh_constants[HERO_NAME]
-# Check if hero_name is an empty string, if True then prompt the user to input a name for the hero
-# and save the name to config.ini
-if not hero_name.strip():
-    hero_name = console.input("Type in a name for the hero and press <ENTER>")
-    ohh_constants[HERO_NAME] = hero_name
-    update_setting(config_path, "OHH Constants", HERO_NAME, hero_name)
 
-csv_dir = Path('PokerNowHandHistory')
-csv_file_list: list[Path] = list(csv_dir.glob('*.csv'))
-csv_archive_dir: Path = csv_dir.joinpath('Archive')
-players_map = load_name_map(name_map_path)
-aliases_names = switch_key_and_values(players_map, "nicknames")
-device_ids = switch_key_and_values(players_map, "devices")
 
 
+
+# **************************************************************************************************
+# CODE
 # Compile regular expressions for matching to identifiable strings in the hand history
-table_regex = re.compile(r"^.*poker_now_log_(?P<table_name>.*).csv$")
 blind_regex = re.compile(
     r"The game's (?P<blind_type>.+) was changed from (\d+\.\d{2}|\d+) to "
     r"(?P<amount>\d+\.\d{2}|\d+)\."
@@ -445,670 +1730,199 @@ start_regex = re.compile(
 end_regex = re.compile(r"-- ending hand #(?P<hand_number>\d+) --")
 game_number_regex = re.compile(r"(?P<game_number>\d{13})")
 hand_time_regex = re.compile(r"(?P<start_date_utc>.+:\d+)")
-seats_regex = re.compile(
-    r" #(?P<seat>\d+) \"(?P<player>.+?) @ (?P<device_id>[-\w]+)\" \((?P<amount>\d+\.\d{2}|\d+)\)"
-)
-post_regex = re.compile(
-    r"\"(?P<player>.+?) @ (?P<device_id>[-\w]+)\" (?P<type>posts .+) "
-    r"of (?P<amount>\d+\.\d{2}|\d+)\s*(?P<all_in>[a-z ]+)*"
-)
-round_regex = re.compile(r"(?P<street>^\w.+):.+")
-cards_regex = re.compile(r"\[(?P<cards>.+)\]")
-addon_regex = re.compile(
-    r"(?P<player>.+?) @ (?P<device_id>[-\w]+)\" adding (?P<amount>\d+\.\d{2}|\d+)"
-)
-hero_hand_regex = re.compile(r"Your hand is (?P<cards>.+)")
-non_bet_action_regex = re.compile(
-    r"\"(?P<player>.+?) @ (?P<device_id>[-\w]+)\" (?P<player_action>\w+(?![ a-z]+(?:\d+\.\d{2}|\d+)))"
+tournament_regex = re.compile(
+    r"The player \"(?P<player>.+?) @ (?P<device_id>[-\w]+)\" (?P<event>is in the tournament|"
+    r"will start to play|was moved|rebought)(?:.* stack (?:of )?(?P<amount>\d+\.\d{2}|\d+))?"
 )
-bet_action_regex = re.compile(
-    r"\"(?P<player>.+?) @ (?P<device_id>[-\w]+)\" (?!collected)(?!shows)(?P<player_action>\w+) "
-    r"[a-z]*\s*(?P<amount>\d+\.\d{2}|\d+)\s*(?P<all_in>[a-z ]+)*"
-)
-uncalled_regex = re.compile(
-    r"Uncalled bet of (?P<amount>\d+\.\d{2}|\d+) .+ \"(?P<player>.+?) @ (?P<device_id>[-\w]+)\""
-)
-show_regex = re.compile(
-    r"\"(?P<player>.+?) @ (?P<device_id>[-\w]+)\" "
-    r"(?P<player_action>\w+) a (?P<cards>[\dAKQJTshcd, ]+)\."
-)
-winner_regex = re.compile(
-    r"\"(?P<player>.+?) @ (?P<device_id>[-\w]+)\" (?P<player_action>collected) "
-    r"(?P<amount>\d+\.\d{2}|\d+).+"
+stack_change_regex = re.compile(
+    r"[Pp]layer \"(?P<player>.+?) @ (?P<device_id>[-\w]+)\".*(?:stack|adding|rebought)"
 )
+# The folders and files of the converter, relative to the working folder
+config_path = Path("Config/config.ini")
+csv_dir = Path('PokerNowHandHistory')
+csv_archive_dir: Path = csv_dir.joinpath('Archive')
+ohh_directory = Path("OpenHandHistory")
+heroes_directory = Path("Heroes")
+ots_directory = Path("OpenTournamentSummary")
+quarantine_directory = Path("Quarantine")
+tail_directory = Path("Tail")
 log_dir = Path("./Logs")
-log_dir.mkdir(exist_ok=True)
-log_file = Path("log_" + datetime.now().strftime("%Y%m%d-%H%M%S")
-                ).with_suffix(".log")
-log_path = log_dir / log_file
-logging.basicConfig(
-    filename=log_path,
-    format="[%(asctime)s][%(created)f][%(levelname)s]:%(message)s",
-    level=logging.DEBUG,
-)
-
-# Process each file in the Poker Now hand history folder
-for poker_now_file in csv_file_list:
-    perf_start_1 = perf_counter()
-    proc_start_1 = process_time()
-    # Initialize variables to their default starting values
-    big_blind: float = 20.00
-    small_blind: float = 10.00
-    ante: float = 0.00
-    dealer_name: str = ""
-    table_name: str = ""
-    game_number: str = "0"
-    hand_number: str = "0"
-    end_hand_number: str = "0"
-    hands = {}
-    lines_ignored: int = 0
-    lines_parsed: int = 0
-    lines_saved: int = 0
-    hand_count: int = 0
-    table = []
-    # The text match to look for table name.
-    table_name_match = re.match(table_regex, poker_now_file.name)
-    if table_name_match is not None:
-        table_name = table_name_match.group("table_name")
-        # Open and parse the hand history with csv reader
-        lines = csv_reader(poker_now_file, subs_suits)
-        logging.info(f"[{table_name}] ***STARTING HAND SEPERATION***")
-        logging.info(f"[{table_name}] has {len(lines)} lines to parse.")
-        # Parse and get each hand separated, and get basic hand info into the hands dictionary basic
-        # hand info is hand number, hand time, bet type, game type, dealer name, table name, big
-        # blind, small blind, and ante. Everything else goes into TEXT.
-        for i, line in enumerate(lines):
-            if i == len(lines) - 1:
-                if hand_number != end_hand_number:
-                    hands.pop(game_number)
-                break
-            entry: str = line[0]
-            if table_name not in tables:
-                tables[table_name] = {COUNT: 0, LATEST: "", OHH: []}
-            # The text match to look for what the blinds are set at
-            blinds_match = re.match(blind_regex, entry)
-            if blinds_match is not None:
-                blind_type = blinds_match.group("blind_type")
-                blind_amount = float(blinds_match.group("amount"))
-                if blind_type == "big blind":
-                    big_blind = blind_amount
-                elif blind_type == "small blind":
-                    small_blind = blind_amount
-                elif blind_type == "ante":
-                    ante = blind_amount
-                lines_parsed += 1
-                continue
-            # The hand "begins" when the "--- starting hand #X ---" log line is read, however the
-            # hand does not "end" until the following "--- starting hand #X+1 ---" log line is
-            # observed (or the end of the file is reached). This is because some actions such as a
-            # player voluntarily showing their cards at the end of the hand are reported between the
-            # "--- end hand #X ---" and the "--- stating hand #X+1 ---" lines
-            hand_start_match = re.match(start_regex, entry)
-            hand_end_match = re.match(end_regex, entry)
-            if hand_start_match is not None:
-                game_number_match = re.match(game_number_regex, line[2])
-                hand_number = hand_start_match.group("hand_number")
-                if game_number_match is not None:
-                    game_number = game_number_match.group("game_number")
-                bet_type = hand_start_match.group("bet_type")
-                game_type = hand_start_match.group("game_type")
-                # If the button is dead, keep the dealer the same as the previous hand. Technically
-                # this is incorrect because a dead button is located at an empty seat, but
-                # effectively it is the same because the player who had the button previously will
-                # have position.
-                if "dead button" not in entry:
-                    dealer_name = hand_start_match.group("player")
-                # the text match to look for the time the hand started
-                hand_time_match = re.match(hand_time_regex, line[1])
-                if hand_time_match is not None:
-                    hand_time = hand_time_match.group("start_date_utc") + "Z"
-                    # Add the information extracted from the start of the hand to the hands
-                    # dictionary
-                    hands[game_number] = {
-                        DATETIME: hand_time,
-                        BET_TYPE: bet_type,
-                        GAME_TYPE: game_type,
-                        DEALER_NAME: dealer_name,
-                        TABLE: table_name,
-                        BIG_BLIND_AMOUNT: big_blind,
-                        SMALL_BLIND_AMOUNT: small_blind,
-                        ANTE_AMOUNT: ante,
-                        TEXT: "",
-                    }
-                    # Translate values from lookup tables
-                    hands[game_number][BET_TYPE] = structures[bet_type]
-                    hands[game_number][GAME_TYPE] = games[game_type]
-                    lines_parsed += 1
-                    hand_count += 1
-            elif hand_end_match is not None:
-                end_hand_number = hand_end_match.group("hand_number")
-            # Lines containing these strings will be ignored
-            elif any(
-                i in entry
-                for i in [
-                    "The admin",
-                    "joined",
-                    "requested",
-                    "canceled the seat",
-                    "authenticated",
-                    "quits",
-                    "stand up",
-                    "sit back",
-                    "Remaining players",
-                    "chooses",
-                    "choose to not",
-                    "Dead Small Blind",
-                    "room ownership",
-                    "IMPORTANT:",
-                    "WARNING:",
-                ]
-            ):
-                lines_ignored += 1
-            else:
-                if hand_number == "1":
-                    post = re.match(post_regex, entry)
-                    if post is not None:
-                        post_type = post.group("type")
-                        if post_type == "posts a small blind":
-                            small_blind = float(post.group("amount"))
-                            hands[game_number][SMALL_BLIND_AMOUNT] = small_blind
-                        elif post_type == "posts a big blind":
-                            big_blind = float(post.group("amount"))
-                            hands[game_number][BIG_BLIND_AMOUNT] = big_blind
-                        elif post_type == "posts an ante":
-                            ante = float(post.group("amount"))
-                            hands[game_number][ANTE_AMOUNT] = ante
-                # Any line that has made it this far without being processed will be added to text
-                # in the hands dictionary and be proccesed later
-                hands[game_number][TEXT] = hands[game_number][TEXT] + "\n" + entry
-                lines_saved += 1
-
-        poker_now_file.replace(csv_archive_dir.joinpath(poker_now_file.name))
-
-        logging.info(f"[{table_name}] ***FINISHED HAND SEPERATION***")
-        logging.info(f"[{table_name}] {lines_parsed} lines were parsed.")
-        logging.info(f"[{table_name}] {lines_ignored} lines were ignored.")
-        logging.info(f"[{table_name}] {lines_saved} lines were saved.")
-        logging.info(f"[{table_name}] {hand_count} hands were seperated.")
-        logging.info(
-            f"[{table_name}] {round(lines_saved/hand_count, 2)} average number of lines per hand."
-        )
-        logging.info(
-            f"[{table_name}][{perf_counter() - perf_start_1}] Performance counter for hand"
-            "seperation."
+# The settings of a run, set from the command line and config.ini when main.py is run as a script
+args: Namespace
+since_order: Optional[int]
+until_order: Optional[int]
+seek_logs: bool
+config: ConfigParser
+spec_version: str
+internal_version: str
+network_name: str
+site_name: str
+currency: str
+# The fields of each hand that come from the [OHH Constants] section, see parse_hand
+hand_constants: dict[str, str]
+tournament_settings: SectionProxy
+hero_name: str
+hero_directories: dict[str, Path]
+output_layout: OutputLayout
+output_formats: list[str]
+cache_bytes: int
+hand_validation: HandValidation
+# The logs of the batch, the number of logs left to commit in each file and their total size
+batch_logs: list[tuple[Path, Optional[str], int]]
+logs_left: dict[Path, int]
+total_bytes: int
+
+# The conversion runs when main.py is run as a script, importing it only defines the functions
+if __name__ == "__main__":
+    args = parse_arguments()
+    since_order = None if args.since is None else to_order(args.since)
+    until_order = None if args.until is None else to_order(args.until, end=True)
+    # The rows of the logs are searched with locate_range, see open_log
+    seek_logs = args.tail or since_order is not None or until_order is not None
+    config = get_config(config_path)
+    ohh_constants = config["OHH Constants"]
+    spec_version = ohh_constants[SPEC_VERSION]
+    internal_version = ohh_constants[INTERNAL_VERSION]
+    network_name = ohh_constants[NETWORK_NAME]
+    site_name = ohh_constants[SITE_NAME]
+    currency = ohh_constants[CURRENCY]
+    hand_constants = {
+        SPEC_VERSION: spec_version,
+        SITE_NAME: site_name,
+        NETWORK_NAME: network_name,
+        INTERNAL_VERSION: internal_version,
+        CURRENCY: currency,
+    }
+    tournament_settings = config[TOURNAMENT_CONFIG]
+    hero_name = ohh_constants[HERO_NAME]
+    # Check if hero_name is an empty string, if True then prompt the user to input a name for the
+    # hero and save the name to config.ini
+    if not hero_name.strip():
+        hero_name = console.input("Type in a name for the hero and press <ENTER>")
+        ohh_constants[HERO_NAME] = hero_name
+        update_setting(config_path, "OHH Constants", HERO_NAME, hero_name)
+
+    # Sorting the files keeps the order of the batch the same between runs, so an interrupted batch
+    # resumes with the first file that was not committed.
+    csv_file_list: list[Path] = sorted(
+        poker_now_file
+        for poker_now_file in csv_dir.iterdir()
+        if poker_now_file.name.endswith(LOG_SUFFIXES)
+    )
+    csv_archive_dir.mkdir(exist_ok=True)
+    ohh_directory.mkdir(exist_ok=True)
+    ots_directory.mkdir(exist_ok=True)
+    quarantine_directory.mkdir(exist_ok=True)
+    cache_directory.mkdir(exist_ok=True)
+    if args.tail:
+        tail_directory.mkdir(exist_ok=True)
+    hero_directories = hero_output_directories(ohh_constants[HEROES])
+    refresh_name_map()
+    log_dir.mkdir(exist_ok=True)
+    log_path = log_dir / Path("log_" + datetime.now().strftime("%Y%m%d-%H%M%S")).with_suffix(".log")
+    logging.basicConfig(
+        filename=log_path,
+        format="[%(asctime)s][%(created)f][%(levelname)s]:%(message)s",
+        level=logging.DEBUG,
+    )
+    batch_logs = list_logs(csv_file_list)
+    # The number of logs in each file that are left to commit before the file is archived. The
+    # logs skipped by --table are counted too, so a .zip file is only archived once all its logs
+    # have been converted.
+    logs_left = Counter(poker_now_file for poker_now_file, _, _ in batch_logs)
+    if args.table:
+        batch_logs = select_tables(batch_logs, args.table)
+    output_config = config[OUTPUT]
+    output_layout = OutputLayout(
+        output_config[PARTITION].strip().lower(),
+        int(output_config[MAX_HANDS]),
+        int(output_config[MAX_BYTES]),
+    )
+    output_formats = [
+        output_format.strip().lower()
+        for output_format in output_config[FORMATS].split(",")
+        if output_format.strip().lower() in output_suffixes
+    ] or [OHH]
+    # The size budget of the cache of parsed hands, 0 turns the cache off
+    cache_bytes = int(config[CACHE][MAX_BYTES])
+    validation = config[VALIDATION]
+    hand_validation = HandValidation(
+        validation[MODE].strip().lower(), float(validation[SAMPLE_RATE])
+    )
+    total_bytes = sum(size for _, _, size in batch_logs)
+    # As a service the converter stays loaded between requests instead of converting the batch of
+    # files
+    if args.serve:
+        server_settings = config[SERVER]
+        name_map_state[UNKNOWN_PLAYERS] = server_settings[UNKNOWN_PLAYERS].strip().lower()
+        serve(server_settings, args.port, convert_upload)
+        sys.exit()
+    uncommitted_count = sum(
+        remove_uncommitted(directory)
+        for directory in (ohh_directory, heroes_directory, ots_directory, cache_directory)
+    )
+    if args.rerender:
+        rerender()
+        logging.info(f"[ALL] {progress[FILES]} logs were rendered from the cache.")
+        console.print(
+            f"[magenta]{progress[FILES]}[/magenta] logs were rendered from the cache in "
+            f"[cyan]{round(perf_counter() - timer_perf_start, 2)} sec[/cyan]."
         )
+        sys.exit()
+    if uncommitted_count:
         logging.info(
-            f"[{table_name}][{process_time() - proc_start_1}] Process time for hand seperation."
+            f"[ALL] Removed {uncommitted_count} uncommitted files from an interrupted batch.")
+        console.print(
+            f"Resuming an interrupted batch, [magenta]{uncommitted_count}[/magenta] uncommitted "
+            "files were removed."
         )
-        perf_start_2 = perf_counter()
-        proc_start_2 = process_time()
-        logging.info(f"[{table_name}] ***STARTING HAND PROCESSING***")
-        unprocessed_count: int = 0
-        # Now that we have all hands from all the files, use the hand number of the imported hands
-        # to process them in sequential order. This is the place for processing the text of each
-        # hand and look for player actions
-        for game_number, hand in hands.items():
-            hand_time = hand[DATETIME]
-            tables[table_name][COUNT] += 1
-            tables[table_name][LATEST] = hand_time
-            tables[table_name][LAST] = game_number
-            # initialize the OHH JSON populating as many fields as possible and initializing arrays.
-            ohh = {
-                SPEC_VERSION: spec_version,
-                SITE_NAME: site_name,
-                NETWORK_NAME: network_name,
-                INTERNAL_VERSION: internal_version,
-                GAME_NUMBER: game_number,
-                START_DATE_UTC: hand[DATETIME],
-                TABLE_NAME: hand[TABLE],
-                GAME_TYPE: hand[GAME_TYPE],
-                BET_LIMIT: {BET_TYPE: hand[BET_TYPE]},
-                TABLE_SIZE: 10,
-                CURRENCY: currency,
-                DEALER_SEAT: 1,
-                SMALL_BLIND_AMOUNT: hand[SMALL_BLIND_AMOUNT],
-                BIG_BLIND_AMOUNT: hand[BIG_BLIND_AMOUNT],
-                ANTE_AMOUNT: hand[ANTE_AMOUNT],
-                HERO_PLAYER_ID: None,
-                FLAGS: [],
-                PLAYERS: [],
-                ROUNDS: [],
-                POTS: [],
-            }
-            # initialize variables, lists, and dictionaries for a new hand
-            players = []
-            player_ids = {}
-            current_round = first_rounds[ohh[GAME_TYPE]]
-            hero_playing: bool = bool(False)
-            winners = []
-            round_number: int = int(0)
-            action_number: int = int(0)
-            pot_number: int = int(0)
-            total_pot = float(0.00)
-            round_obj = {ID: 0, STREET: "", CARDS: [], ACTIONS: []}
-            pot_obj = {}
-            round_commit = {}
-            hand_text: str = hand[TEXT]
-            # Split the hand text and loop through it line by line looking for regular expressions
-            # to parse.
-            for line in hand_text.strip().splitlines(False):
-                # The text match to look for a seated player and see their starting chip amount.
-                seats = re.finditer(seats_regex, line)
-                if seats is not None:
-                    player_id: int = 0
-                    for player in seats:
-                        seat_number = int(player.group("seat"))
-                        player_display: str = player.group("player")
-                        device_id: str = player.group("device_id")
-                        player_stack = float(player.group("amount"))
-                        try:
-                            name = aliases_names[player_display]
-                            if device_id not in device_ids:
-                                console.print(
-                                    f"- The aliase [green]{player_display}[/green] is associated "
-                                    f"with [blue]{name}[/blue] but the device "
-                                    f"[magenta]{device_id}[/magenta] is not in the data model "
-                                    f"for this player. Adding [magenta]{device_id}[/magenta] to the"
-                                    f" data model for [blue]{name}[/blue]>>>"
-                                )
-                                players_map[name]["devices"].append(device_id)
-                                device_ids = switch_key_and_values(
-                                    players_map, "devices"
-                                )
-                                save_name_map(name_map_path, players_map)
-                        except KeyError:
-                            if device_id not in device_ids:
-                                name_input = console.input(
-                                    f"\n- The alias [green]{player_display}[/green] and device "
-                                    f"[magenta]{device_id}[/magenta] is not in the data model. Type"
-                                    f" the name to associate with [green]{player_display}[/green] "
-                                    "in the data model and press ENTER>>>"
-                                )
-                                try:
-                                    players_map[name_input]["nicknames"].append(
-                                        player_display
-                                    )
-                                    players_map[name_input]["devices"].append(
-                                        device_id)
-                                    device_ids = switch_key_and_values(
-                                        players_map, "devices"
-                                    )
-                                    aliases_names = switch_key_and_values(
-                                        players_map, "nicknames"
-                                    )
-                                    save_name_map(name_map_path, players_map)
-                                except KeyError:
-                                    players_map.update(
-                                        {
-                                            name_input: {
-                                                "nicknames": [player_display],
-                                                "devices": [device_id],
-                                            }
-                                        }
-                                    )
-                                    device_ids = switch_key_and_values(
-                                        players_map, "devices"
-                                    )
-                                    aliases_names = switch_key_and_values(
-                                        players_map, "nicknames"
-                                    )
-                                    save_name_map(name_map_path, players_map)
-                            else:
-                                name = device_ids[device_id]
-                                bool_input = console.input(
-                                    f"\n- The alias [green]{player_display}[/green] is not in "
-                                    f"data model but the device [magenta]{device_id}[/magenta] has "
-                                    f"been used by [blue]{name}[/blue]. If "
-                                    f"[green]{player_display}[/green] is [blue]{name}[/blue] type "
-                                    f"[yellow]'Y'[/yellow], if this is not [blue]{name}[/blue] "
-                                    "[yellow]'N'[/yellow] and press ENTER>>>"
-                                )
-                                if bool_input == "Y":
-                                    players_map[name]["nicknames"].append(
-                                        player_display
-                                    )
-                                    aliases_names = switch_key_and_values(
-                                        players_map, "nicknames"
-                                    )
-                                    save_name_map(name_map_path, players_map)
-                                elif bool_input == "N":
-                                    name_input = console.input(
-                                        "\n[red]IMPORTANT:[/red] If different players are playing "
-                                        "from the same device then there is the potential for "
-                                        "cheating. Please type the name to associate alias "
-                                        f"[green]{player_display}[/green] and press ENTER>>>"
-                                    )
-                                    try:
-                                        players_map[name_input]["nicknames"].append(
-                                            player_display
-                                        )
-                                        players_map[name_input]["devices"].append(
-                                            device_id
-                                        )
-                                        device_ids = switch_key_and_values(
-                                            players_map, "devices"
-                                        )
-                                        aliases_names = switch_key_and_values(
-                                            players_map, "nicknames"
-                                        )
-                                    except KeyError:
-                                        players_map.update(
-                                            {
-                                                name_input: {
-                                                    "nicknames": [player_display],
-                                                    "devices": [device_id],
-                                                }
-                                            }
-                                        )
-                            name = aliases_names[player_display]
-                        players.append(
-                            {
-                                ID: player_id,
-                                SEAT: seat_number,
-                                NAME: name,
-                                DISPLAY: player_display,
-                                STARTING_STACK: player_stack,
-                            }
-                        )
-                        name = aliases_names[player_display]
-                        # If the player is the dealer, set the value of the dealers seat number in
-                        # the ohh dictionary
-                        if hand[DEALER_NAME] == player_display:
-                            ohh[DEALER_SEAT] = seat_number
-                        # If the player is the hero, set the value of players ID in the ohh
-                        # dictionary.
-                        if name == hero_name:
-                            ohh[HERO_PLAYER_ID] = player_id
-                            hero_playing: bool = True
-                        # The OHH standard has a unique identifier for every player within the hand.
-                        # This id is used to identify the player in all other locations of the hand
-                        # history. Therefore, it is convenient to creat a dictionary to easily pull
-                        # out the id of each player when needed.
-                        player_ids[player_display] = player_id
-                        player_id += 1
-                        continue
-                # the text to match for a post this also indicates that the dealing is happening and
-                # we should move to the phase of assembling rounds of actions.
-                post = re.match(post_regex, line)
-                if post is not None:
-                    player = post.group("player")
-                    post_type = post.group("type")
-                    amount = float(post.group("amount"))
-                    all_in = post.group("all_in")
-                    round_obj[ID] = round_number
-                    round_obj[STREET] = current_round
-                    action = {}
-                    action[ACTION_NUMBER] = action_number
-                    action[PLAYER_ID] = player_ids[player]
-                    action[ACTION] = post_types[post_type]
-                    # Poker now records the amounts associated with actions such as bets, raises,
-                    # calls, and posting blinds as the the sum total of the current and all previous
-                    # actions of the player during the round. However, the OHH standard requires the
-                    # amount put in from the current action rather than the sum total of the round.
-                    # This difference in accounting methods requires the amount commited by each
-                    # player in the round to be rcorded in a dictionary
-                    # {player1: amount, player2: amount, ...}.
-                    # The amount the player has commited to the round can then be subtracted from
-                    # the current amount to get the amount commited in the action, that OHH
-                    # requires. There is one exception to this rule, in the case of a dead blind
-                    # being posted by a player who missed the blinds. Posting a missed SB is
-                    # considered a "dead" and is not considered to be a amount commited, but a
-                    # missed BB is a "live"blind and should be added to the amount commited to the
-                    # round.
-                    if action[ACTION] != "Post Dead" and action[ACTION] != "Post Ante":
-                        amount = round(amount - round_commit[player], 2)
-                        round_commit[player] += amount
-                    action[AMOUNT] = amount
-                    if all_in is not None:
-                        action[IS_ALL_IN] = True
-                    else:
-                        action[IS_ALL_IN] = False
-                    round_obj[ACTIONS].append(action)
-                    total_pot += amount
-                    action_number += 1
-                    continue
-                # look for round markers note that cards dealt are melded together with opening
-                # round and do not necessarily mark a new round
-                round_marker = re.match(round_regex, line)
-                cards_match = re.search(cards_regex, line)
-                if round_marker is not None:
-                    label = round_marker.group("street")
-                    if label == PLAYER_STACKS:
-                        action_number: int = 0
-                        round_obj[ID] = round_number
-                        current_round = first_rounds[ohh[GAME_TYPE]]
-                        round_obj[STREET] = current_round
-                        action = {}
-                        round_commit = {}
-                        for p in player_ids:
-                            round_commit[p] = float(0)
-                    elif label in make_new_round:
-                        # Make new round we need to add current round object to the OHH JSON and
-                        # make a clean one increment round number and reset action number
-                        ohh[ROUNDS].append(round_obj)
-                        round_obj = {}
-                        round_number += 1
-                        action_number: int = 0
-                        current_round = make_new_round[label]
-                        round_obj[ID] = round_number
-                        round_obj[STREET] = current_round
-                        round_obj[CARDS] = []
-                        round_obj[ACTIONS] = []
-                        round_commit = {}
-                        for p in player_ids:
-                            round_commit[p] = 0
-                        if cards_match is not None:
-                            cards = cards_match.group("cards")
-                            for card in cards.split(", "):
-                                round_obj[CARDS].append(card)
-                        else:
-                            continue
-                    continue
-                show_hand = re.search(show_regex, line)
-                if show_hand is not None:
-                    player = show_hand.group("player")
-                    does = show_hand.group("player_action")
-                    cards = show_hand.group("cards")
-                    if current_round != SHOW_DOWN:
-                        ohh[ROUNDS].append(round_obj)
-                        round_obj = {}
-                        round_number += 1
-                        action_number: int = 0
-                        current_round: str = SHOW_DOWN
-                        round_obj[ID] = round_number
-                        round_obj[STREET] = make_new_round[SHOW_DOWN]
-                        round_obj[ACTIONS] = []
-                    action = {}
-                    action[ACTION_NUMBER] = action_number
-                    action[PLAYER_ID] = player_ids[player]
-                    action[ACTION] = "Shows Cards"
-                    action[CARDS] = []
-                    for card in cards.split(", "):
-                        action[CARDS].append(card)
-                    action[IS_ALL_IN] = False
-                    round_obj[ACTIONS].append(action)
-                    action_number += 1
-                    round_commit = {}
-                    for p in player_ids:
-                        round_commit[p] = 0
-                    continue
-                # the text to match for an add on
-                add_on = re.match(addon_regex, line)
-                if add_on is not None:
-                    player = add_on.group("player")
-                    additional = float(add_on.group("amount"))
-                    if current_round is not None and player in player_ids:
-                        action = {}
-                        action[ACTION_NUMBER] = action_number
-                        action[PLAYER_ID] = player_ids[player]
-                        action[AMOUNT] = additional
-                        action[ACTION] = "Added Chips"
-                        round_obj[ACTIONS].append(action)
-                        action_number += 1
-                    continue
-                # the text to match for cards dealt
-                hero_hand = re.match(hero_hand_regex, line)
-                if hero_hand is not None:
-                    cards = hero_hand.group("cards")
-                    action = {}
-                    action[ACTION_NUMBER] = action_number
-                    action[PLAYER_ID] = ohh[HERO_PLAYER_ID]
-                    action[ACTION] = "Dealt Cards"
-                    action[CARDS] = []
-                    for card in cards.split(", "):
-                        action[CARDS].append(card)
-                    action[IS_ALL_IN] = False
-                    round_obj[ACTIONS].append(action)
-                    action_number += 1
-                    continue
-                non_bet_action = re.match(non_bet_action_regex, line)
-                if non_bet_action is not None:
-                    player = non_bet_action.group("player")
-                    does = non_bet_action.group("player_action")
-                    action = {}
-                    action[ACTION_NUMBER] = action_number
-                    action[PLAYER_ID] = player_ids[player]
-                    action[ACTION] = verb_to_action[does]
-                    action[AMOUNT] = 0.00
-                    action[IS_ALL_IN] = False
-                    round_obj[ACTIONS].append(action)
-                    action_number += 1
-                    continue
-                bet_action = re.match(bet_action_regex, line)
-                if bet_action is not None:
-                    player = bet_action.group("player")
-                    does = bet_action.group("player_action")
-                    amount = float(bet_action.group("amount"))
-                    all_in = bet_action.group("all_in")
-                    action = {}
-                    action[ACTION_NUMBER] = action_number
-                    action[PLAYER_ID] = player_ids[player]
-                    action[ACTION] = verb_to_action[does]
-                    if does in ("raises", "calls"):
-                        amount = round(amount - round_commit[player], 2)
-                    action[AMOUNT] = amount
-                    round_commit[player] += amount
-                    total_pot += amount
-                    if all_in is not None:
-                        action[IS_ALL_IN] = True
-                    else:
-                        action[IS_ALL_IN] = False
-                    round_obj[ACTIONS].append(action)
-                    action_number += 1
-                    continue
-                uncalled_bet_match = re.match(uncalled_regex, line)
-                if uncalled_bet_match is not None:
-                    amount = round(
-                        float(uncalled_bet_match.group("amount")), 2)
-                    total_pot -= amount
-                    continue
-                winner = re.match(winner_regex, line)
-                if winner is not None:
-                    player = winner.group("player")
-                    does = winner.group("player_action")
-                    amount = float(winner.group("amount"))
-                    player_id = player_ids[player]
-                    winners.append(player_id)
-                    if pot_number not in pot_obj:
-                        pot_obj[pot_number] = {
-                            NUMBER: pot_number,
-                            AMOUNT: 0.00,
-                            RAKE: 0.00,
-                            PLAYER_WINS: {},
-                        }
-                    if not player_id in pot_obj[pot_number][PLAYER_WINS]:
-                        pot_obj[pot_number][PLAYER_WINS][player_id] = {
-                            PLAYER_ID: player_id,
-                            WIN_AMOUNT: 0.00,
-                            CONTRIBUTED_RAKE: 0.00,
-                        }
-                    pot_obj[pot_number][AMOUNT] += amount
-                    pot_obj[pot_number][PLAYER_WINS][player_id][WIN_AMOUNT] += amount
-                    continue
-                # Hands with the option to run it twice there are several lines in the
-                # csv file that will contain the string "run it twice" but the only line
-                # that will have made it this far will indicat that all players approved.
-                if "run it twice" in line:
-                    ohh[FLAGS].append("Run_It_Twice")
-                    continue
-                unprocessed_count += 1
-                logging.debug(
-                    f"[{table_name}][{game_number}] '{line}' was not processed."
-                )
 
-            for pot_number, pot in pot_obj.items():
-                amt = round(pot[AMOUNT], 2)
-                rake = pot[RAKE]
-                potObj = {NUMBER: pot_number, AMOUNT: amt,
-                          RAKE: rake, PLAYER_WINS: []}
-                for player_id in pot[PLAYER_WINS]:
-                    win_amount = round(
-                        pot[PLAYER_WINS][player_id][WIN_AMOUNT], 2)
-                    rake_contribution = pot[PLAYER_WINS][player_id][CONTRIBUTED_RAKE]
-                    player_win_obj = {
-                        PLAYER_ID: player_id,
-                        WIN_AMOUNT: win_amount,
-                        CONTRIBUTED_RAKE: rake_contribution,
-                    }
-                    potObj[PLAYER_WINS].append(player_win_obj)
-                if round(pot[AMOUNT], 2) != round(total_pot, 2):
-                    logging.debug(
-                        f"[{table_name}][{game_number}] Calculated pot ({round(total_pot, 2)})"
-                        f"does not equal collected pot ({round(pot[AMOUNT], 2)})"
-                    )
-
-                ohh[POTS].append(potObj)
-            if hero_playing is False:
-                ohh[FLAGS].append("Observed")
-            ohh[PLAYERS] = players
-            ohh[ROUNDS].append(round_obj)
-            table.append(ohh)
-        logging.info(f"[{table_name}] ***FINISHED HAND PARSING***")
-        logging.info(
-            f"[{table_name}] {unprocessed_count} lines were not parsed.")
-        ohh_directory = Path("OpenHandHistory")
-        with open(
-            ohh_directory / poker_now_file.with_suffix(".ohh").name,
-            "w",
-            encoding="utf-8",
-        ) as f:
-            for ohh in table:
-                wrapped_ohh = {}
-                wrapped_ohh[OHH] = ohh
-                f.write(json.dumps(wrapped_ohh, indent=4))
-                f.write("\n")
-                f.write("\n")
-        logging.info(
-            f"[{table_name}][{perf_counter() - perf_start_2}] Performance counter for hand parsing."
-        )
-        logging.info(
-            f"[{table_name}][{process_time() - proc_start_2}] Process time for hand parsing."
-        )
-        percent_complete = round(
-            ((csv_file_list.index(poker_now_file) + 1) / len(csv_file_list)) * 100, 2
+    progress_stop = start_progress(config[PROGRESS], len(batch_logs), total_bytes)
+    try:
+        convert_batch(config[PIPELINE])
+    finally:
+        stop_progress(progress_stop)
+    logging.info(f"[ALL] {progress[QUARANTINED]} hands were quarantined.")
+    console.print(
+        f"[magenta]{progress[QUARANTINED]}[/magenta] hands were quarantined, see the "
+        f"[green]{quarantine_directory}[/green] folder."
+    )
+    logging.info(f"[ALL] {progress[DISCONTINUITIES]} stack discontinuities were found.")
+    console.print(
+        f"[magenta]{progress[DISCONTINUITIES]}[/magenta] stack discontinuities were found, see "
+        "the log."
+    )
+    if progress[FAILED]:
+        logging.error(
+            f"[ALL] {len(progress[FAILED])} logs could not be converted: "
+            f"{', '.join(progress[FAILED])}"
         )
         console.print(
-            f"Completed processing [magenta]{csv_file_list.index(poker_now_file) + 1}[/magenta] "
-            f"of [magenta]{len(csv_file_list)}[/magenta] files, "
-            f"[cyan]{percent_complete}%[/cyan] "
-            f"complete. Time to process table [green]{table_name}[/green]"
+            f"[red]{len(progress[FAILED])} logs could not be converted and were left in the "
+            f"{csv_dir} folder, see the log.[/red]"
         )
-        console.print(
-            f"[blue]{round(perf_counter() - perf_start_2, 6)} sec[/blue] Performance counter."
+    if hand_validation.mode != OFF:
+        logging.info(
+            f"[ALL] {hand_validation.counts[INVALID]} of {hand_validation.counts[COUNT]} validated "
+            "hands were invalid."
         )
         console.print(
-            f"[blue]{process_time() - proc_start_2} sec[/blue] Process time.")
-logging.info(
-    f"[ALL][{perf_counter() - timer_perf_start}] Performance counter for all hands."
-)
-logging.info(
-    f"[ALL][{process_time() - timer_proc_start}] Process time for all hands.")
-console.print(
-    f"[cyan]{round(perf_counter() - timer_perf_start, 2)} sec[/cyan] Performance counter for all "
-    "hands."
-)
-console.print(
-    f"[cyan]{process_time() - timer_proc_start} sec[/cyan] Process time for all hands."
-)
+            f"[magenta]{hand_validation.counts[INVALID]}[/magenta] of "
+            f"[magenta]{hand_validation.counts[COUNT]}[/magenta] validated hands were invalid."
+        )
+    logging.info(
+        f"[ALL][{perf_counter() - timer_perf_start}] Performance counter for all hands."
+    )
+    logging.info(
+        f"[ALL][{process_time() - timer_proc_start}] Process time for all hands.")
+    console.print(
+        f"[cyan]{round(perf_counter() - timer_perf_start, 2)} sec[/cyan] Performance counter for "
+        "all hands."
+    )
+    console.print(
+        f"[cyan]{process_time() - timer_proc_start} sec[/cyan] Process time for all hands."
+    )
+    if progress[FAILED]:
+        sys.exit(1)
 # end of code
 # *************************************************************************************************
@@ -0,0 +1,293 @@
+# name_map.py
+"""
+****************************************************************************************************
+WHAT THIS DOES
+
+Keep the name-map data model of main.py, the real name of each player with the aliases they chose
+at the tables ("nicknames") and the IDs of the devices they played from. It is stored in
+Config/name-map.json. Players can choose a different alias every time they sit at a table, so the
+hands are converted with the names of the players instead of their aliases.
+
+The aliases and devices of a log that are not in the data model are resolved before its hands are
+parsed. The user is prompted for the name of an unknown player and the data model is saved once for
+the log. When the converter is running as a service there is no one to prompt, the unknown_players
+setting of the [Server] section of config.ini decides what happens to an unknown player and the
+data model is not saved.
+****************************************************************************************************
+"""
+# MODULES
+import json
+import logging
+from pathlib import Path
+from threading import Lock
+
+from constants import NAME_MAP_MTIME, QUARANTINE, UNKNOWN_PLAYERS
+from dashboard import print_message, prompt_user
+
+# END MODULES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# FUNCTIONS
+def load_name_map(file: Path):
+    """Open aliase->name map file (aliase-name_map.json) and parse it.  If the file is not found
+        then create a json file.
+
+    Args:
+        file (Path): Path to the input file to be parsed
+
+    Returns:
+        _type_: _description_
+    """
+    try:
+        with open(file, mode="r", encoding="utf-8") as map_file:
+            return json.load(map_file)
+    except FileNotFoundError:
+        with open(file, mode="a+", encoding="utf-8") as map_file:
+            init_name_map: dict[str, dict[str, list[str]]] = {}
+            save_name_map(file, init_name_map)
+            return json.load(map_file)
+
+
+def save_name_map(file: Path, name_map: dict[str, dict[str, list[str]]]):
+    """_summary_
+
+    Args:
+        file (Path): Path to the input file to be parsed
+        name_map (dict[str, dict[str, list[str]]]): _description_
+    """
+    try:
+        with open(file, mode="w", encoding="utf-8") as map_file:
+            json.dump(dict(sorted(name_map.items())), map_file, indent=4)
+    except FileNotFoundError:
+        with open(file, mode="a+", encoding="utf-8") as map_file:
+            json.dump(name_map, map_file, indent=4)
+
+
+def switch_key_and_values(name_map: dict[str, dict[str, list[str]]], key_txt: str):
+    """Players can choose a different alias every time they sit at the table; therefore, it is
+    necissary to map the players real name to the aliases they have chosen. The information
+    needed to create the aliase->name map is recorded in the file aliase-name_map.json where
+    each player name has an array of aliases. The data will be parsed into a dictionary of lists
+    where the keys are the names and the values are lists of aliases. The aliase->name map is
+    created by flattening the alias lists and switching the keys (names) and values (aliases)
+
+    Args:
+        name_map (dict[str, dict[str, list[str]]]): _description_
+        key_txt (str): _description_
+
+    Returns:
+        dict[str, str]: _description_
+    """
+    names: dict[str, str] = {}
+    for key, values in name_map.items():
+        for value in values[key_txt]:
+            names[value] = key
+    return names
+
+
+def refresh_name_map() -> None:
+    """Load the name-map data model, and load it again if the file was changed since it was loaded,
+    so a running service picks up names added to the data model without a restart. The file is
+    created if it does not exist.
+
+    Returns:
+        None
+    """
+    with name_map_lock:
+        if (
+            name_map_path.exists()
+            and name_map_path.stat().st_mtime == name_map_state[NAME_MAP_MTIME]
+        ):
+            return
+        name_map = load_name_map(name_map_path)
+        name_map_state[NAME_MAP_MTIME] = name_map_path.stat().st_mtime
+        players_map.clear()
+        players_map.update(name_map)
+        aliases_names.clear()
+        aliases_names.update(switch_key_and_values(players_map, "nicknames"))
+        device_ids.clear()
+        device_ids.update(switch_key_and_values(players_map, "devices"))
+
+
+def resolve_players(table_name: str, players: list[tuple[str, str]]) -> None:
+    """Add the players of a log that are not in the name-map data model before its hands are
+    parsed, prompting the user for all of them at once. The players are collected by separate_hands
+    while the log is separated, and name-map.json is written once for the log.
+
+    Args:
+        table_name (str): Name of the table taken from the name of the Poker Now csv file.
+        players (list[tuple[str, str]]): The alias and device ID of each player of the log.
+
+    Returns:
+        None
+    """
+    unseen = [
+        (player_display, device_id)
+        for player_display, device_id in players
+        if player_display not in aliases_names or device_id not in device_ids
+    ]
+    if not unseen:
+        return
+    logging.info(f"[{table_name}] {len(unseen)} players are not in the name-map data model.")
+    for player_display, device_id in unseen:
+        # A player added earlier in the log can cover the alias and the device of a later one
+        if player_display not in aliases_names or device_id not in device_ids:
+            resolve_name(player_display, device_id)
+    with name_map_lock:
+        save_name_map(name_map_path, players_map)
+
+
+def resolve_name(player_display: str, device_id: str) -> str:
+    """Get the name of the player using the alias and the device ID from the seat line. If the alias
+    or the device ID is not in the name-map data model, then the user is prompted for the
+    information needed to update the data model before continuing.
+
+    Args:
+        player_display (str): The alias the player chose when sitting at the table.
+        device_id (str): The ID of the device the player is using.
+
+    Returns:
+        str: The name of the player.
+    """
+    try:
+        name = aliases_names[player_display]
+        # The service does not write name-map.json, a batch conversion running at the same time
+        # could write it too, so the new device is only logged
+        if device_id not in device_ids and name_map_state[UNKNOWN_PLAYERS] is not None:
+            logging.warning(
+                f"[SERVER] The device {device_id} of {player_display} ({name}) is not in the data "
+                "model, it is not added while the converter is running as a service."
+            )
+        elif device_id not in device_ids:
+            print_message(
+                f"- The aliase [green]{player_display}[/green] is associated "
+                f"with [blue]{name}[/blue] but the device "
+                f"[magenta]{device_id}[/magenta] is not in the data model "
+                f"for this player. Adding [magenta]{device_id}[/magenta] to the"
+                f" data model for [blue]{name}[/blue]>>>"
+            )
+            with name_map_lock:
+                players_map[name]["devices"].append(device_id)
+                device_ids.update(switch_key_and_values(players_map, "devices"))
+    except KeyError:
+        # There is no one to answer the prompts when the converter is running as a service
+        if name_map_state[UNKNOWN_PLAYERS] is not None:
+            return unknown_player(player_display, device_id)
+        # The parser workers prompt one at a time, the alias may have been added while waiting
+        with prompt_lock:
+            if player_display not in aliases_names:
+                prompt_player(player_display, device_id)
+        name = aliases_names[player_display]
+    return name
+
+
+def prompt_player(player_display: str, device_id: str) -> None:
+    """Prompt the user for the name of a player whose alias is not in the name-map data model and
+    add the alias and the device ID to the data model.
+
+    Args:
+        player_display (str): The alias the player chose when sitting at the table.
+        device_id (str): The ID of the device the player is using.
+
+    Returns:
+        None
+    """
+    if device_id not in device_ids:
+        name_input = prompt_user(
+            f"\n- The alias [green]{player_display}[/green] and device "
+            f"[magenta]{device_id}[/magenta] is not in the data model. Type"
+            f" the name to associate with [green]{player_display}[/green] "
+            "in the data model and press ENTER>>>"
+        )
+        add_player(name_input, player_display, device_id)
+    else:
+        name = device_ids[device_id]
+        bool_input = prompt_user(
+            f"\n- The alias [green]{player_display}[/green] is not in "
+            f"data model but the device [magenta]{device_id}[/magenta] has "
+            f"been used by [blue]{name}[/blue]. If "
+            f"[green]{player_display}[/green] is [blue]{name}[/blue] type "
+            f"[yellow]'Y'[/yellow], if this is not [blue]{name}[/blue] "
+            "[yellow]'N'[/yellow] and press ENTER>>>"
+        )
+        if bool_input == "Y":
+            players_map[name]["nicknames"].append(
+                player_display
+            )
+            aliases_names.update(switch_key_and_values(players_map, "nicknames"))
+        elif bool_input == "N":
+            name_input = prompt_user(
+                "\n[red]IMPORTANT:[/red] If different players are playing "
+                "from the same device then there is the potential for "
+                "cheating. Please type the name to associate alias "
+                f"[green]{player_display}[/green] and press ENTER>>>"
+            )
+            add_player(name_input, player_display, device_id)
+
+
+def add_player(name: str, player_display: str, device_id: str) -> None:
+    """Add an alias and a device ID to a player in the name-map data model, the player is added if
+    the name is not in the data model.
+
+    Args:
+        name (str): The name of the player.
+        player_display (str): The alias the player chose when sitting at the table.
+        device_id (str): The ID of the device the player is using.
+
+    Returns:
+        None
+    """
+    if name in players_map:
+        players_map[name]["nicknames"].append(player_display)
+        players_map[name]["devices"].append(device_id)
+    else:
+        players_map[name] = {"nicknames": [player_display], "devices": [device_id]}
+    device_ids.update(switch_key_and_values(players_map, "devices"))
+    aliases_names.update(switch_key_and_values(players_map, "nicknames"))
+
+
+def unknown_player(player_display: str, device_id: str) -> str:
+    """Name a player whose alias is not in the name-map data model without prompting the user. With
+    the unknown_players setting of the [Server] section of config.ini set to alias, the player is
+    named by their alias and the data model is not changed. Set to quarantine, the hand is
+    quarantined.
+
+    Args:
+        player_display (str): The alias the player chose when sitting at the table.
+        device_id (str): The ID of the device the player is using.
+
+    Returns:
+        str: The name of the player.
+    """
+    if name_map_state[UNKNOWN_PLAYERS] == QUARANTINE:
+        raise LookupError(
+            f"The alias {player_display} and device {device_id} are not in the data model."
+        )
+    logging.warning(
+        f"[SERVER] The alias {player_display} and device {device_id} are not in the data model, "
+        "the alias is used as the name."
+    )
+    return player_display
+
+
+# END OF FUNCTIONS
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# CODE
+name_map_path = Path("Config/name-map.json")
+# The data model, the aliases and devices of each player by name, and the name of each alias and of
+# each device, loaded by refresh_name_map
+players_map: dict[str, dict[str, list[str]]] = {}
+aliases_names: dict[str, str] = {}
+device_ids: dict[str, str] = {}
+name_map_lock = Lock()
+prompt_lock = Lock()
+# The modification time of name-map.json when it was loaded, see refresh_name_map. UNKNOWN_PLAYERS
+# is None while the user can be prompted for players that are not in the name-map data model.
+name_map_state = {NAME_MAP_MTIME: 0.0, UNKNOWN_PLAYERS: None}
+# end of code
+# **************************************************************************************************
@@ -0,0 +1,546 @@
+# output.py
+"""
+****************************************************************************************************
+WHAT THIS DOES
+
+Serialize the hand histories converted by main.py and commit them to the output folders.
+
+Every output file is committed atomically: it is written to a temporary file in the same folder,
+flushed to disk and renamed over the file, then the folder is flushed. An interrupted batch never
+leaves a partially written file, only temporary files that are removed by the next run.
+
+The output of a hero can be partitioned by the date the hands started, by table or by whether the
+hero played the hand, and the hands of a log in a partition roll over to a new part file at a number
+of hands or a size. Logs that are tailed are appended to a single file instead.
+****************************************************************************************************
+"""
+# MODULES
+from dataclasses import dataclass
+import io
+from json.encoder import encode_basestring_ascii
+import os
+from pathlib import Path
+import re
+from typing import Optional, Union
+
+from constants import (
+    AMOUNT,
+    ANTE_AMOUNT,
+    BIG_BLIND_AMOUNT,
+    BOUNTY_FEE_AMOUNT,
+    BUYIN_AMOUNT,
+    BY_DATE,
+    BY_HERO,
+    BY_TABLE,
+    CONTRIBUTED_RAKE,
+    FEE_AMOUNT,
+    HERO_PLAYER_ID,
+    INITIAL_STACK,
+    OHH,
+    POKERSTARS,
+    RAKE,
+    SMALL_BLIND_AMOUNT,
+    START_DATE_UTC,
+    STARTING_STACK,
+    TEMP_PREFIX,
+    TEMP_SUFFIX,
+    WIN_AMOUNT,
+)
+from pokerstars import encode_pokerstars, tournament_levels
+
+# END MODULES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# CONSTANTS
+# The indent of each level of a pretty hand history, as written by json.dumps with indent=4
+JSON_INDENT = "    "
+# END CONSTANTS
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# LOOKUP TABLE
+# The suffix of the files written for each output format
+output_suffixes = {OHH: ".ohh", POKERSTARS: ".txt"}
+
+# The fields of the OHH format that hold amounts, they are kept in cents until the hand is written
+amount_fields = frozenset(
+    {
+        SMALL_BLIND_AMOUNT,
+        BIG_BLIND_AMOUNT,
+        ANTE_AMOUNT,
+        BUYIN_AMOUNT,
+        FEE_AMOUNT,
+        BOUNTY_FEE_AMOUNT,
+        INITIAL_STACK,
+        STARTING_STACK,
+        AMOUNT,
+        RAKE,
+        WIN_AMOUNT,
+        CONTRIBUTED_RAKE,
+    }
+)
+
+# The name of a part file without its suffix, see commit_parts
+part_name_regex = re.compile(r"(?P<stem>.+)_part\d+")
+# END LOOKUP TABLES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# DATA STRUCTURES
+@dataclass(frozen=True)
+class OutputLayout:
+    """How the hand histories of a hero are laid out in their output folder, set by the [Output]
+    section of config.ini.
+
+    Attributes:
+        partition (str): none, date, table or hero, see partition_key.
+        max_hands (int): The most hands in a part file, 0 for no limit.
+        max_bytes (int): The largest size of a part file in bytes, 0 for no limit.
+    """
+
+    partition: str
+    max_hands: int
+    max_bytes: int
+
+
+# END DATA STRUCTURES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# FUNCTIONS
+def uncommitted_path(path: Path) -> Path:
+    """Get the path of the temporary file a file is written to before it is committed.
+
+    Args:
+        path (Path): Path to the file to be committed.
+
+    Returns:
+        Path: Path to the temporary file, in the same folder so the rename is atomic.
+    """
+    return path.with_name(TEMP_PREFIX + path.name + TEMP_SUFFIX)
+
+
+def replace_file(temp_path: Path, path: Path) -> None:
+    """Rename a temporary file that was flushed to disk over path, then flush the folder so the
+    rename itself survives a crash.
+
+    Args:
+        temp_path (Path): Path to the temporary file, see uncommitted_path.
+        path (Path): Path to the file to be committed.
+
+    Returns:
+        None
+    """
+    os.replace(temp_path, path)
+    sync_directory(path.parent)
+
+
+def sync_directory(directory: Path) -> None:
+    """Flush a folder to disk, so the files renamed or removed in it stay that way after a crash.
+
+    Args:
+        directory (Path): The folder to flush.
+
+    Returns:
+        None
+    """
+    # Folders cannot be opened to be flushed on Windows, where the rename is flushed with the file
+    if hasattr(os, "O_DIRECTORY"):
+        directory_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
+
+
+def commit_ohh(path: Path, encoded: list[str]) -> None:
+    """Write the hand histories for a table to a temporary file, flush it to disk and then rename it
+    to path. The rename is atomic, so path either holds the complete output of a previous commit or
+    the complete output of this one, never a partially written file.
+
+    Args:
+        path (Path): Path to the .ohh file to be committed.
+        encoded (list[str]): The hand histories serialized by encode_ohh.
+
+    Returns:
+        None
+    """
+    temp_path = uncommitted_path(path)
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.writelines(encoded)
+        f.flush()
+        os.fsync(f.fileno())
+    replace_file(temp_path, path)
+
+
+def json_scalar(value: object) -> str:
+    """Write a string, number, boolean or null as JSON, the way json.dumps writes it.
+
+    Args:
+        value (object): The value.
+
+    Returns:
+        str: The value as JSON.
+    """
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return int.__repr__(value)
+    return float.__repr__(value)
+
+
+def write_json(value: object, chunks: list[str], newline: Optional[str]) -> None:
+    """Append a value as JSON to chunks, the way json.dumps writes it with indent=4, or on a single
+    line without indent. The amounts of the OHH format are written as decimals, see amount_fields.
+
+    Args:
+        value (object): The value, a hand history or a part of it with the amounts in cents.
+        chunks (list[str]): The JSON written so far.
+        newline (str, optional): The line break and indent of the level of the value, None to write
+            the value on a single line.
+
+    Returns:
+        None
+    """
+    if isinstance(value, dict):
+        write_object(value, chunks, newline)
+    elif isinstance(value, (list, tuple)):
+        write_array(value, chunks, newline)
+    else:
+        chunks.append(json_scalar(value))
+
+
+def write_object(obj: dict, chunks: list[str], newline: Optional[str]) -> None:
+    """Append an object as JSON to chunks, see write_json.
+
+    Args:
+        obj (dict): The object.
+        chunks (list[str]): The JSON written so far.
+        newline (str, optional): The line break and indent of the level of the object, None to write
+            the object on a single line.
+
+    Returns:
+        None
+    """
+    if not obj:
+        chunks.append("{}")
+        return
+    inner = None if newline is None else newline + JSON_INDENT
+    separator = ", " if inner is None else "," + inner
+    chunks.append("{" if inner is None else "{" + inner)
+    for number, (key, value) in enumerate(obj.items()):
+        if number:
+            chunks.append(separator)
+        chunks.append(encode_basestring_ascii(key) + ": ")
+        if key in amount_fields and isinstance(value, int) and not isinstance(value, bool):
+            chunks.append(float.__repr__(value / 100))
+        elif isinstance(value, (dict, list, tuple)):
+            write_json(value, chunks, inner)
+        else:
+            chunks.append(json_scalar(value))
+    chunks.append("}" if newline is None else newline + "}")
+
+
+def write_array(array: Union[list, tuple], chunks: list[str], newline: Optional[str]) -> None:
+    """Append an array as JSON to chunks, see write_json.
+
+    Args:
+        array (Union[list, tuple]): The array.
+        chunks (list[str]): The JSON written so far.
+        newline (str, optional): The line break and indent of the level of the array, None to write
+            the array on a single line.
+
+    Returns:
+        None
+    """
+    if not array:
+        chunks.append("[]")
+        return
+    inner = None if newline is None else newline + JSON_INDENT
+    separator = ", " if inner is None else "," + inner
+    chunks.append("[" if inner is None else "[" + inner)
+    for number, value in enumerate(array):
+        if number:
+            chunks.append(separator)
+        if isinstance(value, (dict, list, tuple)):
+            write_json(value, chunks, inner)
+        else:
+            chunks.append(json_scalar(value))
+    chunks.append("]" if newline is None else newline + "]")
+
+
+def encode_ohh(ohh: dict, pretty: bool = True) -> str:
+    """Wrap a hand history in an ohh object and serialize it. Pretty hand histories are indented and
+    followed by a blank line, the way they are written to .ohh files, otherwise the hand history is
+    written on a single line for NDJSON. The amounts are converted from cents to decimals while the
+    JSON is written, so the hand is neither copied nor changed.
+
+    Args:
+        ohh (dict): The hand history in JSON following the OHH format, with the amounts in cents.
+        pretty (bool): True to indent the JSON.
+
+    Returns:
+        str: The serialized hand history.
+    """
+    chunks: list[str] = []
+    if pretty:
+        write_object({OHH: ohh}, chunks, "\n")
+        chunks.append("\n\n")
+    else:
+        write_object({OHH: ohh}, chunks, None)
+        chunks.append("\n")
+    return "".join(chunks)
+
+
+def encode_hands(table: list[dict], output_format: str) -> list[str]:
+    """Serialize the hand histories of a table in an output format.
+
+    Args:
+        table (list[dict]): The hand histories rendered for a hero.
+        output_format (str): ohh for pretty OHH JSON or pokerstars for PokerStars text.
+
+    Returns:
+        list[str]: The serialized hand histories, in the order of the table.
+    """
+    if output_format == POKERSTARS:
+        return [
+            encode_pokerstars(ohh, level) for ohh, level in zip(table, tournament_levels(table))
+        ]
+    return [encode_ohh(ohh) for ohh in table]
+
+
+def append_ohh(path: Path, encoded: list[str], size: int) -> int:
+    """Append the hand histories converted by a tail of the log to the output file. The file is
+    first cut back to the size it had after the previous tail was committed, so the hands appended
+    by a tail that was interrupted before its state was saved are not written twice.
+
+    Args:
+        path (Path): Path to the .ohh or .txt file.
+        encoded (list[str]): The new hand histories serialized by encode_hands.
+        size (int): Size of the file after the previous tail, 0 to start a new file.
+
+    Returns:
+        int: Size of the file after the hand histories were appended.
+    """
+    with open(path, "a+b") as f:
+        f.truncate(min(size, f.seek(0, io.SEEK_END)))
+        for text in encoded:
+            f.write(text.encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def partition_key(ohh: dict, table_name: str, partition: str) -> str:
+    """Get the partition of the output a hand history is written to.
+
+    Args:
+        ohh (dict): The hand history rendered for a hero.
+        table_name (str): Name of the table taken from the name of the Poker Now csv file.
+        partition (str): The partition setting of the [Output] section of config.ini.
+
+    Returns:
+        str: Name of the folder of the partition, an empty string when the output is not
+        partitioned.
+    """
+    if partition == BY_DATE:
+        return ohh[START_DATE_UTC][:10]
+    if partition == BY_TABLE:
+        return table_name
+    if partition == BY_HERO:
+        return "played" if ohh[HERO_PLAYER_ID] is not None else "observed"
+    return ""
+
+
+def partition_hands(
+    table: list[dict], encoded: list[str], table_name: str, partition: str
+) -> dict[str, list[str]]:
+    """Group the serialized hand histories of a log by the partition they are written to.
+
+    Args:
+        table (list[dict]): The hand histories rendered for a hero.
+        encoded (list[str]): The hand histories serialized by encode_hands, in the same order.
+        table_name (str): Name of the table taken from the name of the Poker Now csv file.
+        partition (str): The partition setting of the [Output] section of config.ini.
+
+    Returns:
+        dict[str, list[str]]: The serialized hand histories, keyed by partition.
+    """
+    partitions: dict[str, list[str]] = {}
+    for ohh, text in zip(table, encoded):
+        partitions.setdefault(partition_key(ohh, table_name, partition), []).append(text)
+    return partitions
+
+
+def commit_partitions(
+    directory: Path, ohh_name: str, partitions: dict[str, list[str]], layout: OutputLayout
+) -> list[Path]:
+    """Commit the hand histories of a log to the partitions of the output. In each partition the
+    hands are split into part files of at most max_hands hands and max_bytes bytes (a part holds at
+    least one hand). Parts are named after the output file of the log, so converting the log again
+    replaces them instead of adding the hands a second time. Parts of a previous commit that are
+    not replaced, and the unsplit file when the log is split now, are removed once the new parts
+    are committed, so the partition never holds a hand twice.
+
+    Args:
+        directory (Path): The output folder of the hero.
+        ohh_name (str): Name of the .ohh or .txt file of the log, see output_name.
+        partitions (dict[str, list[str]]): The hand histories serialized by encode_hands, keyed by
+            partition, see partition_key.
+        layout (OutputLayout): The partitioning and part sizes of the output.
+
+    Returns:
+        list[Path]: The files committed.
+    """
+    committed: list[Path] = []
+    for key, texts in partitions.items():
+        partition_directory = directory / key
+        partition_directory.mkdir(exist_ok=True)
+        previous = previous_outputs(partition_directory, ohh_name)
+        committed.extend(commit_parts(partition_directory, ohh_name, texts, layout))
+        stale = previous - set(committed)
+        for path in stale:
+            path.unlink()
+        if stale:
+            sync_directory(partition_directory)
+    return committed
+
+
+def previous_outputs(partition_directory: Path, ohh_name: str) -> set[Path]:
+    """Find the outputs of a previous commit of a log to a partition, split into parts or not.
+
+    Args:
+        partition_directory (Path): The folder of the partition.
+        ohh_name (str): Name of the .ohh or .txt file of the log, see output_name.
+
+    Returns:
+        set[Path]: The unsplit file and the part files of the log in the partition.
+    """
+    stem = Path(ohh_name).stem
+    suffix = Path(ohh_name).suffix
+    part_regex = re.compile(re.escape(stem) + r"_part\d+" + re.escape(suffix))
+    return {
+        path
+        for path in partition_directory.iterdir()
+        if path.name == ohh_name or part_regex.fullmatch(path.name)
+    }
+
+
+def commit_parts(
+    partition_directory: Path, ohh_name: str, encoded: list[str], layout: OutputLayout
+) -> list[Path]:
+    """Commit the hand histories of a log to a partition, split into part files of at most
+    max_hands hands and max_bytes bytes when either is set.
+
+    Args:
+        partition_directory (Path): The folder of the partition.
+        ohh_name (str): Name of the .ohh or .txt file of the log, see output_name.
+        encoded (list[str]): The hand histories serialized by encode_hands.
+        layout (OutputLayout): The partitioning and part sizes of the output.
+
+    Returns:
+        list[Path]: The files committed.
+    """
+    max_hands = layout.max_hands
+    max_bytes = layout.max_bytes
+    if not max_hands and not max_bytes:
+        commit_ohh(partition_directory / ohh_name, encoded)
+        return [partition_directory / ohh_name]
+    parts: list[list[str]] = [[]]
+    part_bytes: int = 0
+    for text in encoded:
+        text_bytes = len(text.encode("utf-8"))
+        if parts[-1] and (
+            (max_hands and len(parts[-1]) >= max_hands)
+            or (max_bytes and part_bytes + text_bytes > max_bytes)
+        ):
+            parts.append([])
+            part_bytes = 0
+        parts[-1].append(text)
+        part_bytes += text_bytes
+    stem = Path(ohh_name).stem
+    suffix = Path(ohh_name).suffix
+    committed: list[Path] = []
+    for number, part in enumerate(parts, start=1):
+        committed.append(partition_directory / f"{stem}_part{number:04d}{suffix}")
+        commit_ohh(committed[-1], part)
+    return committed
+
+
+def find_outputs(directories: list[Path], stems: set[str]) -> dict[str, set[Path]]:
+    """Find the output files of logs in output folders and in their partition folders, split into
+    parts or not.
+
+    Args:
+        directories (list[Path]): The output folders.
+        stems (set[str]): The names of the output files of the logs without their suffix, see
+            output_name.
+
+    Returns:
+        dict[str, set[Path]]: The output files of each log, keyed by stem.
+    """
+    suffixes = set(output_suffixes.values())
+    outputs: dict[str, set[Path]] = {}
+    for directory in directories:
+        for path in directory.rglob("*"):
+            if path.suffix not in suffixes or not path.is_file():
+                continue
+            stem = path.stem
+            part_match = part_name_regex.fullmatch(stem)
+            if stem not in stems and part_match:
+                stem = part_match.group("stem")
+            if stem in stems:
+                outputs.setdefault(stem, set()).add(path)
+    return outputs
+
+
+def remove_outputs(paths: set[Path], directories: list[Path]) -> None:
+    """Remove output files and the partition folders they leave empty. The folders are flushed, so
+    the files stay removed after a crash.
+
+    Args:
+        paths (set[Path]): The output files to remove.
+        directories (list[Path]): The output folders, they are kept even when they are empty.
+
+    Returns:
+        None
+    """
+    for path in paths:
+        path.unlink()
+    for folder in {path.parent for path in paths}:
+        if folder not in directories and not any(folder.iterdir()):
+            folder.rmdir()
+            sync_directory(folder.parent)
+        else:
+            sync_directory(folder)
+
+
+def remove_uncommitted(directory: Path) -> int:
+    """Remove temporary files left behind by a batch that was interrupted before the output could be
+    committed. The Poker Now csv files for those outputs were not archived, so they will be
+    converted again. Only files named by uncommitted_path are removed.
+
+    Args:
+        directory (Path): Directory containing the .ohh files.
+
+    Returns:
+        int: The number of temporary files removed.
+    """
+    removed: int = 0
+    for temp_path in directory.rglob(TEMP_PREFIX + "*" + TEMP_SUFFIX):
+        temp_path.unlink()
+        removed += 1
+    return removed
+
+
+# END OF FUNCTIONS
+# **************************************************************************************************
@@ -0,0 +1,512 @@
+# pokerstars.py
+"""
+****************************************************************************************************
+WHAT THIS DOES
+
+Write the hand histories converted by main.py as PokerStars text hand histories, for the trackers
+and replayers that do not read the OHH format.
+
+A hand is written section by section, the same way PokerStars writes it: the header and the seats,
+the blinds and antes, each street with its board and actions, the show down, the pots collected and
+the summary. The amounts of the OHH format are the chips put in by each action, PokerStars writes
+raises as the raise and the total of the street, so the chips put in by each player are added up
+while the streets are written.
+****************************************************************************************************
+"""
+# MODULES
+from dataclasses import dataclass, field
+from typing import Optional
+
+from constants import (
+    ACTION,
+    ACTIONS,
+    AMOUNT,
+    ANTE_AMOUNT,
+    BET_LIMIT,
+    BET_TYPE,
+    BIG_BLIND_AMOUNT,
+    BUYIN_AMOUNT,
+    CARDS,
+    CURRENCY,
+    DEALER_SEAT,
+    FEE_AMOUNT,
+    GAME_NUMBER,
+    GAME_TYPE,
+    ID,
+    IS_ALL_IN,
+    NAME,
+    PLAYER_ID,
+    PLAYER_WINS,
+    PLAYERS,
+    POTS,
+    RAKE,
+    ROUNDS,
+    SEAT,
+    SITE_NAME,
+    SMALL_BLIND_AMOUNT,
+    START_DATE_UTC,
+    STARTING_STACK,
+    STREET,
+    TABLE_NAME,
+    TABLE_SIZE,
+    TOURNAMENT_INFO,
+    TOURNAMENT_NUMBER,
+    WIN_AMOUNT,
+)
+
+# END MODULES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# LOOKUP TABLE
+# Names used by PokerStars text hand histories
+pokerstars_games = {"Holdem": "Hold'em", "Omaha": "Omaha", "OmahaHiLo": "Omaha Hi/Lo"}
+
+pokerstars_limits = {"NL": "No Limit", "PL": "Pot Limit", "FL": "Limit"}
+
+pokerstars_posts = {
+    "Post Ante": "posts the ante",
+    "Post SB": "posts small blind",
+    "Post BB": "posts big blind",
+    "Straddle": "posts straddle",
+    "Post Dead": "posts dead",
+    "Post Extra Blind": "posts big blind",
+}
+
+# The actions written the same way whatever their amount
+pokerstars_actions = {"Fold": "folds", "Check": "checks", "Mucks Cards": "mucks hand"}
+
+# The number of board cards dealt before each street
+board_before = {"Flop": 0, "Turn": 3, "River": 4}
+
+roman_numerals = {
+    1000: "M",
+    900: "CM",
+    500: "D",
+    400: "CD",
+    100: "C",
+    90: "XC",
+    50: "L",
+    40: "XL",
+    10: "X",
+    9: "IX",
+    5: "V",
+    4: "IV",
+    1: "I",
+}
+
+currency_symbols = {"USD": "$", "EUR": "\u20ac", "GBP": "\u00a3"}
+# END LOOKUP TABLES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# DATA STRUCTURES
+@dataclass
+class PokerStarsText:
+    """A hand history while it is written as PokerStars text.
+
+    Attributes:
+        symbol (str): The currency symbol, empty for tournament chips.
+        names (dict[int, str]): The name of each player id.
+        lines (list[str]): The lines written so far.
+        folded (dict[int, str]): The street each player folded on.
+        shown (dict[int, list[str]]): The cards shown by each player.
+        boards (list[list[str]]): The board of each run of the hand.
+    """
+
+    symbol: str
+    names: dict[int, str]
+    lines: list[str] = field(default_factory=list)
+    folded: dict[int, str] = field(default_factory=dict)
+    shown: dict[int, list[str]] = field(default_factory=dict)
+    boards: list[list[str]] = field(default_factory=lambda: [[]])
+
+
+# END DATA STRUCTURES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# FUNCTIONS
+def format_amount(cents: int, symbol: str = "") -> str:
+    """Format an amount the way PokerStars writes it, whole amounts without decimals and the others
+    with two decimals.
+
+    Args:
+        cents (int): The amount in cents.
+        symbol (str): The currency symbol, empty for tournament chips.
+
+    Returns:
+        str: The formatted amount.
+    """
+    whole, decimals = divmod(cents, 100)
+    if not decimals:
+        return f"{symbol}{whole}"
+    return f"{symbol}{whole}.{decimals:02d}"
+
+
+def roman_numeral(number: int) -> str:
+    """Write a number in roman numerals, used for the levels of a tournament.
+
+    Args:
+        number (int): The number, at least 1.
+
+    Returns:
+        str: The number in roman numerals.
+    """
+    numerals = []
+    for value, numeral in roman_numerals.items():
+        count, number = divmod(number, value)
+        numerals.append(numeral * count)
+    return "".join(numerals)
+
+
+def header_lines(ohh: dict, level: int, symbol: str) -> list[str]:
+    """Write the header of a hand: the game, the table, the button and the seats.
+
+    Args:
+        ohh (dict): The hand history rendered for a hero, with the amounts in cents.
+        level (int): The blind level of a tournament hand, see tournament_levels.
+        symbol (str): The currency symbol, empty for tournament chips.
+
+    Returns:
+        list[str]: The lines of the header.
+    """
+    tournament_info = ohh.get(TOURNAMENT_INFO)
+    date, time = ohh[START_DATE_UTC].rstrip("Z").split("T")
+    hour, minutes_seconds = time.split(":", 1)
+    started = f"{date.replace('-', '/')} {int(hour)}:{minutes_seconds} UTC"
+    game = (
+        f"{pokerstars_games[ohh[GAME_TYPE]]} {pokerstars_limits[ohh[BET_LIMIT][BET_TYPE]]}"
+    )
+    blinds = (
+        f"{format_amount(ohh[SMALL_BLIND_AMOUNT], symbol)}/"
+        f"{format_amount(ohh[BIG_BLIND_AMOUNT], symbol)}"
+    )
+    if tournament_info:
+        buyin = (
+            f"{format_amount(tournament_info[BUYIN_AMOUNT], '$')}+"
+            f"{format_amount(tournament_info[FEE_AMOUNT], '$')}"
+        )
+        lines = [
+            f"{ohh[SITE_NAME]} Hand #{ohh[GAME_NUMBER]}: "
+            f"Tournament #{tournament_info[TOURNAMENT_NUMBER]}, {buyin} "
+            f"{tournament_info[CURRENCY]} {game} - Level {roman_numeral(level)} ({blinds}) - "
+            f"{started}"
+        ]
+    else:
+        lines = [
+            f"{ohh[SITE_NAME]} Hand #{ohh[GAME_NUMBER]}:  {game} ({blinds} {ohh[CURRENCY]}) - "
+            f"{started}"
+        ]
+    lines.append(
+        f"Table '{ohh[TABLE_NAME]}' {ohh[TABLE_SIZE]}-max Seat #{ohh[DEALER_SEAT]} is the button"
+    )
+    for player in ohh[PLAYERS]:
+        lines.append(
+            f"Seat {player[SEAT]}: {player[NAME]} "
+            f"({format_amount(player[STARTING_STACK], symbol)} in chips)"
+        )
+    return lines
+
+
+def post_lines(text: PokerStarsText, posts: list[dict], street_commit: dict[int, int]) -> None:
+    """Write the blinds, antes and straddles posted before the hole cards are dealt.
+
+    Args:
+        text (PokerStarsText): The hand being written.
+        posts (list[dict]): The post actions of the Preflop round.
+        street_commit (dict[int, int]): The live chips put in by each player on the Preflop.
+    """
+    # A dead small blind posted with a big blind is written as a single post
+    dead = {action[PLAYER_ID]: action[AMOUNT] for action in posts if action[ACTION] == "Post Dead"}
+    paired = {
+        action[PLAYER_ID]
+        for action in posts
+        if action[ACTION] in ("Post BB", "Post Extra Blind") and action[PLAYER_ID] in dead
+    }
+    for action in posts:
+        player_id = action[PLAYER_ID]
+        if action[ACTION] == "Post Dead" and player_id in paired:
+            continue
+        post = pokerstars_posts[action[ACTION]]
+        amount = action[AMOUNT]
+        if player_id in paired:
+            post = "posts small & big blinds"
+            amount += dead[player_id]
+        text.lines.append(
+            f"{text.names[player_id]}: {post} {format_amount(amount, text.symbol)}"
+            f"{' and is all-in' if action.get(IS_ALL_IN) else ''}"
+        )
+        # Antes and dead blinds are not matched by the other players
+        if action[ACTION] not in ("Post Ante", "Post Dead"):
+            street_commit[player_id] += action[AMOUNT]
+
+
+def bet_line(text: PokerStarsText, action: dict, street_commit: dict[int, int]) -> str:
+    """Write a bet, call or raise, raises are written as the raise and the total of the street.
+
+    Args:
+        text (PokerStarsText): The hand being written.
+        action (dict): The Bet, Call or Raise action.
+        street_commit (dict[int, int]): The live chips put in by each player on the street.
+
+    Returns:
+        str: The line of the action.
+    """
+    player_id = action[PLAYER_ID]
+    amount = action.get(AMOUNT, 0)
+    all_in = " and is all-in" if action.get(IS_ALL_IN) else ""
+    street_high = max(street_commit.values())
+    street_commit[player_id] += amount
+    if action[ACTION] == "Raise":
+        raised_to = street_commit[player_id]
+        return (
+            f"{text.names[player_id]}: raises "
+            f"{format_amount(raised_to - street_high, text.symbol)} "
+            f"to {format_amount(raised_to, text.symbol)}{all_in}"
+        )
+    return (
+        f"{text.names[player_id]}: {action[ACTION].lower()}s "
+        f"{format_amount(amount, text.symbol)}{all_in}"
+    )
+
+
+def action_line(
+    text: PokerStarsText, street: str, action: dict, street_commit: dict[int, int]
+) -> Optional[str]:
+    """Write an action of a street or of the show down.
+
+    Args:
+        text (PokerStarsText): The hand being written.
+        street (str): The street of the action.
+        action (dict): The action.
+        street_commit (dict[int, int]): The live chips put in by each player on the street.
+
+    Returns:
+        Optional[str]: The line of the action, None for the actions PokerStars does not write.
+    """
+    player_id = action[PLAYER_ID]
+    name = text.names.get(player_id)
+    if action[ACTION] == "Dealt Cards":
+        return None if name is None else f"Dealt to {name} [{' '.join(action[CARDS])}]"
+    if action[ACTION] == "Shows Cards":
+        text.shown[player_id] = action[CARDS]
+        return f"{name}: shows [{' '.join(action[CARDS])}]"
+    if action[ACTION] == "Fold":
+        text.folded[player_id] = street
+    if action[ACTION] in pokerstars_actions:
+        return f"{name}: {pokerstars_actions[action[ACTION]]}"
+    if action[ACTION] in ("Bet", "Call", "Raise"):
+        return bet_line(text, action, street_commit)
+    return None
+
+
+def street_lines(text: PokerStarsText, round_obj: dict) -> None:
+    """Write a street: the posts and hole cards of the Preflop or the board dealt on a later street,
+    then the actions of the players.
+
+    Args:
+        text (PokerStarsText): The hand being written.
+        round_obj (dict): The round of the street.
+    """
+    street = round_obj[STREET]
+    actions = round_obj[ACTIONS]
+    street_commit = {player_id: 0 for player_id in text.names}
+    board = text.boards[-1]
+    if street == "Preflop":
+        posts = [action for action in actions if action[ACTION] in pokerstars_posts]
+        actions = [action for action in actions if action[ACTION] not in pokerstars_posts]
+        post_lines(text, posts, street_commit)
+        text.lines.append("*** HOLE CARDS ***")
+    else:
+        if len(board) > board_before[street]:
+            # The second run of a hand that was run twice shares the board up to the all in
+            board = text.boards[0][: board_before[street]]
+            text.boards.append(board)
+        run = "SECOND " if len(text.boards) > 1 else ""
+        dealt = f"[{' '.join(round_obj.get(CARDS, []))}]"
+        if board:
+            dealt = f"[{' '.join(board)}] {dealt}"
+        text.lines.append(f"*** {run}{street.upper()} *** {dealt}")
+    board.extend(round_obj.get(CARDS, []))
+    for action in actions:
+        line = action_line(text, street, action, street_commit)
+        if line is not None:
+            text.lines.append(line)
+    uncalled_line(text, street_commit)
+
+
+def uncalled_line(text: PokerStarsText, street_commit: dict[int, int]) -> None:
+    """Write the uncalled bet of a street, the part of the biggest bet of the street that no other
+    player matched. PokerStars returns it when the betting of the street ends, before the next
+    street is dealt or the hand is shown down.
+
+    Args:
+        text (PokerStarsText): The hand being written.
+        street_commit (dict[int, int]): The live chips put in by each player on the street.
+    """
+    ordered = sorted(street_commit.items(), key=lambda item: item[1], reverse=True)
+    if len(ordered) > 1 and ordered[0][1] > ordered[1][1]:
+        text.lines.append(
+            f"Uncalled bet ({format_amount(ordered[0][1] - ordered[1][1], text.symbol)}) "
+            f"returned to {text.names[ordered[0][0]]}"
+        )
+
+
+def showdown_lines(ohh: dict, text: PokerStarsText, round_obj: dict) -> None:
+    """Write the show down, the cards shown and mucked at the end of the hand.
+
+    Args:
+        ohh (dict): The hand history rendered for a hero, with the amounts in cents.
+        text (PokerStarsText): The hand being written.
+        round_obj (dict): The Showdown round.
+    """
+    # The players dealt into the hand, the others are sitting out
+    in_hand = {
+        action[PLAYER_ID]
+        for street_round in ohh[ROUNDS]
+        if street_round[STREET] != "Showdown"
+        for action in street_round[ACTIONS]
+    }
+    # A hand won uncontested has no show down, even if the winner shows the cards
+    if len(in_hand - text.folded.keys()) > 1:
+        text.lines.append("*** SHOW DOWN ***")
+    street_commit = {player_id: 0 for player_id in text.names}
+    for action in round_obj[ACTIONS]:
+        line = action_line(text, round_obj[STREET], action, street_commit)
+        if line is not None:
+            text.lines.append(line)
+
+
+def collect_lines(ohh: dict, text: PokerStarsText) -> dict[int, int]:
+    """Write the chips collected from the pots by the winners.
+
+    Args:
+        ohh (dict): The hand history rendered for a hero, with the amounts in cents.
+        text (PokerStarsText): The hand being written.
+
+    Returns:
+        dict[int, int]: The chips won by each winner over all the pots.
+    """
+    won: dict[int, int] = {}
+    for pot in ohh[POTS]:
+        for player_win in pot[PLAYER_WINS]:
+            player_id = player_win[PLAYER_ID]
+            won[player_id] = won.get(player_id, 0) + player_win[WIN_AMOUNT]
+            text.lines.append(
+                f"{text.names[player_id]} collected "
+                f"{format_amount(player_win[WIN_AMOUNT], text.symbol)} from pot"
+            )
+    return won
+
+
+def seat_outcome(text: PokerStarsText, player_id: int, won: dict[int, int]) -> str:
+    """Write how a hand ended for a player, for the seat lines of the summary.
+
+    Args:
+        text (PokerStarsText): The hand being written.
+        player_id (int): The id of the player.
+        won (dict[int, int]): The chips won by each winner, see collect_lines.
+
+    Returns:
+        str: The outcome of the hand for the player.
+    """
+    if player_id in text.folded:
+        if text.folded[player_id] == "Preflop":
+            return "folded before Flop"
+        return f"folded on the {text.folded[player_id]}"
+    if player_id in text.shown:
+        if player_id in won:
+            result = f"won ({format_amount(won[player_id], text.symbol)})"
+        else:
+            result = "lost"
+        return f"showed [{' '.join(text.shown[player_id])}] and {result}"
+    if player_id in won:
+        return f"collected ({format_amount(won[player_id], text.symbol)})"
+    return "mucked"
+
+
+def summary_lines(ohh: dict, text: PokerStarsText, won: dict[int, int]) -> None:
+    """Write the summary of a hand: the pot and rake, the boards and the outcome of each seat.
+
+    Args:
+        ohh (dict): The hand history rendered for a hero, with the amounts in cents.
+        text (PokerStarsText): The hand being written.
+        won (dict[int, int]): The chips won by each winner, see collect_lines.
+    """
+    total_rake = sum(pot[RAKE] for pot in ohh[POTS])
+    total_pot = sum(pot[AMOUNT] for pot in ohh[POTS]) + total_rake
+    text.lines.append("*** SUMMARY ***")
+    text.lines.append(
+        f"Total pot {format_amount(total_pot, text.symbol)} | "
+        f"Rake {format_amount(total_rake, text.symbol)}"
+    )
+    for number, board in enumerate(text.boards):
+        if board:
+            run = ("FIRST ", "SECOND ")[number] if len(text.boards) > 1 else ""
+            text.lines.append(f"{run}Board [{' '.join(board)}]")
+    blind_tags = {
+        action[PLAYER_ID]: "(small blind) " if action[ACTION] == "Post SB" else "(big blind) "
+        for round_obj in ohh[ROUNDS]
+        if round_obj[STREET] == "Preflop"
+        for action in round_obj[ACTIONS]
+        if action[ACTION] in ("Post SB", "Post BB")
+    }
+    for player in ohh[PLAYERS]:
+        tags = "(button) " if player[SEAT] == ohh[DEALER_SEAT] else ""
+        tags += blind_tags.get(player[ID], "")
+        text.lines.append(
+            f"Seat {player[SEAT]}: {player[NAME]} {tags}{seat_outcome(text, player[ID], won)}"
+        )
+
+
+def encode_pokerstars(ohh: dict, level: int = 1) -> str:
+    """Write a hand history as PokerStars text, followed by the blank lines that separate the hands
+    of a PokerStars hand history file.
+
+    Args:
+        ohh (dict): The hand history rendered for a hero, with the amounts in cents.
+        level (int): The blind level of a tournament hand, see tournament_levels.
+
+    Returns:
+        str: The hand history as PokerStars text.
+    """
+    symbol = "" if ohh.get(TOURNAMENT_INFO) else currency_symbols.get(ohh[CURRENCY], "")
+    names = {player[ID]: player[NAME] for player in ohh[PLAYERS]}
+    text = PokerStarsText(symbol, names, header_lines(ohh, level, symbol))
+    for round_obj in ohh[ROUNDS]:
+        if round_obj[STREET] == "Showdown":
+            showdown_lines(ohh, text, round_obj)
+        else:
+            street_lines(text, round_obj)
+    summary_lines(ohh, text, collect_lines(ohh, text))
+    return "\n".join(text.lines) + "\n\n\n"
+
+
+def tournament_levels(table: list[dict]) -> list[int]:
+    """Number the blind levels of the hands of a tournament table, the level goes up each time the
+    blinds or the ante change from one hand to the next.
+
+    Args:
+        table (list[dict]): The hand histories of a table, in the order they were played.
+
+    Returns:
+        list[int]: The level of each hand, starting at 1.
+    """
+    levels = []
+    level = 0
+    blinds = None
+    for ohh in table:
+        hand_blinds = (ohh[SMALL_BLIND_AMOUNT], ohh[BIG_BLIND_AMOUNT], ohh[ANTE_AMOUNT])
+        if hand_blinds != blinds:
+            level += 1
+            blinds = hand_blinds
+        levels.append(level)
+    return levels
+
+
+# END OF FUNCTIONS
+# **************************************************************************************************
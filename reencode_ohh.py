@@ -0,0 +1,281 @@
+# reencode_ohh.py
+"""
+****************************************************************************************************
+WHAT THIS DOES
+
+Re-encode .ohh files written by main.py without converting the Poker Now csv files again.
+
+A .ohh file is a sequence of hand histories, each an ohh object written as JSON with indent=4 and
+followed by a blank line. It is neither NDJSON nor a JSON array, so the file is read in blocks and
+the hand histories are decoded one at a time with JSONDecoder.raw_decode. Only the hand being
+decoded and one block of the file are held in memory, whatever the size of the file.
+
+Each hand history can be
+
+    - written again as .ohh (pretty), as NDJSON or as compact NDJSON without spaces
+    - compressed with gzip
+    - upgraded to another spec_version and internal_version
+
+The files are re-encoded by a pool of processes, one file at a time in each process. Without
+--output the files are replaced in place, the new file is written to a temporary file and renamed
+over the old one, so an interrupted run never leaves a partially written file.
+
+Usage: python reencode_ohh.py OpenHandHistory --format ndjson --gzip --output Archive/NDJSON
+       python reencode_ohh.py OpenHandHistory --spec-version 1.4.6 --internal-version 1.4.6
+****************************************************************************************************
+"""
+# MODULES
+from argparse import ArgumentParser, Namespace
+import gzip
+import json
+from multiprocessing import Pool
+import os
+from pathlib import Path
+from typing import Iterator, Optional, TextIO
+
+# END MODULES
+# **************************************************************************************************
+
+# **************************************************************************************************
+# CONSTANTS
+BLOCK_SIZE = 1 << 20
+TEMP_SUFFIX = ".tmp"
+OHH = "ohh"
+SPEC_VERSION = "spec_version"
+INTERNAL_VERSION = "internal_version"
+PRETTY = "pretty"
+NDJSON = "ndjson"
+COMPACT = "compact"
+FORMAT = "format"
+IN_PLACE = "in_place"
+# The suffix of the files written in each format, .gz is added when the output is compressed
+FORMAT_SUFFIXES = {PRETTY: ".ohh", NDJSON: ".ndjson", COMPACT: ".ndjson"}
+# END CONSTANTS
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# FUNCTIONS
+def open_text(path: Path, mode: str, compress: bool) -> TextIO:
+    """Open a .ohh or NDJSON file as text.
+
+    Args:
+        path (Path): Path to the file.
+        mode (str): "r" to read or "w" to write.
+        compress (bool): True when the file is compressed with gzip.
+
+    Returns:
+        TextIO: The open file.
+    """
+    if compress:
+        return gzip.open(path, mode + "t", encoding="utf-8", compresslevel=6)
+    return open(path, mode, encoding="utf-8")
+
+
+def read_hands(ohh_file: TextIO) -> Iterator[dict]:
+    """Decode the hand histories of a file one at a time. The file is read in blocks and the text
+    of the hand histories that have been decoded is dropped, so the memory used does not grow with
+    the size of the file. Files of hand histories written one per line (NDJSON) are read the same
+    way.
+
+    Args:
+        ohh_file (TextIO): The open file.
+
+    Yields:
+        dict: The next hand history, with the ohh object around it.
+    """
+    decoder = json.JSONDecoder()
+    text = ""
+    position = 0
+    end_of_file = False
+    while True:
+        while position < len(text) and text[position].isspace():
+            position += 1
+        if position == len(text):
+            if end_of_file:
+                return
+            text = ohh_file.read(BLOCK_SIZE)
+            position = 0
+            end_of_file = not text
+            continue
+        try:
+            hand, position = decoder.raw_decode(text, position)
+        except json.JSONDecodeError:
+            # The hand history is cut at the end of the block, read the next block and decode the
+            # hand history again from its start
+            if end_of_file:
+                raise
+            block = ohh_file.read(BLOCK_SIZE)
+            end_of_file = not block
+            text = text[position:] + block
+            position = 0
+            continue
+        yield hand
+
+
+def encode_hand(hand: dict, output_format: str) -> str:
+    """Serialize a hand history in an output format.
+
+    Args:
+        hand (dict): The hand history, with the ohh object around it.
+        output_format (str): pretty for the .ohh format of main.py, ndjson for one hand history per
+            line or compact for NDJSON without spaces.
+
+    Returns:
+        str: The serialized hand history.
+    """
+    if output_format == PRETTY:
+        return json.dumps(hand, indent=4) + "\n\n"
+    if output_format == COMPACT:
+        return json.dumps(hand, separators=(",", ":")) + "\n"
+    return json.dumps(hand) + "\n"
+
+
+def output_path(
+    source: Path, root: Path, output: Optional[Path], output_format: str, compress: bool
+) -> Path:
+    """Get the path of the re-encoded file. The file keeps its place in the folder tree below the
+    output folder, or the folder of the source file when the files are replaced in place.
+
+    Args:
+        source (Path): Path to the file that is re-encoded.
+        root (Path): The folder given on the command line that holds the file.
+        output (Path, optional): The output folder, None to replace the files in place.
+        output_format (str): The output format, see encode_hand.
+        compress (bool): True when the output is compressed with gzip.
+
+    Returns:
+        Path: Path to the re-encoded file.
+    """
+    name = source.name.removesuffix(".gz")
+    name = name.removesuffix(Path(name).suffix) + FORMAT_SUFFIXES[output_format]
+    if compress:
+        name += ".gz"
+    if output is None:
+        return source.with_name(name)
+    if root.is_file():
+        return output / name
+    return output / source.parent.relative_to(root) / name
+
+
+def reencode_file(task: tuple[Path, Path, dict]) -> tuple[Path, int, int, int]:
+    """Re-encode the hand histories of a file. Run in the processes of the pool.
+
+    Args:
+        task (tuple[Path, Path, dict]): Path to the file, path to the re-encoded file and the
+            options (format, gzip and the versions to upgrade to).
+
+    Returns:
+        tuple[Path, int, int, int]: Path to the re-encoded file, the number of hand histories and
+        the size of the file before and after.
+    """
+    source, destination, options = task
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = destination.with_name(destination.name + TEMP_SUFFIX)
+    hand_count: int = 0
+    compressed = source.suffix == ".gz"
+    compress = destination.suffix == ".gz"
+    with open_text(source, "r", compressed) as ohh_file:
+        with open_text(temp_path, "w", compress) as out_file:
+            for hand in read_hands(ohh_file):
+                if options[SPEC_VERSION] is not None:
+                    hand[OHH][SPEC_VERSION] = options[SPEC_VERSION]
+                if options[INTERNAL_VERSION] is not None:
+                    hand[OHH][INTERNAL_VERSION] = options[INTERNAL_VERSION]
+                out_file.write(encode_hand(hand, options[FORMAT]))
+                hand_count += 1
+    # The re-encoded file is flushed to disk before it replaces the old file, a compressed file is
+    # only complete once it has been closed
+    with open(temp_path, "rb+") as f:
+        os.fsync(f.fileno())
+    source_bytes = source.stat().st_size
+    os.replace(temp_path, destination)
+    if options[IN_PLACE] and destination != source:
+        source.unlink()
+    return destination, hand_count, source_bytes, destination.stat().st_size
+
+
+def find_files(paths: list[Path]) -> list[tuple[Path, Path]]:
+    """Find the .ohh and NDJSON files to re-encode, folders are searched recursively.
+
+    Args:
+        paths (list[Path]): Files and folders given on the command line.
+
+    Returns:
+        list[tuple[Path, Path]]: Each file and the path given on the command line that holds it.
+    """
+    suffixes = (".ohh", ".ndjson", ".ohh.gz", ".ndjson.gz")
+    files = []
+    for root in paths:
+        if root.is_file():
+            files.append((root, root))
+            continue
+        for path in sorted(root.rglob("*")):
+            if path.is_file() and path.name.endswith(suffixes):
+                files.append((path, root))
+    return files
+
+
+def parse_arguments() -> Namespace:
+    """Parse the command line arguments.
+
+    Returns:
+        Namespace: The command line arguments.
+    """
+    parser = ArgumentParser(
+        description="Re-encode .ohh files as NDJSON or compressed files, or upgrade their versions."
+    )
+    parser.add_argument("paths", nargs="+", type=Path, help=".ohh files or folders holding them")
+    parser.add_argument(
+        "--format",
+        choices=sorted(FORMAT_SUFFIXES),
+        default=PRETTY,
+        help="pretty for the .ohh format, ndjson or compact NDJSON without spaces",
+    )
+    parser.add_argument("--gzip", action="store_true", help="compress the output with gzip")
+    parser.add_argument("--spec-version", help="set the spec_version of every hand history")
+    parser.add_argument("--internal-version", help="set the internal_version of every hand history")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="folder for the re-encoded files, the files are replaced in place if not given",
+    )
+    parser.add_argument(
+        "--processes", type=int, default=os.cpu_count(), help="number of files re-encoded at once"
+    )
+    return parser.parse_args()
+
+
+# END OF FUNCTIONS
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# CODE
+if __name__ == "__main__":
+    args = parse_arguments()
+    reencode_options = {
+        FORMAT: args.format,
+        SPEC_VERSION: args.spec_version,
+        INTERNAL_VERSION: args.internal_version,
+        IN_PLACE: args.output is None,
+    }
+    tasks = [
+        (path, output_path(path, root, args.output, args.format, args.gzip), reencode_options)
+        for path, root in find_files(args.paths)
+    ]
+    total_hands: int = 0
+    total_before: int = 0
+    total_after: int = 0
+    with Pool(max(1, args.processes)) as pool:
+        for written, hands, before, after in pool.imap_unordered(reencode_file, tasks):
+            total_hands += hands
+            total_before += before
+            total_after += after
+            print(f"Wrote {hands} hands to {written}")
+    print(
+        f"Re-encoded {total_hands} hands in {len(tasks)} files, {total_before} bytes before and "
+        f"{total_after} bytes after."
+    )
+# end of code
+# *************************************************************************************************
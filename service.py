@@ -0,0 +1,196 @@
+# service.py
+"""
+****************************************************************************************************
+WHAT THIS DOES
+
+Run the converter of main.py as a local HTTP service. The config and the name-map data model are
+loaded once when the service starts, so a request only pays for the conversion.
+
+A Poker Now csv file posted to /convert is converted by the convert function main.py gives the
+server, and the hand histories are streamed back with chunked transfer encoding as soon as each one
+is converted. Each request is handled on its own thread, the number of files converted at the same
+time is limited by the workers setting of the [Server] section of config.ini.
+
+The service does not write name-map.json. It is only read again when the file was changed, so the
+names added by a batch conversion or by hand are picked up without a restart, see refresh_name_map
+in main.py.
+****************************************************************************************************
+"""
+# MODULES
+from configparser import SectionProxy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+from threading import BoundedSemaphore
+from typing import Callable, Iterator, Optional
+from urllib.parse import parse_qs, urlparse
+
+from constants import HANDS, HOST, PORT, POKERSTARS, QUARANTINED, REQUESTS, WORKERS
+from dashboard import console, progress, progress_lock
+
+# END MODULES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# LOOKUP TABLE
+# The content type of the response for each output format of the service
+content_types = {
+    "ndjson": "application/x-ndjson",
+    "pretty": "application/json",
+    POKERSTARS: "text/plain; charset=utf-8",
+}
+# END LOOKUP TABLES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# FUNCTIONS
+class ConversionServer(ThreadingHTTPServer):
+    """The HTTP server of the conversion service, it holds what the request handlers share.
+
+    Attributes:
+        convert (Callable[[str, dict[str, str]], Iterator[str]]): Convert the text of a Poker Now
+            csv file with the query parameters of the request. The file is read when it is called,
+            so an error is raised before the response starts, and the returned iterator converts
+            the hands one at a time.
+        slots (BoundedSemaphore): Limits the number of files converted at the same time.
+        requests (int): The number of conversion requests, updated under progress_lock.
+    """
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        convert: Callable[[str, dict[str, str]], Iterator[str]],
+        workers: int,
+    ) -> None:
+        super().__init__(address, ConversionHandler)
+        self.convert = convert
+        self.slots = BoundedSemaphore(max(1, workers))
+        self.requests = 0
+
+
+class ConversionHandler(BaseHTTPRequestHandler):
+    """Handle a request to the local conversion service.
+
+    POST /convert with the Poker Now csv file as the body. The hand histories are streamed back as
+    they are converted. Query parameters:
+        - format: ndjson for one hand history per line (default), pretty for the .ohh format or
+          pokerstars for PokerStars text
+        - table: name of the table, taken from the file parameter if not given
+        - file: name of the Poker Now csv file
+        - hero: name of the hero, defaults to hero_name in config.ini
+
+    GET /health returns the number of requests, hands and quarantined hands as JSON.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server: ConversionServer
+
+    def log_message(  # pylint: disable=redefined-builtin
+        self, format: str, *args
+    ) -> None:
+        logging.info(f"[SERVER] {self.address_string()} {format % args}")
+
+    def write_chunk(self, data: bytes) -> None:
+        """Write a chunk of a response with chunked transfer encoding, an empty chunk ends the
+        response.
+
+        Args:
+            data (bytes): The chunk.
+
+        Returns:
+            None
+        """
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Report the counters of the service."""
+        if urlparse(self.path).path != "/health":
+            self.send_error(404)
+            return
+        body = json.dumps(
+            {
+                REQUESTS: self.server.requests,
+                HANDS: progress[HANDS],
+                QUARANTINED: progress[QUARANTINED],
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """Convert the Poker Now csv file in the body of the request."""
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        output_format = query.setdefault("format", "ndjson")
+        length = int(self.headers.get("Content-Length", 0))
+        if url.path != "/convert":
+            self.close_connection = True
+            self.send_error(404)
+            return
+        if output_format not in content_types or not length:
+            self.close_connection = True
+            self.send_error(
+                400,
+                "Send the Poker Now csv file as the body, format is ndjson, pretty or pokerstars",
+            )
+            return
+        text = self.rfile.read(length).decode("utf-8-sig")
+        label = query.get("table", query.get("file", "upload"))
+        with self.server.slots:
+            with progress_lock:
+                self.server.requests += 1
+            try:
+                texts = self.server.convert(text, query)
+            except Exception as error:  # pylint: disable=broad-except
+                logging.exception(f"[SERVER][{label}] {error}")
+                self.send_error(422, f"The Poker Now csv file could not be read: {error!r}")
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_types[output_format])
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for hand_text in texts:
+                    self.write_chunk(hand_text.encode("utf-8"))
+                self.write_chunk(b"")
+            except ConnectionError as error:
+                self.close_connection = True
+                logging.warning(f"[SERVER][{label}] The client disconnected: {error!r}")
+
+
+def serve(
+    server_config: SectionProxy,
+    port: Optional[int],
+    convert: Callable[[str, dict[str, str]], Iterator[str]],
+) -> None:
+    """Run the conversion service until it is stopped with CTRL+C.
+
+    Args:
+        server_config (SectionProxy): The [Server] section of config.ini.
+        port (int, optional): Port to listen on, overrides the port in config.ini.
+        convert (Callable[[str, dict[str, str]], Iterator[str]]): Convert a posted Poker Now csv
+            file, see ConversionServer.
+
+    Returns:
+        None
+    """
+    address = (server_config[HOST], port or int(server_config[PORT]))
+    with ConversionServer(address, convert, int(server_config[WORKERS])) as server:
+        logging.info(f"[SERVER] Listening on http://{address[0]}:{address[1]}")
+        console.print(
+            f"Converting Poker Now csv files posted to [green]http://{address[0]}:{address[1]}"
+            "/convert[/green], press CTRL+C to stop."
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logging.info("[SERVER] Stopped.")
+
+
+# END OF FUNCTIONS
+# **************************************************************************************************
@@ -0,0 +1,94 @@
+"""Shared fixtures and helpers of the tests of main.py."""
+import filecmp
+import json
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def run_main(directory: Path, *arguments: str) -> subprocess.CompletedProcess:
+    """Run main.py as a script in a working folder, without input from the user.
+
+    Args:
+        directory (Path): The working folder.
+        arguments (str): The command line arguments.
+
+    Returns:
+        subprocess.CompletedProcess: The finished process.
+    """
+    return subprocess.run(
+        [sys.executable, str(ROOT / "main.py"), *arguments],
+        cwd=directory,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        check=True,
+        timeout=300,
+    )
+
+
+@pytest.fixture(name="generated_logs", scope="session")
+def fixture_generated_logs(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Generate a few Poker Now logs and the name-map data model of their players once per run."""
+    directory = tmp_path_factory.mktemp("generated")
+    subprocess.run(
+        [
+            sys.executable,
+            str(ROOT / "generate_logs.py"),
+            "--tables",
+            "3",
+            "--hands",
+            "60",
+            "--seed",
+            "11",
+            "--name-map",
+            "Config/name-map.json",
+        ],
+        cwd=directory,
+        capture_output=True,
+        check=True,
+    )
+    (directory / "Config" / "config.ini").write_text(
+        "[OHH Constants]\nhero_name = K Godel\n", encoding="UTF-8"
+    )
+    return directory
+
+
+@pytest.fixture(name="workdir")
+def fixture_workdir(generated_logs: Path, tmp_path: Path) -> Path:
+    """A working folder holding a copy of the generated logs and the config."""
+    directory = tmp_path / "work"
+    shutil.copytree(generated_logs, directory)
+    return directory
+
+
+def read_ohh(path: Path) -> list[dict]:
+    """Read the hand histories of an .ohh file, the pretty JSON objects are concatenated."""
+    text = path.read_text(encoding="utf-8")
+    decoder = json.JSONDecoder()
+    hands = []
+    index = 0
+    while True:
+        while index < len(text) and text[index].isspace():
+            index += 1
+        if index == len(text):
+            return hands
+        ohh, index = decoder.raw_decode(text, index)
+        hands.append(ohh)
+
+
+def assert_same_tree(expected: Path, actual: Path) -> None:
+    """Check that two folders hold the same files with the same contents."""
+    comparison = filecmp.dircmp(expected, actual)
+    assert not comparison.left_only and not comparison.right_only
+    _, mismatch, errors = filecmp.cmpfiles(
+        expected, actual, comparison.common_files, shallow=False
+    )
+    assert not mismatch and not errors
+    for directory in comparison.common_dirs:
+        assert_same_tree(expected / directory, actual / directory)
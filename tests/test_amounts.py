@@ -0,0 +1,96 @@
+"""Tests of the amounts of the hands, which are parsed as integer cents and written as decimals."""
+import copy
+import json
+
+import pytest
+
+from constants import (  # pylint: disable=import-error
+    ACTION,
+    ACTIONS,
+    AMOUNT,
+    ANTE_AMOUNT,
+    BIG_BLIND_AMOUNT,
+    CARDS,
+    CONTRIBUTED_RAKE,
+    ID,
+    IS_ALL_IN,
+    NAME,
+    OHH,
+    PLAYERS,
+    PLAYER_ID,
+    PLAYER_WINS,
+    POTS,
+    RAKE,
+    ROUNDS,
+    SMALL_BLIND_AMOUNT,
+    STARTING_STACK,
+    STREET,
+    TOURNAMENT_INFO,
+    WIN_AMOUNT,
+)
+import hand_parser  # pylint: disable=import-error
+import output  # pylint: disable=import-error
+
+
+@pytest.mark.parametrize(
+    "amount, cents",
+    [
+        ("0", 0),
+        ("7", 700),
+        ("12.5", 1250),
+        ("12.05", 1205),
+        (" 3.10 ", 310),
+        (".75", 75),
+        ("1000000.99", 100000099),
+    ],
+)
+def test_to_cents(amount: str, cents: int) -> None:
+    """Amounts of the log and config.ini are parsed as exact cents."""
+    assert hand_parser.to_cents(amount) == cents
+
+
+@pytest.mark.parametrize("pretty", [True, False])
+def test_encode_ohh_writes_decimals(pretty: bool) -> None:
+    """Every amount of a hand is written as a decimal, the way json.dumps writes the hand converted
+    to decimals, and the hand in cents is left as it was."""
+    ohh = {
+        SMALL_BLIND_AMOUNT: 5,
+        BIG_BLIND_AMOUNT: 10,
+        ANTE_AMOUNT: 0,
+        PLAYERS: [{ID: 0, NAME: "Zoë", STARTING_STACK: 1205}],
+        ROUNDS: [
+            {
+                STREET: "Preflop",
+                CARDS: [],
+                ACTIONS: [
+                    {ACTION: "Post SB", AMOUNT: 5, IS_ALL_IN: False},
+                    {ACTION: "Check"},
+                ],
+            }
+        ],
+        POTS: [
+            {
+                AMOUNT: 1990,
+                RAKE: 10,
+                PLAYER_WINS: [
+                    {PLAYER_ID: 0, WIN_AMOUNT: 1990, CONTRIBUTED_RAKE: 10}
+                ],
+            }
+        ],
+        TOURNAMENT_INFO: {},
+    }
+    decimal_ohh = copy.deepcopy(ohh)
+    decimal_ohh[SMALL_BLIND_AMOUNT] = 0.05
+    decimal_ohh[BIG_BLIND_AMOUNT] = 0.1
+    decimal_ohh[ANTE_AMOUNT] = 0.0
+    decimal_ohh[PLAYERS][0][STARTING_STACK] = 12.05
+    decimal_ohh[ROUNDS][0][ACTIONS][0][AMOUNT] = 0.05
+    decimal_ohh[POTS][0].update({AMOUNT: 19.9, RAKE: 0.1})
+    decimal_ohh[POTS][0][PLAYER_WINS][0].update(
+        {WIN_AMOUNT: 19.9, CONTRIBUTED_RAKE: 0.1}
+    )
+    expected = json.dumps({OHH: decimal_ohh}, indent=4 if pretty else None)
+    assert output.encode_ohh(ohh, pretty) == expected + ("\n\n" if pretty else "\n")
+    # The hand in cents is not changed
+    assert ohh[PLAYERS][0][STARTING_STACK] == 1205
+    assert ohh[POTS][0][AMOUNT] == 1990
@@ -0,0 +1,39 @@
+"""Tests of the logs read directly from gzip and zip files."""
+import gzip
+from pathlib import Path
+import shutil
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from conftest import assert_same_tree, run_main
+
+
+def test_compressed_logs_match_csv_logs(workdir: Path, tmp_path: Path) -> None:
+    """The logs of a .csv.gz file and of a .zip file are converted to the same hand histories as
+    the csv files, and the compressed files themselves are archived. A .zip file is archived once
+    all its logs have been converted."""
+    converted = tmp_path / "converted"
+    shutil.copytree(workdir, converted)
+    run_main(converted)
+    csv_dir = workdir / "PokerNowHandHistory"
+    logs = sorted(csv_dir.glob("*.csv"))
+    gzip_path = csv_dir / f"{logs[0].name}.gz"
+    gzip_path.write_bytes(gzip.compress(logs[0].read_bytes()))
+    zip_path = csv_dir / "bundle.zip"
+    with ZipFile(zip_path, "w", compression=ZIP_DEFLATED) as archive:
+        for log_path in logs[1:]:
+            archive.write(log_path, f"logs/{log_path.name}")
+        archive.writestr("notes.txt", "not a log")
+    for log_path in logs:
+        log_path.unlink()
+    table_name = logs[1].stem.removeprefix("poker_now_log_")
+    run_main(workdir, "--table", table_name)
+    assert zip_path.exists()
+    assert [path.name for path in (workdir / "OpenHandHistory").iterdir()] == [
+        logs[1].with_suffix(".ohh").name
+    ]
+    run_main(workdir)
+    assert sorted(path.name for path in (csv_dir / "Archive").iterdir()) == sorted(
+        [gzip_path.name, zip_path.name]
+    )
+    assert not list(csv_dir.glob("*.*"))
+    assert_same_tree(converted / "OpenHandHistory", workdir / "OpenHandHistory")
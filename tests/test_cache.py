@@ -0,0 +1,40 @@
+"""Tests of the cache of parsed hands and --rerender."""
+from pathlib import Path
+import shutil
+
+from conftest import assert_same_tree, run_main
+
+
+def test_rerender_matches_fresh_conversion(workdir: Path, tmp_path: Path) -> None:
+    """Rendering from the cache after the config changed gives the outputs of a new conversion, the
+    outputs of the previous partition layout are removed."""
+    fresh = tmp_path / "fresh"
+    for name in ("PokerNowHandHistory", "Config"):
+        shutil.copytree(workdir / name, fresh / name)
+    run_main(workdir)
+    settings = (
+        "[OHH Constants]\nhero_name = K Godel\nsite_name = TestSite\n"
+        "[Output]\nformats = ohh, pokerstars\npartition = table\nmax_hands = 25\n"
+    )
+    for directory in (workdir, fresh):
+        (directory / "Config" / "config.ini").write_text(settings, encoding="UTF-8")
+    run_main(workdir, "--rerender")
+    run_main(fresh)
+    assert any((fresh / "OpenHandHistory").rglob("*.txt"))
+    assert_same_tree(fresh / "OpenHandHistory", workdir / "OpenHandHistory")
+    assert_same_tree(fresh / "OpenTournamentSummary", workdir / "OpenTournamentSummary")
+
+
+def test_cache_smaller_than_an_entry_keeps_the_last_log(workdir: Path) -> None:
+    """An entry larger than the size budget of the cache is kept until the next log is cached, so
+    the last log converted can still be rendered again."""
+    with (workdir / "Config" / "config.ini").open("a", encoding="UTF-8") as config_file:
+        config_file.write("[Cache]\nmax_bytes = 1\n")
+    run_main(workdir)
+    entries = list((workdir / "Cache").glob("*.cache"))
+    assert len(entries) == 1
+    output = workdir / "OpenHandHistory" / entries[0].with_suffix(".ohh").name
+    expected = output.read_bytes()
+    output.unlink()
+    run_main(workdir, "--rerender")
+    assert output.read_bytes() == expected
@@ -0,0 +1,54 @@
+"""Tests of the commit of the output of each log, which an interrupted batch resumes from."""
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+
+from conftest import ROOT, assert_same_tree, run_main
+from output import uncommitted_path  # pylint: disable=import-error
+
+
+def test_interrupted_batch_resumes_from_first_uncommitted_log(
+    workdir: Path, tmp_path: Path
+) -> None:
+    """A batch stopped while the .ohh file of a log is renamed leaves the committed logs archived,
+    no partial .ohh file and the other logs in the batch. The next run removes the temporary file
+    and writes the same hand histories as a batch that was not interrupted."""
+    uninterrupted = tmp_path / "uninterrupted"
+    shutil.copytree(workdir, uninterrupted)
+    run_main(uninterrupted)
+    logs = sorted((workdir / "PokerNowHandHistory").glob("*.csv"))
+    ohh_path = workdir / "OpenHandHistory" / logs[1].with_suffix(".ohh").name
+    # The process exits as if it was killed before the .ohh file of the second log is renamed
+    crashed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import os, runpy, sys\n"
+            f"sys.path.insert(0, {str(ROOT)!r})\n"
+            "import output\n"
+            "replace_file = output.replace_file\n"
+            "def crash(temp_path, path):\n"
+            f"    if path.name == {ohh_path.name!r}:\n"
+            "        os._exit(3)\n"
+            "    replace_file(temp_path, path)\n"
+            "output.replace_file = crash\n"
+            f"runpy.run_path({str(ROOT / 'main.py')!r}, run_name='__main__')\n",
+        ],
+        cwd=workdir,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        check=False,
+        timeout=300,
+    )
+    assert crashed.returncode == 3
+    assert not ohh_path.exists()
+    assert uncommitted_path(ohh_path).exists()
+    assert (workdir / "OpenHandHistory" / logs[0].with_suffix(".ohh").name).exists()
+    assert (workdir / "PokerNowHandHistory" / "Archive" / logs[0].name).exists()
+    assert all(log.exists() for log in logs[1:])
+    resumed = " ".join(run_main(workdir).stdout.decode("utf-8").split())
+    assert "Resuming an interrupted batch" in resumed
+    assert not uncommitted_path(ohh_path).exists()
+    for directory in ("OpenHandHistory", "PokerNowHandHistory"):
+        assert_same_tree(uninterrupted / directory, workdir / directory)
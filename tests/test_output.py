@@ -0,0 +1,35 @@
+"""Tests of the output folders and files written for the converted logs."""
+from pathlib import Path
+
+from conftest import read_ohh, run_main
+
+
+def test_hero_folders_are_apart_from_table_partitions(workdir: Path) -> None:
+    """The output of another hero is written to the Heroes folder, so a hero named like a table
+    does not share the partition folder of the table."""
+    logs = sorted((workdir / "PokerNowHandHistory").glob("*.csv"))
+    table_name = logs[0].stem.removeprefix("poker_now_log_")
+    with open(workdir / "Config" / "config.ini", "a", encoding="UTF-8") as config_file:
+        config_file.write(f"heroes = {table_name}\n[Output]\npartition = table\n")
+    run_main(workdir)
+    table_folder = workdir / "OpenHandHistory" / table_name
+    assert sorted(path.name for path in table_folder.iterdir()) == [
+        logs[0].with_suffix(".ohh").name
+    ]
+    hero_files = sorted((workdir / "Heroes" / table_name).rglob("*.ohh"))
+    assert [path.name for path in hero_files] == [log.with_suffix(".ohh").name for log in logs]
+    for path in hero_files:
+        hero_hands = read_ohh(path)
+        hands = read_ohh(workdir / "OpenHandHistory" / path.relative_to(path.parents[1]))
+        assert [ohh["ohh"]["game_number"] for ohh in hero_hands] == [
+            ohh["ohh"]["game_number"] for ohh in hands
+        ]
+
+
+def test_progress_counts_every_log(workdir: Path) -> None:
+    """A file of the batch that is not a Poker Now log is counted as done, so the progress of the
+    batch reaches 100%."""
+    (workdir / "PokerNowHandHistory" / "notes.csv").write_text("entry,at,order\n", encoding="utf-8")
+    logs = len(list((workdir / "PokerNowHandHistory").glob("*.csv")))
+    completed = run_main(workdir).stdout.decode("utf-8")
+    assert f"of {logs} files, 100.0% complete" in " ".join(completed.split())
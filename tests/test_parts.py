@@ -0,0 +1,60 @@
+"""Tests of the partitions of the output and the part files they are split into."""
+from pathlib import Path
+import shutil
+
+from conftest import read_ohh, run_main
+from output import OutputLayout, commit_parts  # pylint: disable=import-error
+
+
+def game_numbers(paths: list[Path]) -> list[str]:
+    """Get the game numbers of the hands written to .ohh files, in the order of the files."""
+    return [ohh["ohh"]["game_number"] for path in paths for ohh in read_ohh(path)]
+
+
+def test_parts_roll_over_at_max_hands(workdir: Path, tmp_path: Path) -> None:
+    """The hands of each log are written to the folder of their date in parts of max_hands hands,
+    in the order they were played. Converting the log again without a limit replaces the parts
+    with a single file."""
+    converted = tmp_path / "converted"
+    shutil.copytree(workdir, converted)
+    run_main(converted)
+    config_path = workdir / "Config" / "config.ini"
+    config_text = config_path.read_text(encoding="UTF-8")
+    config_path.write_text(
+        config_text + "[Output]\npartition = date\nmax_hands = 25\n", encoding="UTF-8"
+    )
+    run_main(workdir)
+    ohh_directory = workdir / "OpenHandHistory"
+    for log_path in sorted((converted / "OpenHandHistory").glob("*.ohh")):
+        parts = sorted(ohh_directory.glob(f"*/{log_path.stem}_part*.ohh"))
+        hands = [len(read_ohh(path)) for path in parts]
+        assert hands == [25, 25, 10]
+        assert all(path.parent.name == "2023-01-01" for path in parts)
+        assert game_numbers(parts) == game_numbers([log_path])
+    archive = workdir / "PokerNowHandHistory" / "Archive"
+    for log_path in archive.glob("*.csv"):
+        log_path.replace(log_path.parents[1] / log_path.name)
+    config_path.write_text(config_text + "[Output]\npartition = date\n", encoding="UTF-8")
+    run_main(workdir)
+    assert not list(ohh_directory.glob("*/*_part*.ohh"))
+    for log_path in sorted((converted / "OpenHandHistory").glob("*.ohh")):
+        assert (ohh_directory / "2023-01-01" / log_path.name).read_bytes() == log_path.read_bytes()
+
+
+def test_parts_roll_over_at_max_bytes(tmp_path: Path) -> None:
+    """A part holds the hands that fit in max_bytes, a hand larger than max_bytes is written to a
+    part of its own."""
+    encoded = ["a" * 40, "b" * 40, "c" * 30, "d" * 120, "e" * 10]
+    committed = commit_parts(tmp_path, "log.ohh", encoded, OutputLayout("none", 0, 100))
+    assert [path.name for path in committed] == [
+        "log_part0001.ohh",
+        "log_part0002.ohh",
+        "log_part0003.ohh",
+        "log_part0004.ohh",
+    ]
+    assert [path.read_text(encoding="utf-8") for path in committed] == [
+        "a" * 40 + "b" * 40,
+        "c" * 30,
+        "d" * 120,
+        "e" * 10,
+    ]
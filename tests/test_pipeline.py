@@ -0,0 +1,32 @@
+"""Tests of the pipeline the files of a batch are converted in."""
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+
+from conftest import ROOT, assert_same_tree, run_main
+
+
+def test_pipeline_matches_file_by_file(workdir: Path, tmp_path: Path) -> None:
+    """The threads of the pipeline are only used with more than one CPU, the hand histories they
+    write are the same as the ones written file by file."""
+    threaded = tmp_path / "threaded"
+    shutil.copytree(workdir, threaded)
+    run_main(workdir)
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import os, runpy, sys\n"
+            f"sys.path.insert(0, {str(ROOT)!r})\n"
+            "os.cpu_count = lambda: 4\n"
+            f"runpy.run_path({str(ROOT / 'main.py')!r}, run_name='__main__')\n",
+        ],
+        cwd=threaded,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        check=True,
+        timeout=300,
+    )
+    for directory in ("OpenHandHistory", "PokerNowHandHistory"):
+        assert_same_tree(workdir / directory, threaded / directory)
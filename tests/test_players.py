@@ -0,0 +1,50 @@
+"""Tests of the players of a log that are not in the name-map data model."""
+import json
+from pathlib import Path
+
+from conftest import run_main
+import csv_logs  # pylint: disable=import-error
+import main  # pylint: disable=import-error
+
+
+def test_separate_hands_collects_the_players(generated_logs: Path) -> None:
+    """Every alias and device seated in the hands of a log is collected once while the log is
+    separated, and each of them belongs to the same player in the name-map data model."""
+    name_map = json.loads(
+        (generated_logs / "Config" / "name-map.json").read_text(encoding="utf-8")
+    )
+    for log_path in sorted((generated_logs / "PokerNowHandHistory").glob("*.csv")):
+        text = log_path.read_text(encoding="utf-8-sig")
+        hands, players = main.separate_hands(
+            log_path.stem, csv_logs.read_rows(text, main.subs_suits)
+        )
+        assert hands and players
+        assert len(players) == len(set(players))
+        for player_display, device_id in players:
+            assert any(
+                player_display in player["nicknames"] and device_id in player["devices"]
+                for player in name_map.values()
+            )
+
+
+def test_new_devices_are_added_once_per_log(workdir: Path) -> None:
+    """The devices missing from the name-map data model are added without prompting and the
+    players of each log are resolved once, before its hands are parsed."""
+    name_map_path = workdir / "Config" / "name-map.json"
+    name_map = json.loads(name_map_path.read_text(encoding="utf-8"))
+    name_map_path.write_text(
+        json.dumps(
+            {name: {**player, "devices": []} for name, player in name_map.items()}, indent=4
+        ),
+        encoding="utf-8",
+    )
+    run_main(workdir)
+    resolved = json.loads(name_map_path.read_text(encoding="utf-8"))
+    for name, player in name_map.items():
+        assert set(resolved[name]["devices"]) <= set(player["devices"])
+        assert resolved[name]["nicknames"] == player["nicknames"]
+    log_text = "".join(
+        path.read_text(encoding="utf-8") for path in (workdir / "Logs").glob("*.log")
+    )
+    logs = list((workdir / "PokerNowHandHistory" / "Archive").glob("*.csv"))
+    assert log_text.count("players are not in the name-map data model.") == len(logs)
@@ -0,0 +1,35 @@
+"""Tests of the PokerStars text output."""
+from pathlib import Path
+import shutil
+
+import pytest
+
+from conftest import run_main
+import pokerstars  # pylint: disable=import-error
+
+DATA = Path(__file__).resolve().parent / "data" / "pokerstars"
+
+
+@pytest.mark.parametrize(
+    "cents, symbol, text",
+    [(0, "", "0"), (2000, "$", "$20"), (1205, "$", "$12.05"), (50, "€", "€0.50")],
+)
+def test_format_amount(cents: int, symbol: str, text: str) -> None:
+    """Whole amounts are written without decimals and the others with two decimals."""
+    assert pokerstars.format_amount(cents, symbol) == text
+
+
+def test_golden_hands(tmp_path: Path) -> None:
+    """A hand shown down and a hand run twice after an all in are written as PokerStars writes
+    them, with the uncalled bet returned before the next street is dealt."""
+    for folder in ("PokerNowHandHistory", "Config"):
+        (tmp_path / folder).mkdir()
+    shutil.copy(DATA / "poker_now_log_golden.csv", tmp_path / "PokerNowHandHistory")
+    shutil.copy(DATA / "name-map.json", tmp_path / "Config")
+    (tmp_path / "Config" / "config.ini").write_text(
+        "[OHH Constants]\nhero_name = K Godel\n[Output]\nformats = pokerstars\n", encoding="UTF-8"
+    )
+    run_main(tmp_path)
+    written = tmp_path / "OpenHandHistory" / "poker_now_log_golden.txt"
+    expected = DATA / "poker_now_log_golden.txt"
+    assert written.read_text(encoding="utf-8") == expected.read_text(encoding="utf-8")
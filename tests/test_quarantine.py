@@ -0,0 +1,45 @@
+"""Tests of the hands that cannot be converted, they are quarantined instead of the log."""
+import re
+from pathlib import Path
+import shutil
+
+from conftest import read_ohh, run_main
+
+
+def game_numbers(directory: Path) -> list[str]:
+    """Get the game numbers of the hands written to the .ohh files of a folder."""
+    return [
+        ohh["ohh"]["game_number"]
+        for path in sorted(directory.glob("*.ohh"))
+        for ohh in read_ohh(path)
+    ]
+
+
+def test_failing_hand_is_quarantined(workdir: Path, tmp_path: Path) -> None:
+    """A hand with a bet type that is not supported is written with its error to the quarantine
+    file of its table and the other hands of the log are still converted."""
+    converted = tmp_path / "converted"
+    shutil.copytree(workdir, converted)
+    run_main(converted)
+    log_path = sorted((workdir / "PokerNowHandHistory").glob("*.csv"))[0]
+    table_name = log_path.stem.removeprefix("poker_now_log_")
+    text = log_path.read_text(encoding="utf-8")
+    # The newest hand is first in the log
+    bet_type = re.search(r"\((No|Pot) Limit ", text)
+    log_path.write_text(
+        text[: bet_type.start()] + "(Fixed Limit " + text[bet_type.end() :], encoding="utf-8"
+    )
+    completed = " ".join(run_main(workdir).stdout.decode("utf-8").split())
+    assert "1 hands were quarantined" in completed
+    quarantined = list((workdir / "Quarantine" / table_name).iterdir())
+    assert len(quarantined) == 1
+    game_number = quarantined[0].stem
+    entry = quarantined[0].read_text(encoding="utf-8")
+    assert entry.startswith(f"***** game_number: {game_number} ")
+    assert "KeyError: 'Fixed Limit'" in entry
+    assert game_numbers(workdir / "OpenHandHistory") == [
+        number
+        for number in game_numbers(converted / "OpenHandHistory")
+        if number != game_number
+    ]
+    assert (workdir / "PokerNowHandHistory" / "Archive" / log_path.name).exists()
@@ -0,0 +1,141 @@
+"""Tests of the rows located for the --since and --until time range."""
+import io
+from typing import Optional
+
+import pytest
+
+import csv_logs  # pylint: disable=import-error
+import main  # pylint: disable=import-error
+
+# The order of the first row of the generated log for the locate_range tests
+FIRST_ORDER = 161863047336900
+
+
+def make_log(hands: int, rows_per_hand: int) -> tuple[bytes, list[tuple[int, int]]]:
+    """Write a Poker Now log with the newest row first, like the downloaded csv files.
+
+    Args:
+        hands (int): Number of hands.
+        rows_per_hand (int): Number of rows of each hand, including the starting row.
+
+    Returns:
+        tuple[bytes, list[tuple[int, int]]]: The csv file and the order of each row with the order
+        of the row that started its hand, newest first.
+    """
+    rows = []
+    order = FIRST_ORDER
+    for hand_number in range(1, hands + 1):
+        start = order
+        rows.append(
+            (
+                order,
+                start,
+                f'"-- starting hand #{hand_number} (id: h{hand_number})  (No Limit Texas '
+                f'Hold\'em) (dealer: ""A @ a1"") --"',
+            )
+        )
+        for _ in range(rows_per_hand - 1):
+            order += 100
+            rows.append((order, start, '"""A @ a1"" checks"'))
+        order += 137
+    rows.reverse()
+    text = "entry,at,order\n" + "".join(
+        f"{entry},2021-04-17T03:34:33.368Z,{row_order}\n" for row_order, _, entry in rows
+    )
+    return text.encode("utf-8"), [(row_order, start) for row_order, start, _ in rows]
+
+
+def orders_in(data: bytes, byte_range: tuple[int, int]) -> list[int]:
+    """Get the order of the rows between the offsets of a range."""
+    return [csv_logs.row_order(line) for line in data[byte_range[0]:byte_range[1]].splitlines()]
+
+
+def expected_orders(
+    rows: list[tuple[int, int]], since: Optional[int], until: Optional[int]
+) -> list[int]:
+    """Get the order of the rows locate_range should return, every row logged since the start of
+    the range, up to the end of the last hand started in the range."""
+    return [
+        order
+        for order, start in rows
+        if (since is None or order >= since) and (until is None or start <= until)
+    ]
+
+
+def test_locate_range_boundaries() -> None:
+    """The rows logged at the start and the end of a range are part of it."""
+    data, rows = make_log(hands=5, rows_per_hand=4)
+    orders = sorted(order for order, _ in rows)
+    csv_file = io.BytesIO(data)
+    assert csv_logs.locate_range(csv_file, None, None) == (data.index(b"\n") + 1, len(data))
+    for order in orders:
+        for since, until in (
+            (order, None),
+            (order + 1, None),
+            (None, order),
+            (None, order - 1),
+            (order, order),
+            (orders[0], order),
+        ):
+            byte_range = csv_logs.locate_range(csv_file, since, until)
+            assert orders_in(data, byte_range) == expected_orders(rows, since, until)
+    # Ranges before the first row or after the last row are empty
+    assert orders_in(data, csv_logs.locate_range(csv_file, None, orders[0] - 1)) == []
+    assert orders_in(data, csv_logs.locate_range(csv_file, orders[-1] + 1, None)) == []
+
+
+@pytest.mark.parametrize("block_size", range(21, 61))
+def test_locate_range_hand_start_across_blocks(
+    monkeypatch: pytest.MonkeyPatch, block_size: int
+) -> None:
+    """The start of a hand is found when its row is split between two of the blocks read backwards
+    from the end of the range, small blocks split the starting rows at every offset."""
+    monkeypatch.setattr(csv_logs, "BLOCK_SIZE", block_size)
+    data, rows = make_log(hands=6, rows_per_hand=3)
+    csv_file = io.BytesIO(data)
+    for order, _ in rows:
+        byte_range = csv_logs.locate_range(csv_file, None, order)
+        assert orders_in(data, byte_range) == expected_orders(rows, None, order)
+
+
+def test_csv_reader_range_matches_whole_log() -> None:
+    """The rows read for a range are the same as the rows of the whole log."""
+    data, rows = make_log(hands=4, rows_per_hand=3)
+    whole = csv_logs.csv_reader(io.BytesIO(data), main.subs_suits)
+    until = rows[len(rows) // 2][1]
+    csv_file = io.BytesIO(data)
+    part = csv_logs.csv_reader(
+        csv_file, main.subs_suits, csv_logs.locate_range(csv_file, None, until)
+    )
+    # The rows are returned oldest first followed by an empty row, the range is the oldest hands
+    assert whole[-1] == part[-1] == []
+    assert part[:-1] == whole[: len(part) - 1]
+
+
+@pytest.mark.parametrize(
+    "until, last",
+    [
+        ("2021-04-17T03:34:33", "2021-04-17T03:34:33.999"),
+        ("2021-04-17T03:34", "2021-04-17T03:34:59.999"),
+        ("2021-04-17T03", "2021-04-17T03:59:59.999"),
+        ("2021-04-17", "2021-04-17T23:59:59.999"),
+        ("2021-04-17T03:34:33.5", "2021-04-17T03:34:33.599"),
+        ("2021-04-17T03:34:33.368", "2021-04-17T03:34:33.368"),
+        ("2021-04-17T05:34:33+02:00", "2021-04-17T03:34:33.999"),
+    ],
+)
+def test_until_covers_its_precision(until: str, last: str) -> None:
+    """The end of a range covers every row logged up to the end of the second, minute, hour, day
+    or fraction of a second it is given at, and no row after it."""
+    assert csv_logs.to_order(until, end=True) == csv_logs.to_order(last) + 99
+
+
+def test_until_a_second_includes_the_hands_of_that_second() -> None:
+    """The hands of a log started within the second given to --until are converted, the rows of
+    the log are logged from 03:34:33.369."""
+    data, rows = make_log(hands=5, rows_per_hand=4)
+    until = csv_logs.to_order("2021-04-17T03:34:33", end=True)
+    byte_range = csv_logs.locate_range(io.BytesIO(data), None, until)
+    assert orders_in(data, byte_range) == [order for order, _ in rows]
+    before = csv_logs.to_order("2021-04-17T03:34:32", end=True)
+    assert orders_in(data, csv_logs.locate_range(io.BytesIO(data), None, before)) == []
@@ -0,0 +1,61 @@
+"""Tests of the re-encoding of .ohh files by reencode_ohh.py."""
+import gzip
+import io
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT, assert_same_tree, read_ohh, run_main
+import reencode_ohh  # pylint: disable=import-error
+
+
+def reencode(directory: Path, *arguments: str) -> None:
+    """Run reencode_ohh.py as a script in a working folder."""
+    subprocess.run(
+        [sys.executable, str(ROOT / "reencode_ohh.py"), *arguments, "--processes", "2"],
+        cwd=directory,
+        capture_output=True,
+        check=True,
+        timeout=300,
+    )
+
+
+def test_compact_gzip_round_trip(workdir: Path) -> None:
+    """Hand histories re-encoded as compressed compact NDJSON and back are written as they were by
+    main.py, in the same folder tree."""
+    run_main(workdir)
+    reencode(workdir, "OpenHandHistory", "--format", "compact", "--gzip", "--output", "Compact")
+    ohh_paths = sorted((workdir / "OpenHandHistory").glob("*.ohh"))
+    for path in ohh_paths:
+        compact = workdir / "Compact" / path.with_suffix(".ndjson.gz").name
+        lines = gzip.decompress(compact.read_bytes()).decode("utf-8").splitlines()
+        assert len(lines) == len(read_ohh(path))
+        assert all(", " not in line and ": " not in line for line in lines)
+    reencode(workdir, "Compact", "--output", "Pretty")
+    assert_same_tree(workdir / "OpenHandHistory", workdir / "Pretty")
+
+
+def test_versions_are_upgraded_in_place(workdir: Path) -> None:
+    """The versions of every hand history are set in place and the rest of the hand is unchanged."""
+    run_main(workdir)
+    ohh_paths = sorted((workdir / "OpenHandHistory").glob("*.ohh"))
+    before = {path: read_ohh(path) for path in ohh_paths}
+    reencode(workdir, "OpenHandHistory", "--spec-version", "9.9.9", "--internal-version", "2.0")
+    assert sorted((workdir / "OpenHandHistory").iterdir()) == ohh_paths
+    for path, hands in before.items():
+        for hand in hands:
+            hand["ohh"].update({"spec_version": "9.9.9", "internal_version": "2.0"})
+        assert read_ohh(path) == hands
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 64, 1000])
+def test_read_hands_across_blocks(monkeypatch: pytest.MonkeyPatch, block_size: int) -> None:
+    """Hand histories cut by the end of a block are decoded once the next block is read."""
+    monkeypatch.setattr(reencode_ohh, "BLOCK_SIZE", block_size)
+    hands = [
+        {"ohh": {"game_number": str(number), "players": [{"name": "Zoë"}]}} for number in range(5)
+    ]
+    text = "".join(reencode_ohh.encode_hand(hand, reencode_ohh.PRETTY) for hand in hands)
+    assert list(reencode_ohh.read_hands(io.StringIO(text))) == hands
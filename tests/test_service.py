@@ -0,0 +1,90 @@
+"""Tests of the local HTTP conversion service started with --serve."""
+from contextlib import contextmanager
+import json
+from pathlib import Path
+import socket
+import subprocess
+import sys
+import time
+from typing import Iterator
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+from conftest import ROOT, read_ohh, run_main
+import service  # pylint: disable=import-error
+
+
+def free_port() -> int:
+    """Get a port no other program is listening on."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@contextmanager
+def running_service(workdir: Path) -> Iterator[str]:
+    """Start the service in a working folder and stop it when the test is done.
+
+    Args:
+        workdir (Path): The working folder.
+
+    Returns:
+        Iterator[str]: The URL of the service once it answers /health.
+    """
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    with subprocess.Popen(
+        [sys.executable, str(ROOT / "main.py"), "--serve", "--port", str(port)],
+        cwd=workdir,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    ) as server:
+        try:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    with urlopen(f"{url}/health", timeout=5):
+                        break
+                except URLError:
+                    assert time.monotonic() < deadline and server.poll() is None
+                    time.sleep(0.2)
+            yield url
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+def convert(url: str, log_path: Path) -> list[dict]:
+    """Post a Poker Now csv file to the service and read the NDJSON hand histories it returns."""
+    request = Request(
+        f"{url}/convert?file={log_path.name}", data=log_path.read_bytes(), method="POST"
+    )
+    with urlopen(request, timeout=60) as response:
+        return [json.loads(line) for line in response.read().splitlines() if line]
+
+
+def test_service_round_trip(workdir: Path) -> None:
+    """The service returns the hand histories the batch conversion writes for the same log."""
+    run_main(workdir)
+    with running_service(workdir) as url:
+        with urlopen(f"{url}/health", timeout=5) as response:
+            assert json.load(response)[service.REQUESTS] == 0
+        for log_path in sorted((workdir / "PokerNowHandHistory" / "Archive").glob("*.csv")):
+            converted = read_ohh(workdir / "OpenHandHistory" / log_path.with_suffix(".ohh").name)
+            assert convert(url, log_path) == converted
+
+
+def test_service_does_not_write_the_name_map(workdir: Path) -> None:
+    """A device that is not in the name-map data model is not added to name-map.json by the
+    service, the player is still named from their alias."""
+    name_map_path = workdir / "Config" / "name-map.json"
+    name_map = json.loads(name_map_path.read_text(encoding="utf-8"))
+    for player in name_map.values():
+        player["devices"] = player["devices"][1:]
+    name_map_path.write_text(json.dumps(name_map, indent=4), encoding="utf-8")
+    name_map_text = name_map_path.read_text(encoding="utf-8")
+    with running_service(workdir) as url:
+        for log_path in sorted((workdir / "PokerNowHandHistory").glob("*.csv")):
+            assert convert(url, log_path)
+    assert name_map_path.read_text(encoding="utf-8") == name_map_text
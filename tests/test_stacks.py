@@ -0,0 +1,31 @@
+"""Tests of the stacks of the players checked between the hands of a table."""
+import re
+from pathlib import Path
+
+from conftest import run_main
+
+
+def test_stack_discontinuity_is_reported(workdir: Path) -> None:
+    """A starting stack that is not the stack the player had after their last hand at the table is
+    reported once, for the player and the hand it was found in."""
+    log_path = sorted((workdir / "PokerNowHandHistory").glob("*.csv"))[0]
+    text = log_path.read_text(encoding="utf-8")
+    # The newest hand is first in the log, changing its starting stack only breaks that hand
+    stacks = re.search(
+        r'Player stacks: #\d+ ""(?P<player>.+?) @ [-\w]+"" \((?P<amount>\d+)\)', text
+    )
+    amount = int(stacks.group("amount"))
+    log_path.write_text(
+        text[: stacks.start("amount")] + str(amount + 1) + text[stacks.end("amount") :],
+        encoding="utf-8",
+    )
+    run_main(workdir)
+    log_text = "".join(
+        path.read_text(encoding="utf-8") for path in (workdir / "Logs").glob("*.log")
+    )
+    assert log_text.count("Stack discontinuity") == 1
+    assert (
+        f"Stack discontinuity for {stacks.group('player')}, the stack after the last hand was "
+        f"{float(amount)} but the starting stack is {float(amount + 1)}." in log_text
+    )
+    assert "[ALL] 1 stack discontinuities were found." in log_text
@@ -0,0 +1,58 @@
+"""Tests of the --tail mode for the logs of sessions that are still being played."""
+from pathlib import Path
+import shutil
+
+from conftest import run_main
+
+
+def single_log(workdir: Path) -> Path:
+    """Keep only the first generated log in the working folder."""
+    logs = sorted((workdir / "PokerNowHandHistory").glob("*.csv"))
+    for log_path in logs[1:]:
+        log_path.unlink()
+    return logs[0]
+
+
+def write_oldest_rows(log_path: Path, full_text: str, count: int) -> None:
+    """Write the log as it was downloaded while only its oldest rows had been logged."""
+    header, *rows = full_text.splitlines(keepends=True)
+    log_path.write_text(header + "".join(rows[-count:]), encoding="utf-8")
+
+
+def test_tails_append_to_the_full_conversion(workdir: Path, tmp_path: Path) -> None:
+    """Tailing a log while it grows writes the same .ohh file as converting the finished log, and
+    the log is left in place for the next tail."""
+    log_path = single_log(workdir)
+    converted = tmp_path / "converted"
+    shutil.copytree(workdir, converted)
+    run_main(converted)
+    full_text = log_path.read_text(encoding="utf-8")
+    rows = full_text.count("\n") - 1
+    ohh_name = log_path.with_suffix(".ohh").name
+    for count in (rows // 3, rows // 2, rows):
+        write_oldest_rows(log_path, full_text, count)
+        run_main(workdir, "--tail")
+    assert log_path.exists()
+    table_name = log_path.stem.removeprefix("poker_now_log_")
+    assert (workdir / "Tail" / f"{table_name}.json").exists()
+    assert (workdir / "OpenHandHistory" / ohh_name).read_bytes() == (
+        converted / "OpenHandHistory" / ohh_name
+    ).read_bytes()
+
+
+def test_interrupted_tail_is_cut_back(workdir: Path, tmp_path: Path) -> None:
+    """Hands appended by a tail that was interrupted before its state was saved are cut from the
+    .ohh file by the next tail, so they are not written twice."""
+    log_path = single_log(workdir)
+    converted = tmp_path / "converted"
+    shutil.copytree(workdir, converted)
+    run_main(converted)
+    full_text = log_path.read_text(encoding="utf-8")
+    ohh_path = workdir / "OpenHandHistory" / log_path.with_suffix(".ohh").name
+    write_oldest_rows(log_path, full_text, full_text.count("\n") // 2)
+    run_main(workdir, "--tail")
+    with open(ohh_path, "a", encoding="utf-8") as ohh_file:
+        ohh_file.write('{\n    "ohh": {\n')
+    log_path.write_text(full_text, encoding="utf-8")
+    run_main(workdir, "--tail")
+    assert ohh_path.read_bytes() == (converted / "OpenHandHistory" / ohh_path.name).read_bytes()
@@ -0,0 +1,96 @@
+"""Tests of the conversion of tournament logs and their Open Tournament Summary."""
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+
+from conftest import read_ohh, run_main
+
+TABLE_NAME = "pgltournament000000000001"
+# The rows of a sit and go of three players, oldest first. Bo busts in the first hand and Ana in
+# the second.
+TOURNAMENT_ROWS = [
+    'The player "K Godel @ dK" is in the tournament with a stack of 1000.',
+    'The player "Ana @ dA" is in the tournament with a stack of 1000.',
+    'The player "Bo @ dB" is in the tournament with a stack of 1000.',
+    "-- starting hand #1  (No Limit Texas Hold'em) (dealer: \"K Godel @ dK\") --",
+    'Player stacks: #1 "K Godel @ dK" (1000) | #2 "Ana @ dA" (1000) | #3 "Bo @ dB" (1000)',
+    "Your hand is A♠, A♥",
+    '"Ana @ dA" posts a small blind of 10',
+    '"Bo @ dB" posts a big blind of 20',
+    '"K Godel @ dK" raises to 1000 and go all in',
+    '"Ana @ dA" folds',
+    '"Bo @ dB" calls 1000 and go all in',
+    "Flop:  [2♣, 7♦, 9♠]",
+    "Turn: 2♣, 7♦, 9♠ [J♥]",
+    "River: 2♣, 7♦, 9♠, J♥ [4♣]",
+    '"K Godel @ dK" shows a A♠, A♥.',
+    '"Bo @ dB" shows a K♠, Q♥.',
+    '"K Godel @ dK" collected 2010 from pot',
+    "-- ending hand #1 --",
+    "-- starting hand #2  (No Limit Texas Hold'em) (dealer: \"Ana @ dA\") --",
+    'Player stacks: #1 "K Godel @ dK" (2010) | #2 "Ana @ dA" (990)',
+    "Your hand is K♦, K♣",
+    '"Ana @ dA" posts a small blind of 10',
+    '"K Godel @ dK" posts a big blind of 20',
+    '"Ana @ dA" raises to 990 and go all in',
+    '"K Godel @ dK" calls 990',
+    "Flop:  [3♣, 8♦, 10♠]",
+    "Turn: 3♣, 8♦, 10♠ [Q♦]",
+    "River: 3♣, 8♦, 10♠, Q♦ [5♥]",
+    '"Ana @ dA" shows a 6♠, 6♥.',
+    '"K Godel @ dK" shows a K♦, K♣.',
+    '"K Godel @ dK" collected 1980 from pot',
+    "-- ending hand #2 --",
+]
+
+
+def write_tournament_log(workdir: Path) -> Path:
+    """Write the tournament log newest row first, with its players in the name-map data model."""
+    start_ms = 1672531200000
+    rows = []
+    for index, entry in enumerate(TOURNAMENT_ROWS):
+        at_ms = start_ms + index * 1000
+        at = datetime.fromtimestamp(at_ms / 1000, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        escaped = entry.replace('"', '""')
+        rows.append(f'"{escaped}",{at}.000Z,{at_ms * 100}\n')
+    log_path = workdir / "PokerNowHandHistory" / f"poker_now_log_{TABLE_NAME}.csv"
+    log_path.write_text("entry,at,order\n" + "".join(reversed(rows)), encoding="utf-8")
+    name_map_path = workdir / "Config" / "name-map.json"
+    name_map = json.loads(name_map_path.read_text(encoding="utf-8"))
+    for name, device in (("Ana", "dA"), ("Bo", "dB")):
+        name_map[name] = {"nicknames": [name], "devices": [device]}
+    name_map["K Godel"]["devices"].append("dK")
+    name_map_path.write_text(json.dumps(name_map, indent=4), encoding="utf-8")
+    return log_path
+
+
+def test_tournament_log_is_summarized(workdir: Path) -> None:
+    """The hands of a tournament log carry its tournament_info and the summary of the tournament
+    is written with the players in the order they finished. The ring game logs converted in the
+    same batch have no tournament_info or summary."""
+    with open(workdir / "Config" / "config.ini", "a", encoding="UTF-8") as config_file:
+        config_file.write("[Tournament]\nbuyin_amount = 10\n")
+    log_path = write_tournament_log(workdir)
+    run_main(workdir)
+    hands = read_ohh(workdir / "OpenHandHistory" / log_path.with_suffix(".ohh").name)
+    assert len(hands) == 2
+    for ohh in hands:
+        tournament_info = ohh["ohh"]["tournament_info"]
+        assert tournament_info["tournament_number"] == TABLE_NAME
+        assert tournament_info["initial_stack"] == 1000.0
+    ots_paths = list((workdir / "OpenTournamentSummary").iterdir())
+    assert [path.name for path in ots_paths] == [log_path.with_suffix(".ots").name]
+    ots = json.loads(ots_paths[0].read_text(encoding="utf-8"))["ots"]
+    assert ots["tournament_number"] == TABLE_NAME
+    assert ots["start_date_utc"] == hands[0]["ohh"]["start_date_utc"]
+    assert ots["end_date_utc"] == hands[-1]["ohh"]["start_date_utc"]
+    assert ots["player_count"] == 3
+    assert ots["prize_pool"] == 30.0
+    assert ots["hero_player_name"] == "K Godel"
+    assert [
+        (finish["player_name"], finish["finish_position"], finish["still_playing"])
+        for finish in ots["tournament_finishes_and_winnings"]
+    ] == [("K Godel", 1, False), ("Ana", 2, False), ("Bo", 3, False)]
+    for ring_log in (workdir / "OpenHandHistory").glob("*.ohh"):
+        if ring_log.stem != log_path.stem:
+            assert all("tournament_info" not in ohh["ohh"] for ohh in read_ohh(ring_log))
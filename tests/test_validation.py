@@ -0,0 +1,77 @@
+"""Tests of the validation of the converted hands against the OHH schema."""
+import copy
+import logging
+from pathlib import Path
+
+import pytest
+
+from conftest import read_ohh, run_main
+from constants import (  # pylint: disable=import-error
+    ACTIONS,
+    COUNT,
+    DEALER_SEAT,
+    FULL,
+    GAME_NUMBER,
+    INVALID,
+    IS_ALL_IN,
+    OFF,
+    OHH,
+    ROUNDS,
+    SAMPLED,
+)
+from validation import HandValidation, validate_hand  # pylint: disable=import-error
+
+
+def converted_hands(workdir: Path) -> list[dict]:
+    """Convert the generated logs and read the hands written to the .ohh files."""
+    run_main(workdir)
+    return [
+        ohh[OHH]
+        for path in sorted((workdir / "OpenHandHistory").glob("*.ohh"))
+        for ohh in read_ohh(path)
+    ]
+
+
+def test_full_mode_validates_every_hand(workdir: Path) -> None:
+    """Every converted hand is validated in the full mode and conforms to the schema."""
+    with open(workdir / "Config" / "config.ini", "a", encoding="UTF-8") as config_file:
+        config_file.write("[Validation]\nmode = full\n")
+    hands = converted_hands(workdir)
+    log_text = "".join(
+        path.read_text(encoding="utf-8") for path in (workdir / "Logs").glob("*.log")
+    )
+    assert f"[ALL] 0 of {len(hands)} validated hands were invalid." in log_text
+
+
+def test_invalid_hand_is_reported_by_game_number(
+    workdir: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Each error of an invalid hand is logged with the table and the game number of the hand."""
+    ohh = copy.deepcopy(converted_hands(workdir)[0])
+    ohh[ROUNDS][0][ACTIONS][0][IS_ALL_IN] = "no"
+    del ohh[DEALER_SEAT]
+    validation = HandValidation(FULL, 0.0)
+    with caplog.at_level(logging.WARNING):
+        validate_hand(validation, "table", ohh)
+    assert validation.counts == {COUNT: 1, INVALID: 1}
+    assert caplog.messages == [
+        f"[table][{ohh[GAME_NUMBER]}] Invalid hand: {OHH}.{DEALER_SEAT} is required",
+        f"[table][{ohh[GAME_NUMBER]}] Invalid hand: {OHH}.{ROUNDS}[0].{ACTIONS}[0].{IS_ALL_IN} "
+        'is "no", expected boolean',
+    ]
+
+
+@pytest.mark.parametrize(
+    "mode, sample_rate, validated",
+    [(OFF, 1.0, False), (SAMPLED, 0.0, False), (SAMPLED, 1.0, True), (FULL, 0.0, True)],
+)
+def test_modes_select_the_hands_validated(
+    workdir: Path, mode: str, sample_rate: float, validated: bool
+) -> None:
+    """The sampled mode validates the share of the hands set by its sample rate and the off mode
+    validates none of them."""
+    hands = converted_hands(workdir)
+    validation = HandValidation(mode, sample_rate)
+    for ohh in hands:
+        validate_hand(validation, "table", ohh)
+    assert validation.counts == {COUNT: len(hands) if validated else 0, INVALID: 0}
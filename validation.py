@@ -0,0 +1,374 @@
+# validation.py
+"""
+****************************************************************************************************
+WHAT THIS DOES
+
+Validate the hands converted by main.py against the parts of the OHH schema
+(https://hh-specs.handhistory.org/) that are written by the converter. The schema is compiled into
+a validator once at start up, so validating a hand only runs the checks. The [Validation] section of
+config.ini sets the mode to full, sampled or off, invalid hands are logged by game number.
+****************************************************************************************************
+"""
+# MODULES
+from dataclasses import dataclass, field
+import json
+import logging
+from random import random
+from typing import Callable
+
+from constants import (
+    ACTION,
+    ACTION_NUMBER,
+    ACTIONS,
+    AMOUNT,
+    ANTE_AMOUNT,
+    BET_LIMIT,
+    BET_TYPE,
+    BIG_BLIND_AMOUNT,
+    BOUNTY_FEE_AMOUNT,
+    BUYIN_AMOUNT,
+    CARDS,
+    CONTRIBUTED_RAKE,
+    COUNT,
+    CURRENCY,
+    DEALER_SEAT,
+    DISPLAY,
+    FEE_AMOUNT,
+    FLAGS,
+    GAME_NUMBER,
+    GAME_TYPE,
+    HERO_PLAYER_ID,
+    ID,
+    INITIAL_STACK,
+    INTERNAL_VERSION,
+    INVALID,
+    IS_ALL_IN,
+    NAME,
+    NETWORK_NAME,
+    NUMBER,
+    OFF,
+    OHH,
+    PLAYER_ID,
+    PLAYER_WINS,
+    PLAYERS,
+    POTS,
+    RAKE,
+    ROUND_TIME,
+    ROUNDS,
+    SAMPLED,
+    SEAT,
+    SITE_NAME,
+    SMALL_BLIND_AMOUNT,
+    SPEC_VERSION,
+    SPEED,
+    START_DATE_UTC,
+    STARTING_STACK,
+    STREET,
+    TABLE_NAME,
+    TABLE_SIZE,
+    TOURNAMENT,
+    TOURNAMENT_INFO,
+    TOURNAMENT_NUMBER,
+    TYPE,
+    WIN_AMOUNT,
+)
+
+# END MODULES
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# SCHEMA
+# The parts of the OHH schema (https://hh-specs.handhistory.org/) that are written by this program.
+# The schema is compiled into a validator once at start up by compile_schema.
+AMOUNT_SCHEMA = {"type": "number"}
+CARDS_SCHEMA = {"type": "array", "items": {"type": "string"}}
+ACTION_SCHEMA = {
+    "type": "object",
+    "required": [ACTION_NUMBER, PLAYER_ID, ACTION],
+    "properties": {
+        ACTION_NUMBER: {"type": "integer"},
+        PLAYER_ID: {"type": "integer"},
+        ACTION: {
+            "type": "string",
+            "enum": [
+                "Dealt Cards",
+                "Mucks Cards",
+                "Shows Cards",
+                "Post Ante",
+                "Post SB",
+                "Post BB",
+                "Straddle",
+                "Post Dead",
+                "Post Extra Blind",
+                "Fold",
+                "Check",
+                "Bet",
+                "Raise",
+                "Call",
+                "Added Chips",
+                "Sits Down",
+                "Stands Up",
+                "Added To Pot",
+            ],
+        },
+        AMOUNT: AMOUNT_SCHEMA,
+        IS_ALL_IN: {"type": "boolean"},
+        CARDS: CARDS_SCHEMA,
+    },
+}
+OHH_SCHEMA = {
+    "type": "object",
+    "required": [
+        SPEC_VERSION,
+        SITE_NAME,
+        NETWORK_NAME,
+        INTERNAL_VERSION,
+        GAME_NUMBER,
+        START_DATE_UTC,
+        TABLE_NAME,
+        GAME_TYPE,
+        BET_LIMIT,
+        TABLE_SIZE,
+        CURRENCY,
+        DEALER_SEAT,
+        SMALL_BLIND_AMOUNT,
+        BIG_BLIND_AMOUNT,
+        ANTE_AMOUNT,
+        PLAYERS,
+        ROUNDS,
+        POTS,
+    ],
+    "properties": {
+        SPEC_VERSION: {"type": "string"},
+        SITE_NAME: {"type": "string"},
+        NETWORK_NAME: {"type": "string"},
+        INTERNAL_VERSION: {"type": "string"},
+        TOURNAMENT: {"type": "boolean"},
+        TOURNAMENT_INFO: {
+            "type": "object",
+            "required": [TOURNAMENT_NUMBER, NAME, START_DATE_UTC, CURRENCY, TYPE],
+            "properties": {
+                TOURNAMENT_NUMBER: {"type": "string"},
+                NAME: {"type": "string"},
+                START_DATE_UTC: {"type": "string"},
+                CURRENCY: {"type": "string"},
+                BUYIN_AMOUNT: AMOUNT_SCHEMA,
+                FEE_AMOUNT: AMOUNT_SCHEMA,
+                BOUNTY_FEE_AMOUNT: AMOUNT_SCHEMA,
+                INITIAL_STACK: AMOUNT_SCHEMA,
+                TYPE: {"type": "string", "enum": ["STT", "MTT", "CASHGAME"]},
+                FLAGS: {"type": "array", "items": {"type": "string"}},
+                SPEED: {
+                    "type": "object",
+                    "required": [TYPE],
+                    "properties": {
+                        TYPE: {
+                            "type": "string",
+                            "enum": [
+                                "Normal",
+                                "Semi-Turbo",
+                                "Turbo",
+                                "Super-Turbo",
+                                "Hyper-Turbo",
+                                "Ultra-Turbo",
+                            ],
+                        },
+                        ROUND_TIME: {"type": "integer"},
+                    },
+                },
+            },
+        },
+        GAME_NUMBER: {"type": "string"},
+        START_DATE_UTC: {"type": "string"},
+        TABLE_NAME: {"type": "string"},
+        GAME_TYPE: {
+            "type": "string",
+            "enum": ["Holdem", "Omaha", "OmahaHiLo", "Stud", "StudHiLo", "Draw"],
+        },
+        BET_LIMIT: {
+            "type": "object",
+            "required": [BET_TYPE],
+            "properties": {BET_TYPE: {"type": "string", "enum": ["NL", "PL", "FL"]}},
+        },
+        TABLE_SIZE: {"type": "integer"},
+        CURRENCY: {"type": "string"},
+        DEALER_SEAT: {"type": "integer"},
+        SMALL_BLIND_AMOUNT: AMOUNT_SCHEMA,
+        BIG_BLIND_AMOUNT: AMOUNT_SCHEMA,
+        ANTE_AMOUNT: AMOUNT_SCHEMA,
+        # The hero is not in the players array when the hand is observed
+        HERO_PLAYER_ID: {"type": ["integer", "null"]},
+        FLAGS: {
+            "type": "array",
+            "items": {
+                "type": "string",
+                "enum": ["Run_It_Twice", "Anonymous", "Observed", "Fast", "Cap"],
+            },
+        },
+        PLAYERS: {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": [ID, SEAT, NAME, STARTING_STACK],
+                "properties": {
+                    ID: {"type": "integer"},
+                    SEAT: {"type": "integer"},
+                    NAME: {"type": "string"},
+                    DISPLAY: {"type": "string"},
+                    STARTING_STACK: AMOUNT_SCHEMA,
+                },
+            },
+        },
+        ROUNDS: {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": [ID, STREET, ACTIONS],
+                "properties": {
+                    ID: {"type": "integer"},
+                    STREET: {
+                        "type": "string",
+                        "enum": ["Preflop", "Flop", "Turn", "River", "Showdown"],
+                    },
+                    CARDS: CARDS_SCHEMA,
+                    ACTIONS: {"type": "array", "items": ACTION_SCHEMA},
+                },
+            },
+        },
+        POTS: {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": [NUMBER, AMOUNT, PLAYER_WINS],
+                "properties": {
+                    NUMBER: {"type": "integer"},
+                    AMOUNT: AMOUNT_SCHEMA,
+                    RAKE: AMOUNT_SCHEMA,
+                    PLAYER_WINS: {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "required": [PLAYER_ID, WIN_AMOUNT],
+                            "properties": {
+                                PLAYER_ID: {"type": "integer"},
+                                WIN_AMOUNT: AMOUNT_SCHEMA,
+                                CONTRIBUTED_RAKE: AMOUNT_SCHEMA,
+                            },
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+# JSON types and the python types that match them, bool is excluded from the numeric types
+# because it is a subclass of int.
+json_types = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "null": (type(None),),
+}
+# END SCHEMA
+# **************************************************************************************************
+
+
+# **************************************************************************************************
+# FUNCTIONS
+def compile_schema(schema: dict) -> Callable[[object, str, list[str]], None]:
+    """Compile a schema into a validator function. The schema is walked once, so validating a hand
+    only runs the checks and does not interpret the schema again. The keywords supported are the
+    ones used by OHH_SCHEMA: type, enum, required, properties and items.
+
+    Args:
+        schema (dict): The schema to compile.
+
+    Returns:
+        Callable[[object, str, list[str]], None]: A function that takes a value, the path to the
+        value and a list that the errors found will be appended to.
+    """
+    type_names = schema.get("type", [])
+    if isinstance(type_names, str):
+        type_names = [type_names]
+    python_types = tuple(t for name in type_names for t in json_types[name])
+    allow_bool = "boolean" in type_names
+    enum = frozenset(schema.get("enum", []))
+    required = schema.get("required", [])
+    properties = {
+        key: compile_schema(value) for key, value in schema.get("properties", {}).items()
+    }
+    items = compile_schema(schema["items"]) if "items" in schema else None
+
+    def validate(value: object, path: str, errors: list[str]) -> None:
+        if python_types and (
+            not isinstance(value, python_types) or (isinstance(value, bool) and not allow_bool)
+        ):
+            errors.append(f"{path} is {json.dumps(value)}, expected {' or '.join(type_names)}")
+            return
+        if enum and value not in enum:
+            errors.append(f"{path} is {json.dumps(value)}, not one of the allowed values")
+        if isinstance(value, dict):
+            for key in required:
+                if key not in value:
+                    errors.append(f"{path}.{key} is required")
+            for key, validate_property in properties.items():
+                if key in value:
+                    validate_property(value[key], f"{path}.{key}", errors)
+        elif items is not None and isinstance(value, list):
+            for i, item in enumerate(value):
+                items(item, f"{path}[{i}]", errors)
+
+    return validate
+
+
+@dataclass
+class HandValidation:
+    """The validation of the hands of a batch, set from the [Validation] section of config.ini.
+
+    Attributes:
+        mode (str): full, sampled or off.
+        sample_rate (float): The share of the hands validated in the sampled mode.
+        validate (Callable[[object, str, list[str]], None]): The validator of OHH_SCHEMA, see
+            compile_schema.
+        counts (dict[str, int]): The number of hands validated and the number that were invalid.
+    """
+
+    mode: str
+    sample_rate: float
+    validate: Callable[[object, str, list[str]], None] = field(
+        default_factory=lambda: compile_schema(OHH_SCHEMA)
+    )
+    counts: dict[str, int] = field(default_factory=lambda: {COUNT: 0, INVALID: 0})
+
+
+def validate_hand(validation: HandValidation, table_name: str, ohh: dict) -> None:
+    """Validate a converted hand against the OHH schema if the hand is selected by the validation
+    mode. Invalid hands are logged by game number.
+
+    Args:
+        validation (HandValidation): The validation of the batch, its counts are updated.
+        table_name (str): Name of the table the hand was played at.
+        ohh (dict): The hand history in JSON following the OHH format.
+
+    Returns:
+        None
+    """
+    if validation.mode == OFF or (
+        validation.mode == SAMPLED and random() >= validation.sample_rate
+    ):
+        return
+    errors: list[str] = []
+    validation.validate(ohh, OHH, errors)
+    validation.counts[COUNT] += 1
+    if errors:
+        validation.counts[INVALID] += 1
+        for error in errors:
+            logging.warning(f"[{table_name}][{ohh[GAME_NUMBER]}] Invalid hand: {error}")
+
+
+# END OF FUNCTIONS
+# **************************************************************************************************